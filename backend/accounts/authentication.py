@@ -0,0 +1,120 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from sportconnectgn.checks import shared_cache
+
+
+User = get_user_model()
+
+# Tout sauf le hash du mot de passe: il reste différé (chargé seulement si on y accède).
+SNAPSHOT_FIELDS = [f.attname for f in User._meta.concrete_fields if f.attname != "password"]
+
+
+def snapshot_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def invalidate_snapshot(user_id) -> None:
+    caches[settings.API_CACHE_ALIAS].delete(snapshot_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication sans SELECT par requête.
+
+    L'id vient du token; le profil est reconstruit depuis un instantané en cache
+    (AUTH_USER_CACHE_TIMEOUT secondes), invalidé à chaque sauvegarde/suppression de
+    l'utilisateur (accounts/signals.py). L'objet obtenu est un vrai CustomUser
+    (le mot de passe est un champ différé): `save()` n'écrit que les champs chargés.
+
+    Seulement avec un cache partagé en mémoire (Redis, memcached:
+    SHARED_CACHE_BACKENDS), où une lecture ne coûte pas de requête SQL: avec
+    locmem, l'invalidation n'atteindrait que le worker qui a traité la
+    modification (sportconnectgn.W002). Et seulement pour les
+    lectures: une écriture relit le profil en base, si bien qu'un compte supprimé,
+    désactivé ou privé de ses droits (même par un .update(), sans signal) n'écrit
+    plus rien, au lieu d'une erreur de clé étrangère ou d'un droit encore accordé.
+    """
+
+    snapshot_allowed = True
+
+    def authenticate(self, request):
+        self.snapshot_allowed = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if not (self.snapshot_allowed and self._uses_snapshot()):
+            return super().get_user(validated_token)
+
+        user_id = self._user_id(validated_token)
+        cache = caches[settings.API_CACHE_ALIAS]
+        key = snapshot_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = self._snapshot_query(user_id).first()
+            if values is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            cache.set(key, values, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+        return self._from_snapshot(values)
+
+    async def aauthenticate(self, request):
+        """authenticate() pour les vues asynchrones (sportconnectgn/asyncviews.py)."""
+        self.snapshot_allowed = request.method in SAFE_METHODS
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if not (self.snapshot_allowed and self._uses_snapshot()):
+            return await sync_to_async(super().get_user)(validated_token)
+
+        user_id = self._user_id(validated_token)
+        cache = caches[settings.API_CACHE_ALIAS]
+        key = snapshot_key(user_id)
+        values = await cache.aget(key)
+        if values is None:
+            values = await self._snapshot_query(user_id).afirst()
+            if values is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            await cache.aset(key, values, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+        return self._from_snapshot(values)
+
+    @staticmethod
+    def _uses_snapshot() -> bool:
+        return (
+            not api_settings.CHECK_REVOKE_TOKEN
+            and settings.AUTH_USER_CACHE_TIMEOUT > 0
+            and shared_cache(settings.API_CACHE_ALIAS)
+        )
+
+    @staticmethod
+    def _user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    @staticmethod
+    def _snapshot_query(user_id):
+        return User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).values_list(
+            *SNAPSHOT_FIELDS
+        )
+
+    @staticmethod
+    def _from_snapshot(values):
+        user = User.from_db(User.objects.db, SNAPSHOT_FIELDS, values)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
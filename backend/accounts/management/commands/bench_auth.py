@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.authentication import CachedJWTAuthentication
+from activities.management.commands._bench import isolated_database, percentile
+from sportconnectgn.checks import LOCMEM
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Coût de l'authentification JWT par requête: JWTAuthentication (SELECT à chaque "
+        "appel) vs CachedJWTAuthentication (instantané en cache). L'instantané exige un "
+        "cache partagé en mémoire (Redis, memcached): avec REDIS_URL, le banc le mesure "
+        "tel quel; sinon locmem en tient lieu (un seul process, sans aller-retour réseau)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        shared = (*settings.SHARED_CACHE_BACKENDS, LOCMEM)
+        with isolated_database(), override_settings(SHARED_CACHE_BACKENDS=shared):
+            self.stdout.write(f"Cache: {settings.CACHES[settings.API_CACHE_ALIAS]['BACKEND']}")
+            self.measure(options["iterations"])
+
+    def measure(self, iterations):
+        user = User.objects.create(username="bench-auth", ville="Conakry")
+        token = str(AccessToken.for_user(user))
+        request = RequestFactory().get("/api/users/me/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        caches[settings.API_CACHE_ALIAS].clear()
+
+        for label, backend in (
+            ("JWTAuthentication", JWTAuthentication()),
+            ("CachedJWTAuthentication", CachedJWTAuthentication()),
+        ):
+            backend.authenticate(Request(request))  # préchauffage (et remplissage du cache)
+            timings = []
+            with CaptureQueriesContext(connection) as ctx:
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    backend.authenticate(Request(request))
+                    timings.append((time.perf_counter() - started) * 1_000_000)
+            self.stdout.write(
+                f"{label:24} p50={percentile(timings, 50):7.1f}µs "
+                f"p95={percentile(timings, 95):7.1f}µs "
+                f"requêtes/appel={len(ctx.captured_queries) / iterations:.2f}"
+            )
@@ -13,9 +13,12 @@ class CustomUser(AbstractUser):
     quartier = models.CharField(max_length=120, blank=True)
     bio = models.TextField(blank=True)
     photo_profil = models.ImageField(upload_to="profiles/", blank=True, null=True)
+    # {"small": chemin, "medium": …, "large": …}, rempli par accounts/thumbnails.py
+    photo_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
     niveau_sportif = models.CharField(
         max_length=20, choices=NiveauSportif.choices, default=NiveauSportif.DEBUTANT
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self) -> str:
         return self.username
@@ -3,12 +3,16 @@ from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 
+from sportconnectgn.serializers import SparseFieldsMixin
+
+from .thumbnails import build_public_thumbnail, schedule_profile_photo, thumbnail_urls
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False, min_length=8)
+    photo_thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -22,6 +26,7 @@ class UserSerializer(serializers.ModelSerializer):
             "quartier",
             "bio",
             "photo_profil",
+            "photo_thumbnails",
             "niveau_sportif",
             "password",
         ]
@@ -43,13 +48,46 @@ class UserSerializer(serializers.ModelSerializer):
         Si un password est fourni, on le hash via set_password.
         """
         password = validated_data.pop("password", None)
+        new_photo = "photo_profil" in validated_data
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
+        if new_photo:
+            # Les vignettes de l'ancienne photo ne s'appliquent plus.
+            instance.photo_thumbnails = {}
         if password:
             instance.set_password(password)
         instance.save()
+        if new_photo:
+            # Redimensionnement en arrière-plan: la réponse n'attend pas Pillow.
+            schedule_profile_photo(instance)
         return instance
 
+    def get_photo_thumbnails(self, obj):
+        return thumbnail_urls(obj, self.context.get("request"))
+
+
+class PublicUserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Profil public, imbriqué dans les activités (created_by): ni email ni données
+    personnelles. `thumbnail` est la petite vignette (photo brute tant qu'elle
+    n'est pas encore traitée).
+    """
+
+    thumbnail = serializers.SerializerMethodField()
+
+    # Colonnes lues par ce serializer (pour .only() côté queryset).
+    model_fields = ("id", "username", "photo_profil", "photo_thumbnails")
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "thumbnail"]
+        read_only_fields = fields
+
+    def get_thumbnail(self, obj):
+        return build_public_thumbnail(
+            obj.photo_profil.name, obj.photo_thumbnails, self.context.get("request")
+        )
+
 
 class RegisterSerializer(serializers.Serializer):
     """
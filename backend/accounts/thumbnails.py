@@ -0,0 +1,130 @@
+"""
+Traitement des photos de profil, hors du cycle requête/réponse.
+
+Après un upload (PATCH users/me), la réponse part tout de suite; un thread du pool
+`_executor` se charge ensuite de:
+- appliquer l'orientation EXIF puis réencoder sans métadonnées (GPS, appareil…);
+- produire les tailles de THUMBNAIL_SIZES en WebP (JPEG si Pillow n'a pas WebP);
+- les stocker sous un nom dérivé du contenu (cache HTTP illimité possible);
+- remplacer l'original brut par la version "large" nettoyée.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from io import BytesIO
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+# nom -> côté maximal en pixels
+THUMBNAIL_SIZES = {"small": 64, "medium": 256, "large": 1024}
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix="thumbnails"
+)
+
+
+def _output_format():
+    from PIL import features
+
+    return ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+
+def render_thumbnails(raw: bytes) -> dict[str, tuple[str, bytes]]:
+    """Retourne {taille: (extension, octets)} pour une image source."""
+    from PIL import Image, ImageOps
+
+    fmt, ext = _output_format()
+    with Image.open(BytesIO(raw)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA") or (fmt == "JPEG" and image.mode == "RGBA"):
+            image = image.convert("RGB")
+        out = {}
+        for name, side in THUMBNAIL_SIZES.items():
+            copy = image.copy()
+            copy.thumbnail((side, side), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            # Pas d'argument exif=: le fichier produit ne contient aucune métadonnée.
+            copy.save(buffer, format=fmt, quality=82, method=4 if fmt == "WEBP" else 0)
+            out[name] = (ext, buffer.getvalue())
+    return out
+
+
+def process_profile_photo(user_id: int, source_name: str) -> None:
+    User = get_user_model()
+    try:
+        with default_storage.open(source_name, "rb") as fh:
+            raw = fh.read()
+        digest = hashlib.sha256(raw).hexdigest()[:20]
+        stored = {}
+        for name, (ext, data) in render_thumbnails(raw).items():
+            path = f"profiles/thumbs/{digest}_{name}.{ext}"
+            if not default_storage.exists(path):
+                path = default_storage.save(path, ContentFile(data))
+            stored[name] = path
+
+        # Ne rien écraser si une nouvelle photo a été envoyée entre-temps. On passe par
+        # save() pour déclencher les signaux (instantané d'auth, caches, updated_at).
+        with transaction.atomic():
+            user = User.objects.select_for_update().filter(pk=user_id).first()
+            if user is None or user.photo_profil.name != source_name:
+                return
+            user.photo_profil = stored["large"]
+            user.photo_thumbnails = stored
+            user.save(update_fields=["photo_profil", "photo_thumbnails", "updated_at"])
+        if source_name != stored["large"]:
+            default_storage.delete(source_name)
+    except Exception:
+        logger.exception("Échec du traitement de la photo %s (user %s)", source_name, user_id)
+
+
+def _process_in_worker(user_id: int, source_name: str) -> None:
+    try:
+        process_profile_photo(user_id, source_name)
+    finally:
+        connections.close_all()
+
+
+def schedule_profile_photo(user) -> None:
+    """Planifie le traitement après commit (le fichier et la ligne doivent exister)."""
+    if not user.photo_profil:
+        return
+    user_id, source_name = user.pk, user.photo_profil.name
+
+    def _submit():
+        if settings.THUMBNAIL_ASYNC:
+            _executor.submit(_process_in_worker, user_id, source_name)
+        else:
+            process_profile_photo(user_id, source_name)
+
+    transaction.on_commit(_submit)
+
+
+def _absolute(path: str, request=None) -> str:
+    url = default_storage.url(path)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def build_thumbnail_urls(thumbnails, request=None) -> dict[str, str]:
+    """URLs à partir du contenu de `photo_thumbnails` (sans instance: voir fastpath)."""
+    return {name: _absolute(path, request) for name, path in (thumbnails or {}).items()}
+
+
+def build_public_thumbnail(photo_name, thumbnails, request=None):
+    """Petite vignette, ou photo brute tant qu'elle n'est pas traitée, ou None."""
+    if thumbnails and "small" in thumbnails:
+        return _absolute(thumbnails["small"], request)
+    if not photo_name:
+        return None
+    return _absolute(photo_name, request)
+
+
+def thumbnail_urls(user, request=None) -> dict[str, str]:
+    return build_thumbnail_urls(user.photo_thumbnails, request)
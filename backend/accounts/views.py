@@ -4,13 +4,21 @@ from rest_framework.decorators import action
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 
+from activities import cache as response_cache
+from sportconnectgn.asyncviews import AsyncReadView
+from sportconnectgn.conditional import ConditionalGetMixin
+from sportconnectgn.middleware import AuthTimingMixin
+from sportconnectgn.replicas import ReplicaReadMixin
+
 from .serializers import RegisterSerializer, UserSerializer
 
 
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(
+    AuthTimingMixin, ConditionalGetMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet
+):
     """
     Exposition minimale des utilisateurs:
     - `me/` pour le profil courant (auth requis)
@@ -19,12 +27,20 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
 
     serializer_class = UserSerializer
     queryset = User.objects.all().order_by("id")
+    # Liste/détail (réservés à l'admin) sur "default".
+    replica_actions = ("me",)
 
     def get_permissions(self):
         if self.action == "me":
             return [permissions.IsAuthenticated()]
         return [permissions.IsAdminUser()]
 
+    def get_validator_state(self, request):
+        if self.action == "me":
+            # Déjà chargé par l'authentification: aucune requête supplémentaire.
+            return [(request.user.updated_at, 1)]
+        return response_cache.version_state(response_cache.USERS)
+
     @action(
         detail=False,
         methods=["get", "patch", "delete"],
@@ -48,7 +64,17 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class RegisterView(generics.CreateAPIView):
+class MeReadView(AsyncReadView):
+    """GET users/me/ asynchrone (API_ASYNC_VIEWS): l'utilisateur vient de l'authentification."""
+
+    async def get_validator_state(self, view, request):
+        return [(request.user.updated_at, 1)]
+
+    async def get_data(self, view, request):
+        return view.get_serializer(request.user).data
+
+
+class RegisterView(AuthTimingMixin, generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = RegisterSerializer
 
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Activity, Participation, Sport
+from . import search
+from .models import Activity, Participation, Sport, SportAffinity
 
 
 @admin.register(Sport)
@@ -15,9 +16,21 @@ class ActivityAdmin(admin.ModelAdmin):
     list_filter = ("sport", "niveau_requis")
     search_fields = ("titre", "lieu")
 
+    def get_search_results(self, request, queryset, search_term):
+        # Index plein texte plutôt qu'un ILIKE '%…%' sur toute la table.
+        if not search_term or not search.is_available():
+            return super().get_search_results(request, queryset, search_term)
+        return search.filter_queryset(queryset, search_term), False
+
 
 @admin.register(Participation)
 class ParticipationAdmin(admin.ModelAdmin):
     list_display = ("user", "activity", "joined_at")
     list_filter = ("joined_at",)
 
+
+@admin.register(SportAffinity)
+class SportAffinityAdmin(admin.ModelAdmin):
+    list_display = ("user", "sport", "participations", "updated_at")
+    list_filter = ("sport",)
+    raw_id_fields = ("user",)
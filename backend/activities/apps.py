@@ -5,3 +5,7 @@ class ActivitiesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "activities"
 
+    def ready(self):
+        from sportconnectgn import checks  # noqa: F401
+
+        from . import signals  # noqa: F401
@@ -0,0 +1,44 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Activity, Participation
+
+
+class BookingError(Exception):
+    FULL = "full"
+    ALREADY_BOOKED = "already_booked"
+
+    MESSAGES = {
+        FULL: "Cette activité est complète.",
+        ALREADY_BOOKED: "Tu as déjà réservé cette activité.",
+    }
+
+    def __init__(self, code: str):
+        self.code = code
+        super().__init__(self.MESSAGES[code])
+
+
+def book_activity(user, activity: Activity) -> Participation:
+    """
+    Réserve une place de façon atomique.
+
+    Un seul UPDATE conditionnel (`participants_count < nombre_places`) verrouille la
+    ligne Activity (Postgres: row lock, SQLite: verrou d'écriture) et vérifie la
+    capacité; la contrainte unique user/activity détecte la double réservation.
+    Le compteur est ensuite incrémenté par le signal post_save de Participation,
+    dans la même transaction.
+    """
+    with transaction.atomic():
+        has_room = Activity.objects.filter(
+            pk=activity.pk, participants_count__lt=F("nombre_places")
+        ).update(participants_count=F("participants_count"))
+        if not has_room:
+            if Participation.objects.filter(user=user, activity=activity).exists():
+                raise BookingError(BookingError.ALREADY_BOOKED)
+            raise BookingError(BookingError.FULL)
+        try:
+            with transaction.atomic():
+                participation = Participation.objects.create(user=user, activity=activity)
+        except IntegrityError:
+            raise BookingError(BookingError.ALREADY_BOOKED) from None
+    return participation
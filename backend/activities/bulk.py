@@ -0,0 +1,230 @@
+"""
+Opérations en lot: création d'activités (avec récurrence) et réservations.
+
+Chaque lot tient en une transaction et en un nombre fixe de requêtes (bulk_create,
+UPDATE ensemblistes), quelle que soit sa taille. bulk_create ne déclenchant pas
+les signaux (signals.py), compteurs, index de recherche, affinités, flux temps
+réel et cache sont tenus à jour ici. Le résultat est donné élément par élément:
+un élément invalide n'empêche pas les autres d'aboutir.
+"""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from . import cache as response_cache
+from . import live, recommend, search
+from .booking import BookingError
+from .models import Activity, Participation, Sport
+from .serializers import ActivityBulkItemSerializer, BookingItemSerializer
+
+
+User = get_user_model()
+
+# Éléments par requête, et activités créées par requête (récurrences développées).
+MAX_ITEMS = 200
+MAX_OCCURRENCES = 200
+
+FORBIDDEN = "forbidden"
+FORBIDDEN_MESSAGE = "Seul l'organisateur de l'activité peut inscrire d'autres joueurs."
+ALREADY_BOOKED_MESSAGE = "Déjà inscrit à cette activité."
+
+
+def parse_items(data) -> list:
+    """Corps attendu: {"items": [...]}, au plus MAX_ITEMS éléments."""
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValidationError({"items": "Une liste non vide est requise."})
+    if len(items) > MAX_ITEMS:
+        raise ValidationError({"items": f"Au plus {MAX_ITEMS} éléments par requête."})
+    return items
+
+
+def response_status(results) -> int:
+    """201 si tout a abouti, 400 si rien, 207 (Multi-Status) sinon."""
+    failed = sum(1 for result in results if result["status"] == "error")
+    if not failed:
+        return status.HTTP_201_CREATED
+    if failed == len(results):
+        return status.HTTP_400_BAD_REQUEST
+    return status.HTTP_207_MULTI_STATUS
+
+
+def _error(index, errors, code=None):
+    result = {"index": index, "status": "error", "errors": errors}
+    if code:
+        result["code"] = code
+    return result
+
+
+def expand_recurrence(start, recurrence) -> list:
+    """
+    Dates des occurrences à partir de `start` (incluse). Calcul en heure locale:
+    la séance reste à la même heure affichée, même en cas de changement d'heure.
+    """
+    days = 7 if recurrence["frequency"] == "weekly" else 1
+    step = timedelta(days=recurrence["interval"] * days)
+    local = timezone.localtime(start).replace(tzinfo=None)
+    count = recurrence.get("count", MAX_OCCURRENCES + 1)
+    until = recurrence.get("until")
+    dates = []
+    for k in range(count):
+        naive = local + k * step
+        if until is not None and naive.date() > until:
+            break
+        dates.append(timezone.make_aware(naive))
+        if len(dates) > MAX_OCCURRENCES:
+            break
+    return dates
+
+
+def create_activities(user, items) -> list[dict]:
+    """
+    Crée les activités des éléments valides (le créateur y est inscrit d'office,
+    comme pour POST /api/activities/).
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        serializer = ActivityBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, dict(serializer.validated_data)))
+        else:
+            results[index] = _error(index, serializer.errors)
+
+    sports = Sport.objects.in_bulk({data["sport_id"] for _, data in valid})
+    planned = []
+    total = 0
+    for index, data in valid:
+        sport = sports.get(data.pop("sport_id"))
+        if sport is None:
+            results[index] = _error(index, {"sport_id": ["Sport inconnu."]})
+            continue
+        recurrence = data.pop("recurrence", None)
+        if recurrence:
+            dates = expand_recurrence(data["date_heure"], recurrence)
+        else:
+            dates = [data["date_heure"]]
+        if not dates:
+            results[index] = _error(index, {"recurrence": ["Aucune occurrence."]})
+            continue
+        if total + len(dates) > MAX_OCCURRENCES:
+            results[index] = _error(
+                index, {"recurrence": [f"Au plus {MAX_OCCURRENCES} activités par requête."]}
+            )
+            continue
+        total += len(dates)
+        planned.append(
+            (
+                index,
+                [
+                    Activity(
+                        **{**data, "date_heure": date_heure},
+                        sport=sport,
+                        created_by=user,
+                        participants_count=1,
+                    )
+                    for date_heure in dates
+                ],
+            )
+        )
+
+    activities = [activity for _, objs in planned for activity in objs]
+    if activities:
+        with transaction.atomic():
+            Activity.objects.bulk_create(activities)
+            Participation.objects.bulk_create(
+                [Participation(user=user, activity=activity) for activity in activities]
+            )
+            search.reindex([activity.pk for activity in activities])
+            recommend.record_many(Counter((user.pk, a.sport_id) for a in activities))
+            response_cache.bump(response_cache.ACTIVITIES)
+
+    for index, objs in planned:
+        results[index] = {"index": index, "status": "created", "ids": [a.pk for a in objs]}
+    return results
+
+
+def book_many(actor, items) -> list[dict]:
+    """
+    Réserve des couples (utilisateur, activité). Inscrire quelqu'un d'autre est
+    réservé à l'organisateur de l'activité (ou au staff).
+
+    Même verrou que book_activity (UPDATE neutre sur les activités du lot), puis
+    les places restantes sont décomptées en mémoire, dans l'ordre des éléments.
+    """
+    results = [None] * len(items)
+    parsed = []
+    for index, item in enumerate(items):
+        serializer = BookingItemSerializer(data=item)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            parsed.append((index, data.get("user", actor.pk), data["activity"]))
+        else:
+            results[index] = _error(index, serializer.errors)
+
+    activity_ids = {activity_id for _, _, activity_id in parsed}
+    user_ids = {user_id for _, user_id, _ in parsed}
+    accepted = []
+    with transaction.atomic():
+        Activity.objects.filter(pk__in=activity_ids).update(
+            participants_count=F("participants_count")
+        )
+        activities = Activity.objects.only(
+            "id", "sport", "nombre_places", "participants_count", "created_by"
+        ).in_bulk(activity_ids)
+        known_users = set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+        booked = set(
+            Participation.objects.filter(
+                activity_id__in=activity_ids, user_id__in=user_ids
+            ).values_list("user_id", "activity_id")
+        )
+        remaining = {pk: a.nombre_places - a.participants_count for pk, a in activities.items()}
+
+        for index, user_id, activity_id in parsed:
+            activity = activities.get(activity_id)
+            if activity is None:
+                results[index] = _error(index, {"activity": ["Activité inconnue."]})
+            elif user_id not in known_users:
+                results[index] = _error(index, {"user": ["Utilisateur inconnu."]})
+            elif (
+                user_id != actor.pk
+                and not actor.is_staff
+                and activity.created_by_id != actor.pk
+            ):
+                results[index] = _error(index, {"detail": FORBIDDEN_MESSAGE}, FORBIDDEN)
+            elif (user_id, activity_id) in booked:
+                results[index] = _error(
+                    index, {"detail": ALREADY_BOOKED_MESSAGE}, BookingError.ALREADY_BOOKED
+                )
+            elif remaining[activity_id] <= 0:
+                code = BookingError.FULL
+                results[index] = _error(index, {"detail": BookingError.MESSAGES[code]}, code)
+            else:
+                booked.add((user_id, activity_id))
+                remaining[activity_id] -= 1
+                accepted.append((index, Participation(user_id=user_id, activity_id=activity_id)))
+
+        if accepted:
+            Participation.objects.bulk_create([p for _, p in accepted])
+            added = Counter(p.activity_id for _, p in accepted)
+            Activity.objects.filter(pk__in=added).update(
+                participants_count=F("participants_count")
+                + Case(*(When(pk=pk, then=Value(n)) for pk, n in added.items()), default=0),
+                updated_at=timezone.now(),
+            )
+            recommend.record_many(
+                Counter((p.user_id, activities[p.activity_id].sport_id) for _, p in accepted)
+            )
+            live.publish_seats(added)
+            response_cache.bump(response_cache.ACTIVITIES)
+
+    for index, participation in accepted:
+        results[index] = {"index": index, "status": "booked", "id": participation.pk}
+    return results
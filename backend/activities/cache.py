@@ -0,0 +1,117 @@
+"""
+Cache des réponses de lecture (liste/détail), invalidé par numéro de version.
+
+Chaque "scope" (activities, sports, users) a un compteur de version dans le cache; il est
+incrémenté par les signaux d'écriture (signals.py) après commit. La clé d'une
+réponse contient la version courante: une écriture rend donc instantanément
+obsolètes toutes les pages du scope, sans avoir à les énumérer.
+
+On ne met en cache que la partie commune à tous les visiteurs; les champs propres
+à l'utilisateur (ex: has_joined) sont recalculés par la vue à chaque requête.
+
+Les compteurs vivent dans un alias à part (API_CACHE_VERSION_ALIAS), sans
+expiration: l'éviction des réponses ne les touche pas. S'ils disparaissent malgré
+tout (redémarrage du cache…), ils repartent d'une valeur tirée de l'horloge, jamais
+d'une valeur déjà servie: les pages des anciennes versions restent inaccessibles.
+
+Ces compteurs servent aussi de validateurs ETag (`version_state`, voir
+sportconnectgn/conditional.py): un GET conditionnel ne coûte aucune requête SQL.
+L'heure de la dernière écriture de chaque scope est notée à côté (`written_within`):
+les lectures sur réplique en tiennent compte (sportconnectgn/replicas.py).
+
+Attention: avec le backend locmem (défaut), le cache est propre à chaque process;
+avec plusieurs workers, utiliser Redis ou memcached (voir CACHES dans settings.py).
+`bump` repose sur un incr() atomique: pas de cache en base ni en fichiers, dont
+l'incr() lit puis réécrit (`manage.py check` le refuse: sportconnectgn.E002).
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+ACTIVITIES = "activities"
+SPORTS = "sports"
+USERS = "users"
+
+
+def _cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _versions():
+    return caches[settings.API_CACHE_VERSION_ALIAS]
+
+
+def _version_key(scope: str) -> str:
+    return f"api:version:{scope}"
+
+
+def _written_key(scope: str) -> str:
+    return f"api:written:{scope}"
+
+
+def _initial_version() -> int:
+    # Microsecondes: supérieur à toute version déjà atteinte par incréments.
+    return time.time_ns() // 1000
+
+
+def get_version(scope: str) -> int:
+    cache = _versions()
+    version = cache.get(_version_key(scope))
+    if version is None:
+        initial = _initial_version()
+        cache.add(_version_key(scope), initial, timeout=None)
+        version = cache.get(_version_key(scope), initial)
+    return version
+
+
+def bump(*scopes: str) -> None:
+    """Invalide les scopes donnés, une fois la transaction en cours validée."""
+
+    def _bump():
+        cache = _versions()
+        for scope in scopes:
+            try:
+                cache.incr(_version_key(scope))
+            except ValueError:
+                cache.add(_version_key(scope), _initial_version(), timeout=None)
+        cache.set_many({_written_key(scope): time.time() for scope in scopes}, timeout=None)
+
+    transaction.on_commit(_bump)
+
+
+def version_state(*scopes: str) -> list:
+    """Validateurs (voir ConditionalGetMixin) des réponses qui dépendent de ces scopes."""
+    return [(None, get_version(scope)) for scope in scopes]
+
+
+def written_within(scope: str, seconds: float) -> bool:
+    """Vrai si une écriture du scope a été validée il y a moins de `seconds` secondes."""
+    written = _versions().get(_written_key(scope))
+    return written is not None and time.time() - written < seconds
+
+
+def build_key(scope: str, request) -> str:
+    digest = hashlib.sha1(request.build_absolute_uri().encode("utf-8")).hexdigest()
+    return f"api:response:{scope}:v{get_version(scope)}:{digest}"
+
+
+def lookup(key: str):
+    return _cache().get(key)
+
+
+def store(key: str, data) -> None:
+    _cache().set(key, plain(data), timeout=settings.API_CACHE_TIMEOUT)
+
+
+def plain(data):
+    """Convertit ReturnDict/ReturnList (qui référencent leur serializer) en dict/list simples."""
+    if isinstance(data, dict):
+        return {key: plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [plain(value) for value in data]
+    return data
@@ -0,0 +1,159 @@
+"""
+Export complet des activités et participations, en CSV ou NDJSON.
+
+Les lignes sont lues par `.values().iterator(chunk_size=EXPORT_CHUNK_SIZE)`
+(curseur côté serveur sous Postgres) et écrites au fil de l'eau: la mémoire reste
+constante quelle que soit la taille de la table. Utilisé par les actions `export`
+des viewsets (StreamingHttpResponse) et par `manage.py export_data`.
+"""
+
+import csv
+import json
+
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from .models import Activity, Participation
+
+
+EXPORT_CHUNK_SIZE = 2000
+# Taille visée des morceaux envoyés au client (une ligne par morceau serait trop coûteux,
+# notamment avec la compression qui vide son tampon à chaque morceau).
+FLUSH_BYTES = 64 * 1024
+
+# nom de colonne -> chemin ORM (pour .values())
+ACTIVITY_COLUMNS = {
+    "id": "id",
+    "titre": "titre",
+    "sport": "sport__name",
+    "date_heure": "date_heure",
+    "lieu": "lieu",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "nombre_places": "nombre_places",
+    "niveau_requis": "niveau_requis",
+    "description": "description",
+    "created_by_id": "created_by_id",
+    "created_by": "created_by__username",
+    "participants_count": "participants_count",
+    "created_at": "created_at",
+}
+
+PARTICIPATION_COLUMNS = {
+    "id": "id",
+    "user_id": "user_id",
+    "username": "user__username",
+    "activity_id": "activity_id",
+    "activity": "activity__titre",
+    "activity_date_heure": "activity__date_heure",
+    "sport": "activity__sport__name",
+    "joined_at": "joined_at",
+}
+
+DATETIME_COLUMNS = {"date_heure", "created_at", "activity_date_heure", "joined_at"}
+
+KINDS = {
+    "activities": (Activity, ACTIVITY_COLUMNS),
+    "participations": (Participation, PARTICIPATION_COLUMNS),
+}
+
+
+def base_queryset(kind: str):
+    model, _ = KINDS[kind]
+    return model.objects.order_by("id")
+
+
+def iter_rows(kind: str, queryset=None):
+    """Lignes (dicts) dans l'ordre des colonnes; datetimes au format de l'API."""
+    _, columns = KINDS[kind]
+    queryset = base_queryset(kind) if queryset is None else queryset
+    tz = timezone.get_current_timezone()
+    rows = queryset.values(*columns.values())
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        out = {}
+        for name, path in columns.items():
+            value = row[path]
+            if name in DATETIME_COLUMNS and value is not None:
+                value = _format_datetime(value, tz)
+            out[name] = value
+        yield out
+
+
+def _format_datetime(value, tz) -> str:
+    # Comme DateTimeField de DRF, avec le fuseau résolu une fois par export.
+    text = value.astimezone(tz).isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer: write() renvoie la ligne au lieu de l'écrire."""
+
+    def write(self, value):
+        return value
+
+
+def _batched(lines):
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def stream_csv(kind: str, queryset=None):
+    _, columns = KINDS[kind]
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(list(columns))
+        for row in iter_rows(kind, queryset):
+            yield writer.writerow(row.values())
+
+    return _batched(lines())
+
+
+def stream_ndjson(kind: str, queryset=None):
+    def lines():
+        for row in iter_rows(kind, queryset):
+            yield json.dumps(row, ensure_ascii=False) + "\n"
+
+    return _batched(lines())
+
+
+STREAMS = {"csv": stream_csv, "ndjson": stream_ndjson}
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Négociation de `?format=csv` / `Accept: text/csv` pour les actions `export`.
+    Les données passent par StreamingHttpResponse; seules les erreurs sont rendues ici.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        writer = csv.writer(_Echo())
+        items = data.items() if isinstance(data, dict) else [("detail", data)]
+        lines = [writer.writerow(["champ", "message"])]
+        for field, messages in items:
+            if isinstance(messages, list):
+                messages = " ".join(str(message) for message in messages)
+            lines.append(writer.writerow([field, messages]))
+        return "".join(lines).encode("utf-8")
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
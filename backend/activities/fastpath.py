@@ -0,0 +1,200 @@
+"""
+Sérialisation rapide des listes en lecture seule (activities list/mine,
+participations list).
+
+Les lignes sont lues avec `.values()` (pas d'instances de modèles) et les dicts
+de réponse sont construits directement, dans l'ordre des champs des serializers.
+La sortie doit rester identique octet pour octet à celle d'ActivitySerializer /
+ParticipationSerializer: `manage.py bench_fast_path` le vérifie sur des cas
+aléatoires. Toute modification de ces serializers doit être reportée ici.
+
+Non couvert (les vues repassent par les serializers): `?fields=` et `?expand=`.
+"""
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from accounts.thumbnails import build_public_thumbnail, build_thumbnail_urls
+
+from .geo import round_km
+
+
+_datetime = serializers.DateTimeField()
+
+_ACTIVITY_FIELDS = (
+    "id",
+    "titre",
+    "sport_id",
+    "sport__name",
+    "sport__slug",
+    "date_heure",
+    "lieu",
+    "latitude",
+    "longitude",
+    "nombre_places",
+    "niveau_requis",
+    "description",
+    "created_by_id",
+    "created_by__username",
+    "created_by__photo_profil",
+    "created_by__photo_thumbnails",
+    "participants_count",
+    "created_at",
+)
+
+_USER_FIELDS = (
+    "user_id",
+    "user__username",
+    "user__email",
+    "user__first_name",
+    "user__last_name",
+    "user__ville",
+    "user__quartier",
+    "user__bio",
+    "user__photo_profil",
+    "user__photo_thumbnails",
+    "user__niveau_sportif",
+)
+
+
+def supports(request) -> bool:
+    if not settings.API_FAST_PATH:
+        return False
+    params = request.query_params
+    return "fields" not in params and "expand" not in params
+
+
+def activity_values(queryset):
+    """
+    `queryset` (celui du viewset) -> dicts; garde les annotations has_joined et
+    distance_km si présentes.
+    """
+    annotations = queryset.query.annotations
+    extra = [name for name in ("has_joined", "distance_km") if name in annotations]
+    return queryset.values(*_ACTIVITY_FIELDS, *extra)
+
+
+class _CountedValues:
+    """
+    `.values()` paginé par numéro de page: le COUNT(*) du Paginator part du queryset
+    de modèles, sans les jointures que `.values()` ajoute pour les champs imbriqués.
+    """
+
+    def __init__(self, values, queryset):
+        self.values = values
+        self.queryset = queryset
+
+    def count(self):
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __iter__(self):
+        return iter(self.values)
+
+
+def participation_values(queryset):
+    values = queryset.values(
+        "id",
+        *_USER_FIELDS,
+        *(f"activity__{name}" for name in _ACTIVITY_FIELDS),
+        "joined_at",
+        "activity_has_joined",
+    )
+    return _CountedValues(values, queryset)
+
+
+def _datetime_or_none(value):
+    return None if value is None else _datetime.to_representation(value)
+
+
+def _activity(row, request, has_joined, prefix=""):
+    def get(name):
+        return row[prefix + name]
+
+    places = get("nombre_places")
+    count = get("participants_count")
+    return {
+        "id": get("id"),
+        "titre": get("titre"),
+        "sport": {"id": get("sport_id"), "name": get("sport__name"), "slug": get("sport__slug")},
+        "date_heure": _datetime_or_none(get("date_heure")),
+        "lieu": get("lieu"),
+        "latitude": get("latitude"),
+        "longitude": get("longitude"),
+        "distance_km": round_km(row.get(prefix + "distance_km")),
+        "nombre_places": places,
+        "niveau_requis": get("niveau_requis"),
+        "description": get("description"),
+        "created_by": {
+            "id": get("created_by_id"),
+            "username": get("created_by__username"),
+            "thumbnail": build_public_thumbnail(
+                get("created_by__photo_profil"), get("created_by__photo_thumbnails"), request
+            ),
+        },
+        "participants_count": count,
+        "is_full": count >= int(places or 0),
+        "has_joined": has_joined,
+        "created_at": _datetime_or_none(get("created_at")),
+    }
+
+
+def _authenticated(request) -> bool:
+    return bool(getattr(request.user, "is_authenticated", False))
+
+
+def activities(rows, request, shared_response=False) -> list[dict]:
+    # Même logique que ActivitySerializer.get_has_joined.
+    personal = _authenticated(request) and not shared_response
+    return [
+        _activity(row, request, bool(row.get("has_joined")) if personal else False)
+        for row in rows
+    ]
+
+
+def _photo_url(name, request):
+    if not name:
+        return None
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def participations(rows, request) -> list[dict]:
+    authenticated = _authenticated(request)
+    out = []
+    for row in rows:
+        out.append(
+            {
+                "id": row["id"],
+                "user": {
+                    "id": row["user_id"],
+                    "username": row["user__username"],
+                    "email": row["user__email"],
+                    "first_name": row["user__first_name"],
+                    "last_name": row["user__last_name"],
+                    "ville": row["user__ville"],
+                    "quartier": row["user__quartier"],
+                    "bio": row["user__bio"],
+                    "photo_profil": _photo_url(row["user__photo_profil"], request),
+                    "photo_thumbnails": build_thumbnail_urls(
+                        row["user__photo_thumbnails"], request
+                    ),
+                    "niveau_sportif": row["user__niveau_sportif"],
+                },
+                "activity": row["activity__id"],
+                "activity_detail": _activity(
+                    row,
+                    request,
+                    bool(row["activity_has_joined"]) if authenticated else False,
+                    prefix="activity__",
+                ),
+                "joined_at": _datetime_or_none(row["joined_at"]),
+            }
+        )
+    return out
@@ -0,0 +1,106 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from . import geo, search
+from .models import Activity
+
+
+def _parse_bound(name: str, raw: str, *, end_of_day: bool = False) -> datetime:
+    """
+    Accepte une date (YYYY-MM-DD) ou un datetime ISO 8601.
+    Une date seule couvre toute la journée (début ou fin selon la borne).
+    """
+    try:
+        # Bien formé mais hors limites (ex: 2020-13-01): ValueError.
+        value = parse_datetime(raw)
+        day = parse_date(raw) if value is None else None
+    except ValueError:
+        value = day = None
+    if value is None:
+        if day is None:
+            raise ValidationError({name: "Date invalide (format attendu: YYYY-MM-DD)."})
+        value = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _parse_near(raw: str) -> tuple[float, float]:
+    try:
+        lat, lng = (float(part) for part in raw.split(","))
+    except ValueError:
+        raise ValidationError({"near": "Format attendu: latitude,longitude."}) from None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValidationError({"near": "Coordonnées hors limites."})
+    return lat, lng
+
+
+def _parse_radius(raw: str) -> float:
+    if not raw:
+        return geo.DEFAULT_RADIUS_KM
+    try:
+        radius = float(raw)
+    except ValueError:
+        radius = 0.0
+    if not 0 < radius <= geo.MAX_RADIUS_KM:
+        raise ValidationError(
+            {"radius": f"Rayon en km, strictement positif et au plus {geo.MAX_RADIUS_KM:g}."}
+        )
+    return radius
+
+
+class ActivityFilterBackend(BaseFilterBackend):
+    """
+    Filtres serveur de /api/activities/:
+    - `sport`: slug du sport
+    - `niveau_requis`: debutant | intermediaire | avance | pro
+    - `date_from` / `date_to`: bornes (date ou datetime ISO)
+    - `upcoming=1`: uniquement les activités à venir
+    - `q`: texte libre (titre, lieu, description, sport), via l'index plein texte
+    - `near=lat,lng` (+ `radius` en km, 5 par défaut): activités géolocalisées dans
+      le rayon, annotées `distance_km` et triées par distance croissante
+    Chaque filtre est couvert par un index composite se terminant par (date_heure, id);
+    `near` utilise l'index (latitude, longitude).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        sport = params.get("sport", "").strip()
+        if sport:
+            queryset = queryset.filter(sport__slug=sport)
+
+        niveau = params.get("niveau_requis", "").strip()
+        if niveau:
+            if niveau not in Activity.NiveauRequis.values:
+                raise ValidationError({"niveau_requis": "Niveau inconnu."})
+            queryset = queryset.filter(niveau_requis=niveau)
+
+        date_from = params.get("date_from", "").strip()
+        if date_from:
+            queryset = queryset.filter(date_heure__gte=_parse_bound("date_from", date_from))
+
+        date_to = params.get("date_to", "").strip()
+        if date_to:
+            queryset = queryset.filter(
+                date_heure__lte=_parse_bound("date_to", date_to, end_of_day=True)
+            )
+
+        if params.get("upcoming", "").strip().lower() in {"1", "true", "yes", "on"}:
+            queryset = queryset.filter(date_heure__gte=timezone.now())
+
+        q = params.get("q", "").strip()
+        if q:
+            queryset = search.filter_queryset(queryset, q)
+
+        near = params.get("near", "").strip()
+        if near:
+            lat, lng = _parse_near(near)
+            radius = _parse_radius(params.get("radius", "").strip())
+            queryset = geo.near(queryset, lat, lng, radius).order_by("distance_km", "id")
+
+        return queryset
@@ -0,0 +1,141 @@
+"""
+Géolocalisation hors ligne des activités, à partir d'un gazetteer des quartiers de
+Conakry embarqué (aucun appel réseau), et outils pour la recherche « près de moi ».
+
+Les coordonnées sont des centres approximatifs de quartiers (quelques centaines de
+mètres de précision): suffisant pour trier des activités par proximité.
+"""
+
+from functools import cache
+import math
+import re
+import unicodedata
+
+from django.db.models import ExpressionWrapper, FloatField
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Rayon de `?near=` (km): par défaut, et plafond (au-delà, autant lister tout Conakry).
+DEFAULT_RADIUS_KM = 5.0
+MAX_RADIUS_KM = 50.0
+
+# nom -> (latitude, longitude, niveau); niveau 0 = quartier, 1 = commune, 2 = ville.
+# À égalité dans un texte, le niveau le plus fin l'emporte ("Kipé, Ratoma" -> Kipé).
+GAZETTEER = {
+    "Conakry": (9.5370, -13.6773, 2),
+    # Communes
+    "Kaloum": (9.5092, -13.7122, 1),
+    "Dixinn": (9.5480, -13.6760, 1),
+    "Matam": (9.5470, -13.6420, 1),
+    "Ratoma": (9.5840, -13.6420, 1),
+    "Matoto": (9.5820, -13.6090, 1),
+    # Quartiers
+    "Boulbinet": (9.5080, -13.7180, 0),
+    "Sandervalia": (9.5170, -13.7060, 0),
+    "Coronthie": (9.5180, -13.7020, 0),
+    "Tombo": (9.5130, -13.7000, 0),
+    "Camayenne": (9.5370, -13.6880, 0),
+    "Landréah": (9.5430, -13.6830, 0),
+    "Belle-Vue": (9.5450, -13.6710, 0),
+    "Minière": (9.5560, -13.6680, 0),
+    "Dar-es-Salam": (9.5620, -13.6700, 0),
+    "Coléah": (9.5290, -13.6670, 0),
+    "Bonfi": (9.5330, -13.6560, 0),
+    "Madina": (9.5420, -13.6540, 0),
+    "Hamdallaye": (9.5640, -13.6530, 0),
+    "Taouyah": (9.5710, -13.6640, 0),
+    "Bambeto": (9.5740, -13.6440, 0),
+    "Cosa": (9.5810, -13.6380, 0),
+    "Kipé": (9.5940, -13.6530, 0),
+    "Kaporo": (9.6250, -13.6330, 0),
+    "Nongo": (9.6150, -13.6400, 0),
+    "Kobaya": (9.6410, -13.6270, 0),
+    "Lambanyi": (9.6210, -13.6180, 0),
+    "Koloma": (9.6050, -13.6140, 0),
+    "Gbessia": (9.5700, -13.6160, 0),
+    "Yimbaya": (9.5930, -13.6050, 0),
+    "Enta": (9.6110, -13.6040, 0),
+    "Simbaya": (9.6190, -13.5980, 0),
+    "Dabompa": (9.6130, -13.5880, 0),
+    "Lansanaya": (9.6440, -13.5950, 0),
+    "Sonfonia": (9.6540, -13.5890, 0),
+    "Cimenterie": (9.6470, -13.5720, 0),
+    "Kagbelen": (9.6830, -13.5310, 0),
+}
+
+
+def _normalize(text: str) -> str:
+    """Minuscules, sans accents, tirets et ponctuation remplacés par des espaces."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+@cache
+def _patterns():
+    # Compilées au premier appel (écriture d'une activité), pas au démarrage du worker.
+    return [
+        (re.compile(rf"\b{re.escape(_normalize(name))}\b"), lat, lng, level)
+        for name, (lat, lng, level) in GAZETTEER.items()
+    ]
+
+
+def locate(text: str) -> tuple[float, float] | None:
+    """Coordonnées du lieu le plus précis cité dans `text`, ou None."""
+    normalized = _normalize(text)
+    best = None
+    for pattern, lat, lng, level in _patterns():
+        match = pattern.search(normalized)
+        if match and (best is None or (level, match.start()) < best[0]):
+            best = ((level, match.start()), lat, lng)
+    return (best[1], best[2]) if best else None
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    h = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def bounding_box(lat: float, lng: float, radius_km: float):
+    """(lat_min, lat_max, lng_min, lng_max) englobant le cercle de rayon `radius_km`."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Près des pôles le cercle couvre toutes les longitudes.
+    cos_lat = math.cos(math.radians(lat))
+    dlng = 180.0 if cos_lat < 1e-9 else min(180.0, dlat / cos_lat)
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def round_km(value):
+    """Distance exposée par l'API: au mètre près (None hors recherche `?near=`)."""
+    return None if value is None else round(value, 3)
+
+
+def distance_expression(lat: float, lng: float):
+    """Haversine en SQL (km) entre (latitude, longitude) de la ligne et le point donné."""
+    phi0 = math.radians(lat)
+    phi = Radians("latitude")
+    h = Power(Sin((phi - phi0) / 2), 2) + math.cos(phi0) * Cos(phi) * Power(
+        Sin((Radians("longitude") - math.radians(lng)) / 2), 2
+    )
+    return ExpressionWrapper(
+        2 * EARTH_RADIUS_KM * ASin(Sqrt(h)), output_field=FloatField()
+    )
+
+
+def near(queryset, lat: float, lng: float, radius_km: float):
+    """
+    Activités à moins de `radius_km` du point, annotées `distance_km`.
+    Le rectangle englobant restreint d'abord les lignes par l'index (latitude,
+    longitude); la distance exacte n'est calculée que pour ces candidates.
+    """
+    lat_min, lat_max, lng_min, lng_max = bounding_box(lat, lng, radius_km)
+    return (
+        queryset.filter(latitude__range=(lat_min, lat_max), longitude__range=(lng_min, lng_max))
+        .annotate(distance_km=distance_expression(lat, lng))
+        .filter(distance_km__lte=radius_km)
+    )
@@ -0,0 +1,298 @@
+"""
+Places disponibles en temps réel: GET /api/live/activities/?ids=1,2,3
+
+Flux Server-Sent Events: à la connexion, l'état courant de chaque activité
+demandée, puis un événement `seats` à chaque inscription ou désinscription, une
+fois la transaction validée. Un commentaire `: ping` part toutes les
+LIVE_HEARTBEAT_SECONDS pour garder la connexion ouverte derrière les proxys.
+Public, comme participants_count dans la liste des activités.
+
+Les messages passent par le pub/sub de sportconnectgn/pubsub.py (un canal par
+activité). Le flux (`stream`) n'est servi que sous ASGI, par `asgi_stream`,
+branché par sportconnectgn/asgi.py avant Django: aucun thread par connexion, des
+milliers d'abonnés inactifs par worker (`manage.py bench_live`). Sous WSGI, un
+flux occuperait un thread par onglet ouvert: la vue `activity_seats_stream`
+répond 503 (sauf LIVE_STREAM_WSGI, pour runserver) et le frontend passe au
+polling. Hors LIVE_STREAMS, aucun flux n'est servi ni publié (503 partout). Sans `Accept: text/event-stream`, la même URL retourne l'état courant en
+JSON (`{"results": [...]}`), sous les deux serveurs.
+"""
+
+import asyncio
+import json
+import logging
+import re
+from urllib.parse import parse_qs, urlsplit
+
+from asgiref.sync import sync_to_async
+from corsheaders.conf import conf as cors_conf
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections, transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.http.request import split_domain_port, validate_host
+from django.views.decorators.http import require_GET
+
+from sportconnectgn.pubsub import get_broker
+
+from .models import Activity
+
+
+logger = logging.getLogger(__name__)
+
+LIVE_PATH = "/api/live/activities/"
+MAX_IDS = 100
+RETRY_MS = 5000
+SEAT_FIELDS = ("id", "participants_count", "nombre_places")
+WSGI_UNAVAILABLE = "Flux indisponible sur ce serveur: interroger sans Accept: text/event-stream."
+STREAM_HEADERS = {
+    "Content-Type": "text/event-stream; charset=utf-8",
+    "Cache-Control": "no-cache",
+    # nginx: ne pas bufferiser le flux.
+    "X-Accel-Buffering": "no",
+}
+
+
+def channel(activity_id: int) -> str:
+    return f"activity:{activity_id}"
+
+
+def seats(row: dict) -> dict:
+    return {
+        "id": row["id"],
+        "participants_count": row["participants_count"],
+        "nombre_places": row["nombre_places"],
+        "is_full": row["participants_count"] >= row["nombre_places"],
+    }
+
+
+def publish_seats(activity_ids) -> None:
+    """Publie l'état des places de ces activités après commit, si quelqu'un les suit."""
+    if not settings.LIVE_STREAMS:
+        return
+    broker = get_broker()
+    ids = [pk for pk in set(activity_ids) if broker.wants(channel(pk))]
+    if not ids:
+        return
+
+    def _publish():
+        for row in Activity.objects.filter(pk__in=ids).values(*SEAT_FIELDS):
+            broker.publish(channel(row["id"]), seats(row))
+
+    transaction.on_commit(_publish)
+
+
+# -- Flux --------------------------------------------------------------------------
+
+
+def parse_ids(raw: str) -> list[int]:
+    try:
+        ids = sorted({int(part) for part in raw.split(",") if part.strip()})
+    except ValueError:
+        raise ValueError("Liste d'identifiants invalide (ex: ids=1,2,3).") from None
+    if not ids:
+        raise ValueError("Ce paramètre est obligatoire.")
+    if len(ids) > MAX_IDS:
+        raise ValueError(f"Au plus {MAX_IDS} activités par flux.")
+    return ids
+
+
+# Lectures d'état initial en attente, par boucle: [(ids, future)].
+_snapshot_batches = {}
+
+
+@sync_to_async
+def _read_seats(ids) -> dict:
+    # Hors cycle requête/réponse de Django (asgi_stream): on gère la connexion nous-mêmes.
+    close_old_connections()
+    return {
+        row["id"]: seats(row)
+        for row in Activity.objects.filter(pk__in=ids).values(*SEAT_FIELDS)
+    }
+
+
+async def _flush_snapshots(loop):
+    await asyncio.sleep(0)  # les connexions du même tour de boucle rejoignent le lot
+    batch = _snapshot_batches.pop(loop)
+    try:
+        state = await _read_seats({pk for ids, _ in batch for pk in ids})
+    except Exception as exc:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
+    else:
+        for ids, future in batch:
+            # Annulée si le client est parti entre-temps.
+            if not future.done():
+                future.set_result([state[pk] for pk in ids if pk in state])
+
+
+async def _snapshot(ids) -> list[dict]:
+    """
+    État initial des places. Les connexions simultanées (reconnexion de tous les
+    clients après un redéploiement…) partagent une seule requête; celles qui
+    arrivent pendant la lecture forment le lot suivant.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    if loop not in _snapshot_batches:
+        _snapshot_batches[loop] = []
+        loop.create_task(_flush_snapshots(loop))
+    _snapshot_batches[loop].append((ids, future))
+    return await future
+
+
+def _event(message: dict) -> str:
+    return f"event: seats\ndata: {json.dumps(message, separators=(',', ':'))}\n\n"
+
+
+async def stream(ids):
+    """Morceaux (str) du flux SSE pour ces activités, jusqu'à la déconnexion."""
+    # Abonnement avant la lecture de l'état initial: aucune écriture ne passe entre les deux.
+    subscription = get_broker().subscribe(channel(pk) for pk in ids)
+    try:
+        yield f"retry: {RETRY_MS}\n\n" + "".join(map(_event, await _snapshot(ids)))
+        while True:
+            pending = await subscription.get(timeout=settings.LIVE_HEARTBEAT_SECONDS)
+            yield "".join(map(_event, pending.values())) if pending else ": ping\n\n"
+    finally:
+        subscription.close()
+
+
+def _iterate_sync(chunks):
+    """
+    Parcours synchrone d'un générateur asynchrone, dans une boucle privée, pour WSGI:
+    un StreamingHttpResponse ne diffuse que les itérateurs du mode du serveur (il
+    consomme les autres en entier avant d'envoyer quoi que ce soit).
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(anext(chunks))
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(chunks.aclose())
+        loop.close()
+
+
+def accepts_stream(accept: str) -> bool:
+    return "text/event-stream" in accept
+
+
+def is_stream_request(scope) -> bool:
+    """Requête ASGI à servir par `asgi_stream`; les lectures JSON passent par Django."""
+    if not settings.LIVE_STREAMS or scope["type"] != "http" or scope["path"] != LIVE_PATH:
+        return False
+    return any(
+        name == b"accept" and accepts_stream(value.decode("latin-1"))
+        for name, value in scope["headers"]
+    )
+
+
+@require_GET
+def activity_seats_stream(request):
+    try:
+        ids = parse_ids(request.GET.get("ids", ""))
+    except ValueError as exc:
+        return JsonResponse({"ids": [str(exc)]}, status=400)
+    if not accepts_stream(request.headers.get("Accept", "")):
+        rows = Activity.objects.filter(pk__in=ids).order_by("pk").values(*SEAT_FIELDS)
+        response = JsonResponse({"results": [seats(row) for row in rows]})
+        response["Cache-Control"] = "no-cache"
+        return response
+    wsgi = not isinstance(request, ASGIRequest)
+    if not settings.LIVE_STREAMS or (wsgi and not settings.LIVE_STREAM_WSGI):
+        return JsonResponse({"detail": WSGI_UNAVAILABLE}, status=503)
+    chunks = stream(ids)
+    if wsgi:
+        chunks = _iterate_sync(chunks)
+    response = StreamingHttpResponse(chunks)
+    for name, value in STREAM_HEADERS.items():
+        response[name] = value
+    return response
+
+
+# -- Application ASGI dédiée -------------------------------------------------------
+
+
+def _cors_headers(origin: str | None) -> dict:
+    """Mêmes origines autorisées que django-cors-headers (CORS_ALLOWED_ORIGINS…)."""
+    if not origin:
+        return {}
+    url = urlsplit(origin)
+    allowed = (
+        cors_conf.CORS_ALLOW_ALL_ORIGINS
+        or f"{url.scheme}://{url.netloc}" in cors_conf.CORS_ALLOWED_ORIGINS
+        or any(re.match(pattern, origin) for pattern in cors_conf.CORS_ALLOWED_ORIGIN_REGEXES)
+    )
+    if not allowed:
+        return {}
+    return {"Access-Control-Allow-Origin": origin, "Vary": "Origin"}
+
+
+async def _respond(send, status: int, headers: dict, body: bytes = b"", more_body=False):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(k.lower().encode(), v.encode("latin-1")) for k, v in headers.items()],
+        }
+    )
+    await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+
+async def _disconnected(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def asgi_stream(scope, receive, send):
+    """
+    Le flux servi sans ASGIHandler. Celui-ci garde, pendant toute la réponse, un
+    thread par requête (ThreadSensitiveContext, où tournent les récepteurs
+    synchrones de request_started): un thread par abonné inactif. Ici, deux tâches
+    asyncio par connexion; ALLOWED_HOSTS et CORS sont vérifiés comme par les
+    middlewares.
+    """
+    headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+    domain, _ = split_domain_port(headers.get("host", ""))
+    if not validate_host(domain, settings.ALLOWED_HOSTS):
+        await _respond(send, 400, {"Content-Type": "text/plain"}, b"Bad Request")
+        return
+    if scope["method"] != "GET":
+        await _respond(send, 405, {"Allow": "GET", "Content-Type": "text/plain"})
+        return
+    cors = _cors_headers(headers.get("origin"))
+    query = parse_qs(scope["query_string"].decode("latin-1"))
+    try:
+        ids = parse_ids(query.get("ids", [""])[-1])
+    except ValueError as exc:
+        body = json.dumps({"ids": [str(exc)]}).encode()
+        await _respond(send, 400, {"Content-Type": "application/json", **cors}, body)
+        return
+
+    events = stream(ids)
+
+    async def pump():
+        async for chunk in events:
+            await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+
+    await _respond(send, 200, {**STREAM_HEADERS, **cors}, more_body=True)
+    pumping = asyncio.create_task(pump())
+    tasks = [pumping, asyncio.create_task(_disconnected(receive))]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await events.aclose()
+        if not pumping.cancelled() and pumping.exception() is not None:
+            logger.error("Flux des places interrompu (ids=%s)", ids, exc_info=pumping.exception())
+        # Fin de réponse: sans elle, le client attendrait la suite (inutile s'il est parti).
+        try:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except Exception:
+            # Connexion déjà fermée par le serveur.
+            pass
@@ -0,0 +1,55 @@
+"""
+Outils partagés par les commandes de benchmark (`bench_*`).
+Les commandes tournent sur une base de test jetable, jamais sur la base de dev.
+"""
+
+from contextlib import contextmanager
+import os
+import tempfile
+from urllib.parse import quote
+
+from django.core.management.base import CommandError
+from django.db import connection
+
+
+@contextmanager
+def isolated_database(verbosity: int = 0):
+    """
+    Crée une base de test (fichier temporaire pour SQLite, afin que plusieurs threads
+    partagent la même base) puis la détruit en sortie.
+    """
+    old_name = connection.settings_dict["NAME"]
+    tmp_path = None
+    if connection.vendor == "sqlite":
+        fd, tmp_path = tempfile.mkstemp(prefix="scgn-bench-", suffix=".sqlite3")
+        os.close(fd)
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = tmp_path
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, keepdb=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity, keepdb=False)
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def database_url(conn) -> str:
+    """URL (dj-database-url) de cette base, pour les process lancés par un banc."""
+    params = conn.settings_dict
+    if conn.vendor == "sqlite":
+        return f"sqlite:///{params['NAME']}"
+    if conn.vendor == "postgresql":
+        user = quote(params["USER"] or "")
+        password = quote(params["PASSWORD"] or "")
+        host = params["HOST"] or "localhost"
+        port = params["PORT"] or "5432"
+        return f"postgres://{user}:{password}@{host}:{port}/{quote(params['NAME'])}"
+    raise CommandError(f"Base non prise en charge par le banc: {conn.vendor}")
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
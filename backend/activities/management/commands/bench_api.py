@@ -0,0 +1,246 @@
+import io
+import json
+from pathlib import Path
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from activities.models import Activity, Participation, Sport
+from sportconnectgn.urls import router
+
+from ._bench import isolated_database, percentile
+from .seed_demo import Command as SeedCommand
+
+
+User = get_user_model()
+
+# Réécrite par --update-baseline: chaque réécriture committée dit, dans son message,
+# quels endpoints gagnent ou perdent des requêtes (ou de la latence) et pourquoi.
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "api_baseline.json"
+
+# Tailles de page comparées pour détecter les N+1 (le nombre de requêtes doit être stable).
+SMALL_PAGE, LARGE_PAGE = 5, 50
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de régression de l'API: nombre de requêtes SQL, latence p50/p95 et "
+        "taille des réponses pour chaque endpoint du router (base de test jetable). "
+        "Échoue en cas de N+1, de requête SQL de plus que la baseline ou de latence p50/p95 "
+        "au-delà de la tolérance (un dépassement est remesuré avant d'être retenu)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=300)
+        parser.add_argument("--activities", type=int, default=1000)
+        parser.add_argument("--participations-per-activity", type=int, default=15)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Écrit les mesures courantes comme nouvelle baseline.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Hausse de latence p50/p95 tolérée (0.5 = +50%%).",
+        )
+
+    def handle(self, *args, **options):
+        baseline_path = Path(options["baseline"])
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        failures = []
+
+        with isolated_database(), override_settings(
+            API_CACHE_ENABLED=False, ALLOWED_HOSTS=["testserver"]
+        ):
+            self.seed(options)
+            scenarios = self.scenarios()
+            self.check_coverage(scenarios)
+            client = Client()
+            results = {}
+
+            for name, (path, who, paginated) in scenarios.items():
+                headers = self.auth_headers(who)
+                if paginated:
+                    small = self.query_count(client, self.with_page(path, SMALL_PAGE), headers)
+                    large = self.query_count(client, self.with_page(path, LARGE_PAGE), headers)
+                    if large > small:
+                        failures.append(
+                            f"{name}: N+1 ({small} requêtes pour {SMALL_PAGE} lignes, "
+                            f"{large} pour {LARGE_PAGE})"
+                        )
+                results[name] = self.measure(client, path, headers, options["repeat"])
+
+            if baseline and not options["update_baseline"]:
+                # Machine bruitée: un dépassement de latence n'est retenu que s'il se
+                # confirme à la mesure suivante.
+                for name in self.slow(results, baseline, options["tolerance"]):
+                    path, who, _ = scenarios[name]
+                    headers = self.auth_headers(who)
+                    results[name] = self.measure(client, path, headers, options["repeat"])
+
+        self.report(results, baseline)
+
+        if options["update_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Baseline écrite: {baseline_path}"))
+        elif baseline:
+            failures += self.compare(results, baseline, options["tolerance"])
+        else:
+            self.stdout.write(
+                self.style.WARNING(f"Pas de baseline ({baseline_path}); --update-baseline.")
+            )
+
+        if failures:
+            raise CommandError("Régressions détectées:\n- " + "\n- ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Aucune régression."))
+
+    # -- Données -----------------------------------------------------------------------
+
+    def seed(self, options):
+        seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+        seeder.seed_demo()
+        seeder.seed_volume(
+            options["users"], options["activities"], options["participations_per_activity"]
+        )
+        self.member = User.objects.create(username="bench-member")
+        self.staff = User.objects.create(username="bench-staff", is_staff=True)
+        # Le membre a beaucoup de réservations et a créé des activités (pour `mine`).
+        activities = list(Activity.objects.order_by("-date_heure")[: LARGE_PAGE * 2])
+        Participation.objects.bulk_create(
+            [Participation(user=self.member, activity=a) for a in activities],
+            ignore_conflicts=True,
+        )
+        Activity.objects.filter(pk__in=[a.pk for a in activities[:LARGE_PAGE]]).update(
+            created_by=self.member
+        )
+        Activity.objects.all().sync_participants_count()
+        self.activity = activities[0]
+        self.participation = Participation.objects.filter(user=self.member).first()
+        self.sport = Sport.objects.first()
+
+    def scenarios(self):
+        """nom -> (chemin, utilisateur, paginé)"""
+        return {
+            "users-me": ("/api/users/me/", self.member, False),
+            "users-list": ("/api/users/", self.staff, True),
+            "users-detail": (f"/api/users/{self.member.pk}/", self.staff, False),
+            "sports-list": ("/api/sports/", None, True),
+            "sports-detail": (f"/api/sports/{self.sport.pk}/", None, False),
+            "activities-list-anon": ("/api/activities/", None, True),
+            "activities-list": ("/api/activities/", self.member, True),
+            "activities-detail": (f"/api/activities/{self.activity.pk}/", self.member, False),
+            "activities-mine": ("/api/activities/mine/", self.member, False),
+            "activities-search": ("/api/activities/search/?q=match", self.member, True),
+            "participations-list": ("/api/participations/", self.member, True),
+            "participations-list-staff": ("/api/participations/", self.staff, True),
+            "participations-detail": (
+                f"/api/participations/{self.participation.pk}/",
+                self.member,
+                False,
+            ),
+        }
+
+    def check_coverage(self, scenarios):
+        covered = {path.split("/")[2] for path, _, _ in scenarios.values()}
+        missing = [prefix for prefix, _, _ in router.registry if prefix not in covered]
+        if missing:
+            raise CommandError(f"Endpoints sans scénario de benchmark: {', '.join(missing)}")
+
+    # -- Mesures -----------------------------------------------------------------------
+
+    def auth_headers(self, user):
+        if user is None:
+            return {}
+        return {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+    @staticmethod
+    def with_page(path, size):
+        # search utilise `limit`, les listes `page_size`.
+        param = "limit" if "/search/" in path else "page_size"
+        sep = "&" if "?" in path else "?"
+        return f"{path}{sep}{param}={size}"
+
+    def query_count(self, client, path, headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(path, **headers)
+        if response.status_code != 200:
+            raise CommandError(f"{path}: HTTP {response.status_code}")
+        return len(ctx.captured_queries)
+
+    def measure(self, client, path, headers, repeat):
+        timings = []
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(path, **headers)
+        queries = len(ctx.captured_queries)
+        for _ in range(repeat):
+            started = time.perf_counter()
+            client.get(path, **headers)
+            timings.append((time.perf_counter() - started) * 1000)
+        return {
+            "queries": queries,
+            "p50_ms": round(percentile(timings, 50), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "bytes": len(response.content),
+        }
+
+    def report(self, results, baseline):
+        self.stdout.write(
+            f"{'endpoint':28} {'req':>4} {'p50 ms':>8} {'p95 ms':>8} {'baseline':>9} "
+            f"{'octets':>9}"
+        )
+        for name, r in results.items():
+            ref = baseline.get(name)
+            ref_p95 = f"{ref['p95_ms']:>9.2f}" if ref else f"{'-':>9}"
+            self.stdout.write(
+                f"{name:28} {r['queries']:>4} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+                f"{ref_p95} {r['bytes']:>9}"
+            )
+
+    @staticmethod
+    def latency_limits(ref, tolerance):
+        # Marges absolues: les endpoints rapides varient de quelques ms d'un lancement à
+        # l'autre, p95 (queue de distribution) plus que p50.
+        return ref["p50_ms"] * (1 + tolerance) + 2, ref["p95_ms"] * (1 + tolerance) + 5
+
+    def slow(self, results, baseline, tolerance):
+        names = []
+        for name, current in results.items():
+            ref = baseline.get(name)
+            if ref is None:
+                continue
+            p50_limit, p95_limit = self.latency_limits(ref, tolerance)
+            if current["p50_ms"] > p50_limit or current["p95_ms"] > p95_limit:
+                names.append(name)
+        return names
+
+    def compare(self, results, baseline, tolerance):
+        failures = []
+        for name, current in results.items():
+            ref = baseline.get(name)
+            if ref is None:
+                continue
+            if current["queries"] > ref["queries"]:
+                failures.append(
+                    f"{name}: {current['queries']} requêtes (baseline {ref['queries']})"
+                )
+            p50_limit, p95_limit = self.latency_limits(ref, tolerance)
+            if current["p50_ms"] > p50_limit:
+                failures.append(
+                    f"{name}: p50 {current['p50_ms']:.1f} ms (baseline {ref['p50_ms']:.1f} ms)"
+                )
+            if current["p95_ms"] > p95_limit:
+                failures.append(
+                    f"{name}: p95 {current['p95_ms']:.1f} ms (baseline {ref['p95_ms']:.1f} ms)"
+                )
+        return failures
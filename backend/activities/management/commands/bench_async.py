@@ -0,0 +1,323 @@
+import asyncio
+import collections
+import io
+import itertools
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from types import ModuleType
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from activities.models import Activity
+from sportconnectgn import urls
+
+from ._bench import isolated_database, percentile
+from .seed_demo import Command as SeedCommand
+
+
+User = get_user_model()
+
+# En-têtes comparés entre vues synchrones et asynchrones.
+COMPARED_HEADERS = ("content-type", "etag", "last-modified", "vary", "allow", "content-encoding")
+
+
+def _urlconf(name, urlpatterns):
+    module = ModuleType(name)
+    module.urlpatterns = urlpatterns
+    return module
+
+
+SYNC_URLCONF = _urlconf("bench_async_sync", urls.urlpatterns)
+ASYNC_URLCONF = _urlconf("bench_async_async", urls.async_urlpatterns + urls.urlpatterns)
+
+
+class Result:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def key(self):
+        return self.status, self.body, tuple(self.headers.get(name) for name in COMPARED_HEADERS)
+
+
+def call_wsgi(application, path, query, headers) -> Result:
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "testserver",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.url_scheme": "http",
+    }
+    for name, value in headers.items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+    started = []
+
+    def start_response(status, response_headers, exc_info=None):
+        started.append((int(status.split()[0]), response_headers))
+
+    chunks = application(environ, start_response)
+    try:
+        body = b"".join(chunks)
+    finally:
+        chunks.close()  # request_finished: connexions rendues comme sous gunicorn
+    status, response_headers = started[0]
+    return Result(status, {k.lower(): v for k, v in response_headers}, body)
+
+
+async def call_asgi(application, path, query, headers) -> Result:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"testserver")]
+        + [(name.lower().encode(), value.encode("latin-1")) for name, value in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    received = asyncio.Event()
+    response = {"body": []}
+
+    async def receive():
+        if not received.is_set():
+            received.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Future()  # jamais de déconnexion
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {
+                k.decode("latin-1").lower(): v.decode("latin-1") for k, v in message["headers"]
+            }
+        else:
+            response["body"].append(message.get("body", b""))
+
+    await application(scope, receive, send)
+    return Result(response["status"], response["headers"], b"".join(response["body"]))
+
+
+class SimulatedLatency:
+    """
+    Base distante: `seconds` avant chaque requête SQL, et `connect_seconds` à
+    l'ouverture de chaque connexion (TCP + TLS + authentification).
+    """
+
+    current = None
+
+    def __init__(self, seconds: float, connect_seconds: float):
+        self.seconds = seconds
+        self.connect_seconds = connect_seconds
+        self.connections = itertools.count()
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+    def install(self, sender, connection, **kwargs):
+        next(self.connections)
+        time.sleep(self.connect_seconds)
+        connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        SimulatedLatency.current = self
+        connection_created.connect(self.install)
+        return self
+
+    def __exit__(self, *exc):
+        connection_created.disconnect(self.install)
+        SimulatedLatency.current = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Lectures chaudes de l'API (activités, sports, users/me): vues DRF synchrones "
+        "contre vues asynchrones (API_ASYNC_VIEWS). Vérifie que les réponses sont "
+        "identiques, puis compare les débits à nombre de workers égal avec une latence "
+        "simulée par requête SQL: WSGI (un client à la fois par worker, comme gunicorn "
+        "en workers sync), ASGI avec les vues synchrones, ASGI avec les vues asynchrones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Requêtes simultanées par worker ASGI."
+        )
+        parser.add_argument("--requests", type=int, default=600)
+        parser.add_argument("--latency-ms", type=float, default=10.0)
+        parser.add_argument(
+            "--connect-ms",
+            type=float,
+            default=0.0,
+            help="Ouverture d'une connexion (ASGI: une par requête, sauf pool).",
+        )
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # Cache désactivé: chaque requête atteint la base, c'est ce qu'on mesure.
+        with isolated_database(), override_settings(
+            DEBUG=False,
+            API_CACHE_ENABLED=False,
+            ALLOWED_HOSTS=["testserver"],
+            SECURE_SSL_REDIRECT=False,
+        ):
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(200, 2000, 3)
+            # Import tardif: les modules construisent leurs middlewares avec les réglages du banc.
+            from sportconnectgn import asgi, wsgi
+
+            self.wsgi, self.asgi = wsgi.application, asgi.application
+            requests = self.build_requests(rng)
+            self.check_identical(requests)
+            self.benchmark([rng.choice(requests) for _ in range(options["requests"])], options)
+
+    def build_requests(self, rng):
+        users = list(User.objects.order_by("?")[:20])
+        tokens = [{"authorization": f"Bearer {AccessToken.for_user(user)}"} for user in users]
+        activities = list(Activity.objects.values_list("pk", flat=True))
+        requests = []
+        for _ in range(60):
+            auth = rng.choice([{}, *tokens])
+            requests += [
+                ("/api/activities/", "", auth),
+                ("/api/activities/", "upcoming=1&page_size=10", auth),
+                ("/api/activities/", f"near=9.53,-13.68&radius={rng.choice([2, 5])}", auth),
+                (f"/api/activities/{rng.choice(activities)}/", "", auth),
+                ("/api/sports/", "", auth),
+            ]
+            requests.append(("/api/users/me/", "", rng.choice(tokens)))
+        return requests
+
+    def check_identical(self, requests):
+        """Mêmes statut, corps et en-têtes, y compris les 304 sur If-None-Match."""
+        for path, query, headers in requests:
+            with override_settings(ROOT_URLCONF=SYNC_URLCONF):
+                expected = call_wsgi(self.wsgi, path, query, headers)
+            with override_settings(ROOT_URLCONF=ASYNC_URLCONF):
+                got = asyncio.run(call_asgi(self.asgi, path, query, headers))
+                revalidated = asyncio.run(
+                    call_asgi(
+                        self.asgi, path, query, {**headers, "if-none-match": got.headers["etag"]}
+                    )
+                )
+            if got.key() != expected.key():
+                raise CommandError(f"{path}?{query}: réponse asynchrone différente")
+            if revalidated.status != 304:
+                raise CommandError(f"{path}?{query}: pas de 304 sur If-None-Match")
+        self.stdout.write(
+            self.style.SUCCESS(f"{len(requests)} réponses identiques (et 304 à la revalidation).")
+        )
+
+    def benchmark(self, requests, options):
+        workers, concurrency = options["workers"], options["concurrency"]
+        self.stdout.write(
+            f"{len(requests)} requêtes, {workers} workers, latence SQL simulée "
+            f"{options['latency_ms']:g} ms, connexion {options['connect_ms']:g} ms "
+            f"(ASGI: {concurrency} requêtes simultanées par worker)\n"
+            f"{'':24} {'req/s':>7} {'p50':>8} {'p95':>8} {'connexions':>10} {'threads':>7}"
+        )
+        runs = (
+            ("WSGI, vues synchrones", SYNC_URLCONF, self.run_wsgi),
+            ("ASGI, vues synchrones", SYNC_URLCONF, self.run_asgi),
+            ("ASGI, vues asynchrones", ASYNC_URLCONF, self.run_asgi),
+        )
+        for label, urlconf, run in runs:
+            with override_settings(ROOT_URLCONF=urlconf), SimulatedLatency(
+                options["latency_ms"] / 1000, options["connect_ms"] / 1000
+            ):
+                results = self.in_processes(run, requests, workers, concurrency)
+            timings = [ms for result in results for ms in result["timings"]]
+            if len(timings) != len(requests):
+                raise CommandError(f"{label}: {len(requests) - len(timings)} requêtes en échec")
+            elapsed = max(result["elapsed"] for result in results)
+            self.stdout.write(
+                f"{label:24} {len(requests) / elapsed:>7.0f} {percentile(timings, 50):>6.1f}ms "
+                f"{percentile(timings, 95):>6.1f}ms "
+                f"{sum(result['connections'] for result in results):>10} "
+                f"{max(result['threads'] for result in results):>7}"
+            )
+
+    @staticmethod
+    def in_processes(run, requests, workers, concurrency):
+        """
+        Un process par worker (comme gunicorn), chacun avec sa part des requêtes:
+        des threads partageraient le GIL et plafonneraient tous les modes au même débit.
+        """
+        connections.close_all()  # pas de connexion héritée par les process fils
+        context = multiprocessing.get_context("fork")
+        results = context.SimpleQueue()
+
+        def worker(share):
+            latency = SimulatedLatency.current
+            opened = next(latency.connections)
+            started = time.perf_counter()
+            timings, threads = run(share, concurrency)
+            results.put(
+                {
+                    "timings": timings,
+                    "elapsed": time.perf_counter() - started,
+                    "connections": next(latency.connections) - opened - 1,
+                    "threads": threads,
+                }
+            )
+
+        processes = [
+            context.Process(target=worker, args=(requests[i::workers],)) for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        out = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        return out
+
+    def run_wsgi(self, requests, concurrency):
+        """Un client à la fois: un worker gunicorn synchrone."""
+        timings = []
+        for path, query, headers in requests:
+            started = time.perf_counter()
+            if call_wsgi(self.wsgi, path, query, headers).status == 200:
+                timings.append((time.perf_counter() - started) * 1000)
+        return timings, threading.active_count()
+
+    def run_asgi(self, requests, concurrency):
+        """`concurrency` clients simultanés sur la boucle du worker."""
+        pending = collections.deque(requests)
+        timings, threads = [], [threading.active_count()]
+
+        async def client():
+            while pending:
+                path, query, headers = pending.popleft()
+                started = time.perf_counter()
+                if (await call_asgi(self.asgi, path, query, headers)).status == 200:
+                    timings.append((time.perf_counter() - started) * 1000)
+                threads.append(threading.active_count())
+
+        async def worker():
+            await asyncio.gather(*(client() for _ in range(concurrency)))
+
+        asyncio.run(worker())
+        return timings, max(threads)
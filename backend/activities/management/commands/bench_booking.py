@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+
+from activities.booking import BookingError, book_activity
+from activities.models import Activity, Participation, Sport
+
+from ._bench import isolated_database
+
+
+User = get_user_model()
+
+
+def booking_scenario(places: int, attempts: int):
+    """Une activité de `places` places et ses candidats (dont 10 % de doublons)."""
+    creator = User.objects.create(username="bench-creator")
+    sport = Sport.objects.create(name="Football")
+    activity = Activity.objects.create(
+        titre="Match très demandé",
+        sport=sport,
+        date_heure=timezone.now() + timedelta(days=1),
+        lieu="Kaloum",
+        nombre_places=places,
+        created_by=creator,
+    )
+    users = User.objects.bulk_create([User(username=f"bench-{i}") for i in range(attempts)])
+    # Une tentative sur dix rejoue un utilisateur déjà servi (double réservation).
+    return activity, users + users[: attempts // 10]
+
+
+def concurrent_bookings(activity, bookers, threads: int) -> dict:
+    """Réserve en parallèle pour chaque candidat; nombre de réservations par issue."""
+    results = {"ok": 0, BookingError.FULL: 0, BookingError.ALREADY_BOOKED: 0}
+    lock = threading.Lock()
+
+    def attempt(user):
+        try:
+            book_activity(user, activity)
+            outcome = "ok"
+        except BookingError as e:
+            outcome = e.code
+        finally:
+            connections.close_all()
+        with lock:
+            results[outcome] += 1
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(attempt, bookers))
+    return results
+
+
+def capacity_violation(activity, results, expected: int) -> str | None:
+    """Message si participations, compteur et succès ne valent pas tous `expected`."""
+    activity.refresh_from_db()
+    rows = Participation.objects.filter(activity=activity).count()
+    if rows == activity.participants_count == results["ok"] == expected:
+        return None
+    return (
+        f"Invariant violé: {rows} participations, compteur={activity.participants_count}, "
+        f"succès={results['ok']}, attendu={expected}"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress test du moteur de réservation: N réservations concurrentes sur une "
+        "seule activité, vérifie l'invariant de capacité (base de test jetable). "
+        "Aussi vérifié par les tests (activities/tests.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--places", type=int, default=50)
+        parser.add_argument("--attempts", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=16)
+
+    def handle(self, *args, **options):
+        places = options["places"]
+        attempts = options["attempts"]
+        threads = options["threads"]
+
+        with isolated_database():
+            activity, bookers = booking_scenario(places, attempts)
+            started = time.perf_counter()
+            results = concurrent_bookings(activity, bookers, threads)
+            elapsed = time.perf_counter() - started
+            violation = capacity_violation(activity, results, min(places, attempts))
+
+        self.stdout.write(
+            f"{connection.vendor}: {len(bookers)} tentatives / {threads} threads en "
+            f"{elapsed:.2f}s ({len(bookers) / elapsed:.0f} req/s) -> {results}"
+        )
+        if violation:
+            raise CommandError(violation)
+        self.stdout.write(self.style.SUCCESS("Invariant de capacité respecté."))
@@ -0,0 +1,272 @@
+import collections
+import importlib.util
+import io
+import json
+import os
+from pathlib import Path
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ._bench import database_url, isolated_database
+from .seed_demo import Command as SeedCommand
+
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "startup_baseline.json"
+
+# Profils de réglages comparés: variables d'environnement du process mesuré.
+PROFILES = {
+    "complet": {"DJANGO_API_ONLY": "0"},
+    "api-seule": {"DJANGO_API_ONLY": "1"},
+}
+
+# Modules lourds qui ne doivent pas être importés avant la première réponse
+# (Pillow: au premier upload de photo, accounts/thumbnails.py).
+LAZY_MODULES = ("PIL",)
+
+LOCAL_APPS = ("accounts", "activities", "sportconnectgn")
+PROJECT_MODULES = [
+    str(path)
+    for app in LOCAL_APPS
+    for path in (Path(settings.BASE_DIR) / app).glob("*.py")
+]
+
+# Process mesuré: démarrage d'un worker (import de sportconnectgn.wsgi, comme gunicorn),
+# la première requête, servie par l'application elle-même, puis des requêtes à chaud.
+BOOT = """\
+import io, json, os, sys, time
+WARM_REQUESTS = 50
+started = time.time()
+from sportconnectgn.wsgi import application
+ready = time.time()
+from django.urls import get_resolver
+get_resolver().url_patterns
+routed = time.time()
+path, _, query = os.environ["BENCH_PATH"].partition("?")
+environ = {
+    "REQUEST_METHOD": "GET", "SCRIPT_NAME": "", "PATH_INFO": path, "QUERY_STRING": query,
+    "SERVER_NAME": "127.0.0.1", "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1",
+    "HTTP_HOST": "127.0.0.1", "HTTP_X_FORWARDED_PROTO": "https", "wsgi.input": io.BytesIO(),
+    "wsgi.errors": sys.stderr, "wsgi.url_scheme": "http",
+}
+statuses = []
+def call():
+    chunks = application(
+        {**environ, "wsgi.input": io.BytesIO()},
+        lambda status, headers, exc_info=None: statuses.append(status),
+    )
+    b"".join(chunks)
+    chunks.close()
+call()
+responded = time.time()
+modules = sorted(sys.modules)
+warm = []
+for _ in range(WARM_REQUESTS):
+    tick = time.perf_counter()
+    call()
+    warm.append(time.perf_counter() - tick)
+print(json.dumps({
+    "started": started, "ready": ready, "routed": routed, "responded": responded,
+    "warm": sorted(warm)[len(warm) // 2], "status": statuses[0], "modules": modules,
+}))
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def app_of(module: str) -> str:
+    """Regroupement du rapport: application Django, app locale ou paquet."""
+    parts = module.split(".")
+    if parts[0] == "django":
+        if parts[1:2] == ["contrib"] and len(parts) > 2:
+            return ".".join(parts[:3])
+        return "django"
+    return parts[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Démarrage à froid d'un worker (ex: instance Render réveillée): temps jusqu'à la "
+        "première réponse par profil de réglages (complet, DJANGO_API_ONLY), découpé en "
+        "phases, et temps d'import (python -X importtime) regroupé par application. "
+        "Échoue si un module lourd est importé avant la première réponse ou en cas de "
+        "régression par rapport à la baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=7)
+        parser.add_argument("--path", default="/api/activities/")
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Écrit les mesures courantes comme nouvelle baseline.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.3,
+            help="Hausse tolérée du temps jusqu'à la première réponse (0.3 = +30%%).",
+        )
+
+    def handle(self, *args, **options):
+        baseline_path = Path(options["baseline"])
+        failures = []
+        with isolated_database():
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(50, 300, 2)
+            env = {
+                **os.environ,
+                "DATABASE_URL": database_url(connection),
+                "DJANGO_ALLOWED_HOSTS": "127.0.0.1",
+                "BENCH_PATH": options["path"],
+                # Requêtes à chaud: le coût de la vue et des middlewares, pas du cache.
+                "API_CACHE_ENABLED": "0",
+            }
+            # Profils en alternance: une variation de charge de la machine les touche tous.
+            runs = {profile: [] for profile in PROFILES}
+            samples = {profile: [] for profile in PROFILES}
+            for _ in range(options["runs"]):
+                for profile, profile_env in PROFILES.items():
+                    runs[profile].append(self.boot({**env, **profile_env}))
+                    samples[profile].append(self.import_times({**env, **profile_env}))
+        results = {profile: self.summarize(profile_runs) for profile, profile_runs in runs.items()}
+        imports = {profile: self.median_by_app(s) for profile, s in samples.items()}
+        for profile, profile_runs in runs.items():
+            loaded = [m for m in LAZY_MODULES if m in profile_runs[0]["modules"]]
+            if loaded:
+                failures.append(f"{profile}: importés avant la 1re réponse: {loaded}")
+
+        self.report(results, imports, options)
+
+        if options["update_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Baseline écrite: {baseline_path}"))
+        elif baseline_path.exists():
+            failures += self.compare(results, json.loads(baseline_path.read_text()), options)
+        else:
+            self.stdout.write(
+                self.style.WARNING(f"Pas de baseline ({baseline_path}); --update-baseline.")
+            )
+
+        if failures:
+            raise CommandError("Régressions détectées:\n- " + "\n- ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Aucune régression."))
+
+    # -- Mesures -----------------------------------------------------------------------
+
+    def run_boot(self, env, *python_args):
+        spawned = time.time()
+        process = subprocess.run(
+            [sys.executable, *python_args, "-c", BOOT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise CommandError("Démarrage en échec:\n" + process.stderr[-2000:])
+        return spawned, json.loads(process.stdout.splitlines()[-1]), process.stderr
+
+    def boot(self, env) -> dict:
+        spawned, run, _ = self.run_boot(env)
+        if not run["status"].startswith("200"):
+            raise CommandError(f"Première réponse: {run['status']}")
+        run["spawned"] = spawned
+        return run
+
+    @staticmethod
+    def summarize(runs) -> dict:
+        def median_ms(start, end):
+            return round(statistics.median((r[end] - r[start]) * 1000 for r in runs), 1)
+
+        return {
+            "interpreter_ms": median_ms("spawned", "started"),
+            "application_ms": median_ms("started", "ready"),
+            "urlconf_ms": median_ms("ready", "routed"),
+            "first_request_ms": median_ms("routed", "responded"),
+            "ttfr_ms": median_ms("spawned", "responded"),
+            "warm_request_ms": round(statistics.median(r["warm"] for r in runs) * 1000, 2),
+            "modules": len(runs[0]["modules"]),
+        }
+
+    def import_times(self, env) -> collections.Counter:
+        """Temps d'import propre (self) des modules, cumulé par application, en ms."""
+        _, _, stderr = self.run_boot(env, "-X", "importtime")
+        totals = collections.Counter()
+        for line in stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                totals[app_of(match[4])] += int(match[1]) / 1000
+        return totals
+
+    @staticmethod
+    def median_by_app(samples) -> dict:
+        apps = set().union(*samples)
+        return {app: statistics.median(s.get(app, 0) for s in samples) for app in apps}
+
+    # -- Rapport -----------------------------------------------------------------------
+
+    def report(self, results, imports, options):
+        profiles = list(results)
+        self.stdout.write(
+            f"Première réponse ({options['path']}), médiane de {options['runs']} démarrages:\n"
+            f"{'':18}" + "".join(f"{p:>12}" for p in profiles)
+        )
+        for key, label in (
+            ("interpreter_ms", "interpréteur"),
+            ("application_ms", "application"),
+            ("urlconf_ms", "URLconf restante"),
+            ("first_request_ms", "1re requête"),
+            ("ttfr_ms", "total"),
+        ):
+            values = "".join(f"{results[p][key]:>10.0f}ms" for p in profiles)
+            self.stdout.write(f"{label:18}{values}")
+        values = "".join(f"{results[p]['warm_request_ms']:>10.1f}ms" for p in profiles)
+        self.stdout.write(f"{'requête à chaud':18}{values}")
+        self.stdout.write(
+            f"{'modules chargés':18}" + "".join(f"{results[p]['modules']:>12}" for p in profiles)
+        )
+
+        self.stdout.write(
+            f"\nImports par application (ms, -X importtime), {options['top']} premières:"
+        )
+        ranked = collections.Counter()
+        for totals in imports.values():
+            ranked.update(totals)
+        for app, _ in ranked.most_common(options["top"]):
+            marker = " *" if app in LOCAL_APPS else ""
+            values = "".join(f"{imports[p].get(app, 0):>12.1f}" for p in profiles)
+            self.stdout.write(f"{app + marker:30}{values}")
+        totals = "".join(f"{sum(imports[p].values()):>12.1f}" for p in profiles)
+        self.stdout.write(f"{'total (* = code du projet)':30}{totals}")
+        if not all(Path(importlib.util.cache_from_source(f)).exists() for f in PROJECT_MODULES):
+            self.stdout.write(
+                self.style.WARNING(
+                    "Bytecode du projet absent (PYTHONDONTWRITEBYTECODE, conteneur neuf): "
+                    "compilé à chaque démarrage, voir `python -m compileall` (render.yaml)."
+                )
+            )
+
+    def compare(self, results, baseline, options):
+        failures = []
+        for profile, current in results.items():
+            ref = baseline.get(profile)
+            if ref is None:
+                continue
+            # Marge absolue de 50 ms: un démarrage varie d'un lancement à l'autre.
+            limit = ref["ttfr_ms"] * (1 + options["tolerance"]) + 50
+            if current["ttfr_ms"] > limit:
+                failures.append(
+                    f"{profile}: première réponse en {current['ttfr_ms']:.0f} ms "
+                    f"(baseline {ref['ttfr_ms']:.0f} ms)"
+                )
+        return failures
@@ -0,0 +1,78 @@
+import gzip
+import io
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from sportconnectgn import compression
+
+from ._bench import isolated_database, percentile
+from .seed_demo import Command as SeedCommand
+
+
+User = get_user_model()
+
+PAGES = {
+    "activities-20": "/api/activities/?page_size=20",
+    "activities-100": "/api/activities/?page_size=100",
+    "participations-20": "/api/participations/?page_size=20",
+    "users-20": "/api/users/?page_size=20",
+}
+# (encodage, niveau): gzip 1-9, Brotli 0-11.
+LEVELS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 1), ("br", 4), ("br", 6), ("br", 11)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Octets économisés et temps CPU de compression par réponse, pour des pages de "
+        "liste typiques, selon l'encodage (gzip/Brotli) et le niveau."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        levels = [(enc, lvl) for enc, lvl in LEVELS if enc in compression.available_encodings()]
+
+        with isolated_database(), override_settings(
+            API_CACHE_ENABLED=False, ALLOWED_HOSTS=["testserver"]
+        ):
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(200, 1000, 10)
+            staff = User.objects.create(username="bench-staff", is_staff=True)
+            headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(staff)}"}
+            client = Client()
+            bodies = {}
+            for name, path in PAGES.items():
+                plain = client.get(path, **headers)
+                bodies[name] = plain.content
+                # Bout en bout: le middleware négocie, compresse et le contenu est intact.
+                response = client.get(path, HTTP_ACCEPT_ENCODING="gzip", **headers)
+                if response.get("Content-Encoding") != "gzip" or (
+                    gzip.decompress(response.content) != plain.content
+                ):
+                    raise CommandError(f"{path}: réponse gzip invalide")
+
+        self.stdout.write(
+            f"{'page':18} {'encodage':9} {'octets':>8} {'gain':>6} {'CPU p50':>9} {'CPU p95':>9}"
+        )
+        for name, body in bodies.items():
+            self.stdout.write(f"{name:18} {'identity':9} {len(body):>8}")
+            for encoding, level in levels:
+                with override_settings(
+                    COMPRESSION_GZIP_LEVEL=level, COMPRESSION_BROTLI_QUALITY=level
+                ):
+                    timings = []
+                    for _ in range(repeat):
+                        started = time.process_time()
+                        out = compression.compress(body, encoding)
+                        timings.append((time.process_time() - started) * 1000)
+                saved = 100 * (1 - len(out) / len(body))
+                self.stdout.write(
+                    f"{'':18} {f'{encoding}-{level}':9} {len(out):>8} {saved:>5.0f}% "
+                    f"{percentile(timings, 50):>7.2f}ms {percentile(timings, 95):>7.2f}ms"
+                )
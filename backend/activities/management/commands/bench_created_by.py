@@ -0,0 +1,90 @@
+import io
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from accounts.serializers import UserSerializer
+from activities.models import Activity
+from activities.serializers import ActivitySerializer
+from activities.views import ActivityViewSet
+
+from ._bench import isolated_database, percentile
+from .seed_demo import Command as SeedCommand
+
+
+User = get_user_model()
+
+BIO = (
+    "Joueur du dimanche, toujours partant pour un match à Kipé ou un footing sur la "
+    "corniche. Disponible le soir après 18h, niveau correct, bonne ambiance avant tout."
+)
+
+
+class FullCreatorActivitySerializer(ActivitySerializer):
+    """Représentation d'avant: profil complet du créateur dans chaque activité."""
+
+    created_by = UserSerializer(read_only=True)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare, sur une page d'activités, created_by complet (UserSerializer, toutes "
+        "les colonnes) et le profil public (PublicUserSerializer + .only())."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        size = options["page_size"]
+        repeat = options["repeat"]
+
+        with isolated_database():
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(200, max(size * 5, 500), 5)
+            # Profils réalistes: bio et photo renseignées.
+            User.objects.update(bio=BIO, photo_profil="profiles/avatar.jpg")
+
+            request = Request(RequestFactory().get("/api/activities/"))
+            view = ActivityViewSet(request=request, format_kwarg=None, action="list")
+            order = ("-date_heure", "-id")
+            variants = {
+                "complet": (
+                    lambda: Activity.objects.select_related("sport", "created_by"),
+                    FullCreatorActivitySerializer,
+                ),
+                "public": (view.get_queryset, ActivitySerializer),
+            }
+
+            results = {}
+            for label, (queryset, serializer_class) in variants.items():
+                def render():
+                    page = list(queryset().order_by(*order)[:size])
+                    data = serializer_class(page, many=True, context={"request": request}).data
+                    return JSONRenderer().render(data)
+
+                with CaptureQueriesContext(connection) as ctx:
+                    body = render()
+                columns = ctx.captured_queries[0]["sql"].split(" FROM ")[0].count(",") + 1
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    render()
+                    timings.append((time.perf_counter() - started) * 1000)
+                results[label] = (len(body), columns, timings)
+
+        self.stdout.write(f"Page de {size} activités (requête + sérialisation + JSON):")
+        for label, (size_bytes, columns, timings) in results.items():
+            self.stdout.write(
+                f"  {label:8} {size_bytes:>8} octets  {columns:>3} colonnes  "
+                f"p50={percentile(timings, 50):6.2f}ms  p95={percentile(timings, 95):6.2f}ms"
+            )
+        full, public = results["complet"][0], results["public"][0]
+        self.stdout.write(f"Gain: {100 * (full - public) / full:.0f}% d'octets en moins.")
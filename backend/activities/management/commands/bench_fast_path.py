@@ -0,0 +1,204 @@
+from datetime import timedelta
+import io
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, RequestFactory, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework_simplejwt.tokens import AccessToken
+
+from activities import fastpath
+from activities.models import Activity, Sport
+from activities.serializers import ActivitySerializer, ParticipationSerializer
+from activities.views import ActivityViewSet, ParticipationViewSet
+
+from ._bench import isolated_database, percentile
+from .seed_demo import Command as SeedCommand
+
+
+User = get_user_model()
+
+ROW_COUNTS = (20, 100, 500)
+TEXTES = [
+    "",
+    "Kipé",
+    "Séance «matinale» à 6h — bonne humeur 💪",
+    'Guillemets "et" \\ antislash',
+]
+
+
+def seed_edge_cases(rng, users: int, activities: int, participations: int) -> list:
+    """
+    Données de volume plus cas limites: textes spéciaux, photos (traitées ou non),
+    microsecondes, activités complètes, sport sans activité. Retourne les
+    utilisateurs à tester (anonyme, membres, un staff).
+    """
+    seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+    seeder.seed_volume(users, activities, participations)
+    people = list(User.objects.all())
+    for user in rng.sample(people, min(60, len(people))):
+        user.bio = rng.choice(TEXTES)
+        user.first_name = rng.choice(TEXTES) or user.first_name
+        user.photo_profil = rng.choice(["", "profiles/a.jpg", "profiles/é t.png"])
+        if user.photo_profil and rng.random() < 0.5:
+            user.photo_thumbnails = {
+                size: f"profiles/thumbs/abc_{size}.webp" for size in ("small", "medium")
+            }
+    User.objects.bulk_update(people, ["bio", "first_name", "photo_profil", "photo_thumbnails"])
+    rows = list(Activity.objects.all())
+    for activity in rng.sample(rows, min(200, len(rows))):
+        activity.titre = rng.choice(TEXTES) or activity.titre
+        activity.description = rng.choice(TEXTES)
+        activity.date_heure += timedelta(microseconds=rng.randint(0, 999_999))
+        activity.nombre_places = rng.choice([activity.participants_count, 1, 50])
+    Activity.objects.bulk_update(rows, ["titre", "description", "date_heure", "nombre_places"])
+    Sport.objects.create(name="Roller")
+    return [None] + rng.sample(people, min(20, len(people))) + [
+        User.objects.create(username="bench-staff", is_staff=True)
+    ]
+
+
+def random_path(rng, user):
+    paths = ["/api/activities/"]
+    if user is not None:
+        paths += ["/api/activities/mine/", "/api/participations/"]
+    path = rng.choice(paths)
+    params = {"page_size": rng.choice([1, 5, 20, 100])}
+    if path == "/api/activities/":
+        if rng.random() < 0.3:
+            params["sport"] = rng.choice(list(Sport.objects.values_list("slug", flat=True)))
+        if rng.random() < 0.3:
+            params["upcoming"] = "1"
+        if rng.random() < 0.2:
+            params["q"] = rng.choice(["match", "kipé", "séance"])
+        if rng.random() < 0.3:
+            params["near"] = rng.choice(["9.594,-13.653", "9.509,-13.712"])
+            params["radius"] = rng.choice([1, 3, 10])
+    return path, params
+
+
+def equivalence_failure(rng, cases: int, users) -> str | None:
+    """
+    Compare, sur `cases` requêtes tirées au hasard, les réponses (et la page suivante)
+    avec et sans fast path, cache de l'API actif ou non. Décrit le premier écart.
+    """
+    client = Client()
+    cache = caches[settings.API_CACHE_ALIAS]
+    for i in range(cases):
+        user = rng.choice(users)
+        headers = {}
+        if user is not None:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(user)}"
+        path, params = random_path(rng, user)
+        use_cache = rng.random() < 0.3
+        bodies = []
+        for fast in (False, True):
+            cache.clear()
+            with override_settings(API_FAST_PATH=fast, API_CACHE_ENABLED=use_cache):
+                response = client.get(path, params, **headers)
+            if response.status_code != 200:
+                return f"{path} {params}: HTTP {response.status_code}"
+            # La page suivante (curseur construit à partir des dicts) aussi.
+            data = response.json()
+            nxt = data.get("next") if isinstance(data, dict) else None
+            if nxt:
+                with override_settings(API_FAST_PATH=fast, API_CACHE_ENABLED=use_cache):
+                    response_next = client.get(nxt, **headers)
+                bodies.append(response.content + b"\n" + response_next.content)
+            else:
+                bodies.append(response.content)
+        if bodies[0] != bodies[1]:
+            return (
+                f"Cas {i}: sortie différente pour {path} {params} "
+                f"(utilisateur {getattr(user, 'pk', None)}, cache={use_cache})"
+            )
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie sur des cas aléatoires que le fast path (activities/fastpath.py) "
+        "produit exactement les mêmes octets que les serializers, puis mesure le "
+        "gain à 20/100/500 lignes. L'équivalence est aussi vérifiée par les tests "
+        "(activities/tests.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cases", type=int, default=300)
+        parser.add_argument("--repeat", type=int, default=30)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with isolated_database(), override_settings(ALLOWED_HOSTS=["testserver"]):
+            users = seed_edge_cases(rng, 150, 800, 8)
+            failure = equivalence_failure(rng, options["cases"], users)
+            if failure:
+                raise CommandError(failure)
+            self.stdout.write(
+                self.style.SUCCESS(f"{options['cases']} cas aléatoires: sorties identiques.")
+            )
+            self.benchmark(options["repeat"])
+
+    # -- Benchmark ---------------------------------------------------------------------
+
+    def benchmark(self, repeat):
+        # Vue staff: les participations d'un seul membre ne suffisent pas pour 500 lignes.
+        request = Request(RequestFactory().get("/api/"))
+        request.user = User.objects.get(username="bench-staff")
+        renderer = JSONRenderer()
+        order = ("-date_heure", "-id")
+        variants = {
+            "activities": (
+                ActivityViewSet(request=request, format_kwarg=None, action="list"),
+                ActivitySerializer,
+                fastpath.activity_values,
+                lambda rows: fastpath.activities(rows, request),
+            ),
+            "participations": (
+                ParticipationViewSet(request=request, format_kwarg=None, action="list"),
+                ParticipationSerializer,
+                fastpath.participation_values,
+                lambda rows: fastpath.participations(rows, request),
+            ),
+        }
+
+        self.stdout.write(
+            f"{'liste':16} {'lignes':>6} {'serializer':>11} {'fast path':>10} {'gain':>6}"
+        )
+        for name, (view, serializer_class, values, render) in variants.items():
+            for count in ROW_COUNTS:
+                queryset = view.get_queryset()
+                if name == "activities":
+                    queryset = queryset.order_by(*order)
+                else:
+                    queryset = queryset.order_by("-id")
+
+                def slow():
+                    rows = list(queryset[:count])
+                    context = {"request": request, "view": view}
+                    data = serializer_class(rows, many=True, context=context).data
+                    return renderer.render(data)
+
+                def fast():
+                    return renderer.render(render(list(values(queryset)[:count])))
+
+                if slow() != fast():
+                    raise CommandError(f"{name} ({count} lignes): sorties différentes")
+                timings = {}
+                for label, func in (("slow", slow), ("fast", fast)):
+                    samples = []
+                    for _ in range(repeat):
+                        started = time.perf_counter()
+                        func()
+                        samples.append((time.perf_counter() - started) * 1000)
+                    timings[label] = percentile(samples, 50)
+                self.stdout.write(
+                    f"{name:16} {count:>6} {timings['slow']:>9.2f}ms {timings['fast']:>8.2f}ms "
+                    f"{timings['slow'] / timings['fast']:>5.1f}x"
+                )
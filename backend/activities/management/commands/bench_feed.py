@@ -0,0 +1,143 @@
+import io
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, F
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from activities import bulk, recommend
+from activities.booking import BookingError, book_activity
+from activities.models import Activity, Participation, SportAffinity
+
+from ._bench import isolated_database, percentile
+from .seed_demo import QUARTIERS, Command as SeedCommand
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Fil « Pour toi »: vérifie que les affinités tenues à jour au fil des "
+        "inscriptions égalent un recalcul complet, puis compare le fil (candidates "
+        "indexées + score en mémoire) à un classement naïf de toutes les activités à venir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--activities", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=30)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with isolated_database(), override_settings(
+            API_CACHE_ENABLED=False, ALLOWED_HOSTS=["testserver"]
+        ):
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(2000, options["activities"], 8)
+            users = list(User.objects.order_by("?")[: options["users"]])
+            for user in users:
+                user.quartier = rng.choice(QUARTIERS + [""])
+            User.objects.bulk_update(users, ["quartier"])
+            self.check_incremental(rng, users)
+            self.benchmark(users)
+
+    # -- Affinités -------------------------------------------------------------------
+
+    def check_incremental(self, rng, users):
+        upcoming = list(
+            Activity.objects.filter(date_heure__gte=timezone.now()).values_list("pk", flat=True)
+        )
+        for user in users:
+            for pk in rng.sample(upcoming, 5):
+                try:
+                    book_activity(user, Activity.objects.get(pk=pk))
+                except BookingError:
+                    pass
+            mine = list(Participation.objects.filter(user=user)[:3])
+            for participation in rng.sample(mine, min(2, len(mine))):
+                participation.delete()
+            items = [{"activity": pk} for pk in rng.sample(upcoming, 5)]
+            bulk.book_many(user, items)
+
+        expected = {
+            (row["user_id"], row["activity__sport_id"]): row["n"]
+            for row in Participation.objects.order_by()
+            .values("user_id", "activity__sport_id")
+            .annotate(n=Count("pk"))
+        }
+        stored = {
+            (user_id, sport_id): n
+            for user_id, sport_id, n in SportAffinity.objects.filter(
+                participations__gt=0
+            ).values_list("user_id", "sport_id", "participations")
+        }
+        if stored != expected:
+            raise CommandError("Affinités incrémentales différentes du recalcul complet.")
+        self.stdout.write(self.style.SUCCESS("Affinités incrémentales = recalcul complet."))
+
+    # -- Fil -------------------------------------------------------------------------
+
+    def naive_feed(self, user, limit):
+        """Référence: toutes les activités à venir classées, sans vivier."""
+        affinity, level, origin = recommend.profile(user)
+        now = timezone.now()
+        joined = set(
+            Participation.objects.filter(user=user).values_list("activity_id", flat=True)
+        )
+        rows = [
+            row
+            for row in Activity.objects.filter(
+                date_heure__gte=now,
+                date_heure__lt=now + recommend.HORIZON,
+                participants_count__lt=F("nombre_places"),
+            )
+            .exclude(created_by=user)
+            .values_list(*recommend.CANDIDATE_COLUMNS)
+            if row[0] not in joined
+        ]
+        ranked = recommend.rank(rows, affinity, level, origin)
+        return [row[0] for row in ranked[:limit]], len(rows)
+
+    def benchmark(self, users):
+        client = Client()
+        timings = {"feed": [], "naive": [], "api": []}
+        overlap, queries, sizes = [], [], []
+        for user in users:
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as ctx:
+                ids = recommend.feed(user, 20)
+            timings["feed"].append((time.perf_counter() - started) * 1000)
+            queries.append(len(ctx.captured_queries))
+
+            started = time.perf_counter()
+            reference, size = self.naive_feed(user, 20)
+            timings["naive"].append((time.perf_counter() - started) * 1000)
+            sizes.append(size)
+            if reference:
+                overlap.append(len(set(ids) & set(reference)) / len(reference))
+
+            headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+            started = time.perf_counter()
+            response = client.get("/api/activities/for-you/", **headers)
+            timings["api"].append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"for-you: HTTP {response.status_code}")
+
+        self.stdout.write(
+            f"{Activity.objects.count():,} activités, {len(users)} utilisateurs; "
+            f"{percentile(sizes, 50):,} activités à venir classables (p50)"
+        )
+        for label, values in timings.items():
+            p50, p95 = percentile(values, 50), percentile(values, 95)
+            self.stdout.write(f"  {label:6} p50 {p50:7.1f}ms  p95 {p95:7.1f}ms")
+        self.stdout.write(
+            f"  requêtes par fil: {max(queries)}; top 20 commun avec le classement naïf: "
+            f"{100 * sum(overlap) / max(1, len(overlap)):.0f}%"
+        )
@@ -0,0 +1,101 @@
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from activities import geo
+from activities.models import Activity
+
+from ._bench import isolated_database, percentile
+from .seed_demo import QUARTIERS, Command as SeedCommand
+
+
+RADII_KM = (1, 2, 5, 10)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recherche `?near=` sur un gros volume d'activités: vérifie le résultat contre "
+        "un calcul haversine exhaustif en Python, puis compare préfiltre rectangulaire "
+        "(index latitude/longitude) et parcours complet, par rayon."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--activities", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with isolated_database(), override_settings(
+            API_CACHE_ENABLED=False, ALLOWED_HOSTS=["testserver"]
+        ):
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(2000, options["activities"], 1)
+            points = [self.random_point(rng) for _ in range(options["repeat"])]
+            self.check_exact(points[:5])
+            self.benchmark(points)
+
+    @staticmethod
+    def random_point(rng):
+        lat, lng = geo.locate(rng.choice(QUARTIERS))
+        return lat + rng.uniform(-0.01, 0.01), lng + rng.uniform(-0.01, 0.01)
+
+    def check_exact(self, points):
+        # Tolérance: SQL et Python n'arrondissent pas les flottants à l'identique.
+        tolerance = 1e-9
+        rows = list(Activity.objects.values_list("id", "latitude", "longitude"))
+        for lat, lng in points:
+            distances = {pk: geo.haversine_km(lat, lng, a, b) for pk, a, b in rows}
+            for radius in RADII_KM:
+                found = list(
+                    geo.near(Activity.objects.all(), lat, lng, radius)
+                    .order_by("distance_km", "id")
+                    .values_list("id", "distance_km")
+                )
+                expected = {pk for pk, d in distances.items() if d <= radius}
+                missing = expected.symmetric_difference(pk for pk, _ in found)
+                if (
+                    any(abs(distances[pk] - radius) > tolerance for pk in missing)
+                    or any(abs(distances[pk] - d) > tolerance for pk, d in found)
+                    or any(a[1] > b[1] for a, b in zip(found, found[1:]))
+                ):
+                    raise CommandError(f"near={lat},{lng} radius={radius}: résultat inexact")
+        self.stdout.write(self.style.SUCCESS("Résultats identiques au calcul exhaustif."))
+
+    def benchmark(self, points):
+        client = Client()
+        self.stdout.write(
+            f"{Activity.objects.count():,} activités; p50/p95 sur {len(points)} points\n"
+            f"{'rayon':>6} {'résultats':>9} {'page (index)':>17} {'page (scan)':>17} "
+            f"{'API':>17}"
+        )
+        for radius in RADII_KM:
+            timings = {"index": [], "scan": [], "api": []}
+            matches = []
+            for lat, lng in points:
+                prefiltered = geo.near(Activity.objects.all(), lat, lng, radius)
+                scan = Activity.objects.annotate(
+                    distance_km=geo.distance_expression(lat, lng)
+                ).filter(distance_km__lte=radius)
+                for label, queryset in (("index", prefiltered), ("scan", scan)):
+                    started = time.perf_counter()
+                    list(queryset.order_by("distance_km", "id").values("id", "distance_km")[:20])
+                    timings[label].append((time.perf_counter() - started) * 1000)
+                matches.append(prefiltered.count())
+
+                started = time.perf_counter()
+                response = client.get(
+                    "/api/activities/", {"near": f"{lat},{lng}", "radius": radius}
+                )
+                timings["api"].append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f"near: HTTP {response.status_code}")
+
+            cells = " ".join(
+                f"{percentile(values, 50):>7.1f}/{percentile(values, 95):>6.1f}ms"
+                for values in timings.values()
+            )
+            self.stdout.write(f"{radius:>4}km {percentile(matches, 50):>9} {cells}")
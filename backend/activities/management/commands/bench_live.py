@@ -0,0 +1,244 @@
+import asyncio
+import gc
+import io
+import json
+import random
+import threading
+import time
+import tracemalloc
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.test import override_settings
+
+from activities.booking import book_activity
+from activities.models import Activity
+from sportconnectgn.pubsub import get_broker
+
+from ._bench import isolated_database, percentile
+from .seed_demo import Command as SeedCommand
+
+
+User = get_user_model()
+
+
+def _rss_kb() -> int:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+class Subscriber:
+    """Client SSE simulé: parle ASGI directement à l'application, sans réseau."""
+
+    __slots__ = (
+        "ids", "hot", "seen", "count", "status", "ready", "changed", "flowing",
+        "_requested", "_closed",
+    )
+
+    def __init__(self, ids, hot):
+        self.ids = ids
+        self.hot = hot
+        self.seen = set()
+        self.count = None  # dernier participants_count reçu pour `hot`
+        self.status = None
+        self.ready = asyncio.Event()
+        self.changed = asyncio.Event()
+        # Effacé: le client ne lit plus (tampon TCP plein), send() reste bloqué.
+        self.flowing = asyncio.Event()
+        self.flowing.set()
+        self._requested = False
+        self._closed = asyncio.Event()
+
+    def scope(self):
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "https",
+            "path": "/api/live/activities/",
+            "raw_path": b"/api/live/activities/",
+            "root_path": "",
+            "query_string": ("ids=" + ",".join(map(str, self.ids))).encode(),
+            "headers": [(b"host", b"testserver"), (b"accept", b"text/event-stream")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 443),
+        }
+
+    async def receive(self):
+        if not self._requested:
+            self._requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self._closed.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        await self.flowing.wait()
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            if self.status != 200:
+                self.ready.set()
+            return
+        for block in message.get("body", b"").decode().split("\n\n"):
+            if block.startswith("event: seats"):
+                data = json.loads(block.partition("data: ")[2])
+                self.seen.add(data["id"])
+                if data["id"] == self.hot:
+                    self.count = data["participants_count"]
+                    self.changed.set()
+        if len(self.seen) == len(self.ids):
+            self.ready.set()
+
+    def disconnect(self):
+        self._closed.set()
+
+
+class Command(BaseCommand):
+    help = (
+        "Flux temps réel des places (/api/live/activities/): ouvre des milliers "
+        "d'abonnés SSE sur l'application ASGI en process, mesure la mémoire par "
+        "abonné, la latence de diffusion d'une inscription et la mémoire après "
+        "une rafale de publications (messages fusionnés par activité)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, default=5000)
+        parser.add_argument("--ids", type=int, default=5, help="Activités suivies par abonné.")
+        parser.add_argument("--rounds", type=int, default=30)
+        parser.add_argument("--burst", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--via-django",
+            action="store_true",
+            help="Servir le flux par ASGIHandler (middlewares) au lieu de asgi_stream.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # DEBUG=False: pas de journal des requêtes SQL dans les mesures mémoire.
+        with isolated_database(), override_settings(
+            DEBUG=False,
+            API_CACHE_ENABLED=False,
+            ALLOWED_HOSTS=["testserver"],
+            SECURE_SSL_REDIRECT=False,
+            LIVE_BROKER="sportconnectgn.pubsub.InProcessBroker",
+            LIVE_HEARTBEAT_SECONDS=3600,
+            LIVE_STREAMS=True,
+        ):
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(options["rounds"] + options["burst"] + 10, 2000, 2)
+            # Activité suivie par tous les abonnés, assez grande pour toutes les inscriptions.
+            hot = Activity.objects.order_by("pk").first()
+            Activity.objects.filter(pk=hot.pk).update(
+                nombre_places=F("participants_count") + 10_000
+            )
+            others = list(Activity.objects.exclude(pk=hot.pk).values_list("pk", flat=True))
+            users = list(
+                User.objects.exclude(pk=hot.created_by_id).exclude(participations__activity=hot)
+            )
+            subscriptions = [
+                [hot.pk] + rng.sample(others, options["ids"] - 1)
+                for _ in range(options["subscribers"])
+            ]
+            asyncio.run(self.run(hot.pk, subscriptions, users, options))
+
+    async def run(self, hot, subscriptions, users, options):
+        # Import tardif: le module construit l'application (middlewares) avec les réglages du banc.
+        from sportconnectgn import asgi
+
+        application = asgi.django_application if options["via_django"] else asgi.application
+        broker = get_broker()
+        n = len(subscriptions)
+        threads_before = threading.active_count()
+
+        # 1. Connexion: mémoire par abonné inactif (serveur + client simulé).
+        gc.collect()
+        tracemalloc.start()
+        heap_before, rss_before = tracemalloc.get_traced_memory()[0], _rss_kb()
+        subscribers = [Subscriber(ids, hot) for ids in subscriptions]
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(application(s.scope(), s.receive, s.send)) for s in subscribers
+        ]
+        await asyncio.gather(*(s.ready.wait() for s in subscribers))
+        connect_s = time.perf_counter() - started
+        if any(s.status != 200 for s in subscribers):
+            raise CommandError("Flux refusé (statut HTTP différent de 200).")
+        gc.collect()
+        heap_idle, rss_idle = tracemalloc.get_traced_memory()[0], _rss_kb()
+        tracemalloc.stop()
+        self.stdout.write(
+            f"{n:,} abonnés x {options['ids']} activités connectés en {connect_s:.1f}s "
+            f"(sous tracemalloc); {broker.subscriber_count():,} abonnements; "
+            f"threads {threads_before} -> {threading.active_count()}"
+        )
+        self.stdout.write(
+            f"  mémoire par abonné inactif: {(heap_idle - heap_before) / n / 1024:.1f} Ko "
+            f"(tas Python), {(rss_idle - rss_before) / n:.1f} Ko (RSS)"
+        )
+
+        # 2. Diffusion: une inscription sur l'activité suivie par tous.
+        book = sync_to_async(book_activity, thread_sensitive=False)
+        writes, fanout = [], []
+        for user in users[: options["rounds"]]:
+            for s in subscribers:
+                s.changed.clear()
+            activity = await Activity.objects.aget(pk=hot)
+            started = time.perf_counter()
+            await book(user, activity)
+            writes.append((time.perf_counter() - started) * 1000)
+            await asyncio.gather(*(s.changed.wait() for s in subscribers))
+            fanout.append((time.perf_counter() - started) * 1000)
+        for label, values in (("inscription", writes), (f"-> {n:,} abonnés", fanout)):
+            self.stdout.write(
+                f"  {label:17} p50 {percentile(values, 50):6.1f}ms  "
+                f"p95 {percentile(values, 95):6.1f}ms"
+            )
+
+        # 3. Rafale pendant qu'un abonné sur deux ne lit plus: sa file reste bornée.
+        stalled = subscribers[::2]
+        for s in stalled:
+            s.flowing.clear()
+        burst_users = users[options["rounds"] : options["rounds"] + options["burst"]]
+
+        def burst():
+            for user in burst_users:
+                book_activity(user, Activity.objects.get(pk=hot))
+
+        gc.collect()
+        tracemalloc.start()
+        await sync_to_async(burst, thread_sensitive=False)()
+        await asyncio.sleep(0.5)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        expected = await Activity.objects.values_list("participants_count", flat=True).aget(
+            pk=hot
+        )
+        for s in stalled:
+            s.changed.clear()
+            s.flowing.set()
+        await asyncio.sleep(0.5)
+        stale = sum(1 for s in subscribers if s.count != expected)
+        self.stdout.write(
+            f"  rafale de {len(burst_users)} inscriptions, {len(stalled):,} abonnés bloqués: "
+            f"mémoire {growth / 1024:+.0f} Ko, {stale} abonné(s) en retard après reprise"
+        )
+        if stale:
+            raise CommandError("Des abonnés n'ont pas reçu le dernier état.")
+
+        # 4. Déconnexion: plus aucun abonnement.
+        for s in subscribers:
+            s.disconnect()
+        await asyncio.gather(*tasks)
+        if broker.subscriber_count():
+            raise CommandError("Abonnements restants après déconnexion.")
+        self.stdout.write(self.style.SUCCESS("Tous les abonnés ont reçu le dernier état."))
@@ -0,0 +1,70 @@
+import io
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from sportconnectgn.renderers import MessagePackRenderer, ORJSONRenderer
+
+from ._bench import isolated_database, percentile
+from .seed_demo import Command as SeedCommand
+
+
+User = get_user_model()
+
+RENDERERS = {
+    "drf-json": JSONRenderer(),
+    "orjson": ORJSONRenderer(),
+    "msgpack": MessagePackRenderer(),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Temps de rendu et taille des réponses de liste selon le renderer "
+        "(JSONRenderer de DRF, orjson, MessagePack). Vérifie aussi que la sortie "
+        "orjson est identique octet pour octet à celle de DRF."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        size = options["page_size"]
+        repeat = options["repeat"]
+
+        with isolated_database(), override_settings(
+            API_CACHE_ENABLED=False, ALLOWED_HOSTS=["testserver"]
+        ):
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(200, max(size * 5, 500), 10)
+            staff = User.objects.create(username="bench-staff", is_staff=True)
+            headers = {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(staff)}"}
+            client = Client()
+            payloads = {}
+            for name in ("activities", "participations", "users", "sports"):
+                response = client.get(f"/api/{name}/?page_size={size}", **headers)
+                if response.status_code != 200:
+                    raise CommandError(f"/api/{name}/: HTTP {response.status_code}")
+                payloads[name] = response.data
+
+        self.stdout.write(f"{'liste':16} {'renderer':10} {'octets':>9} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, data in payloads.items():
+            reference = RENDERERS["drf-json"].render(data)
+            if RENDERERS["orjson"].render(data) != reference:
+                raise CommandError(f"{name}: la sortie orjson diffère de celle de DRF")
+            for label, renderer in RENDERERS.items():
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    body = renderer.render(data)
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(
+                    f"{name:16} {label:10} {len(body):>9} "
+                    f"{percentile(timings, 50):>8.3f} {percentile(timings, 95):>8.3f}"
+                )
+        self.stdout.write(self.style.SUCCESS("Sortie orjson identique à DRF."))
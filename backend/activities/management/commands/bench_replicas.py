@@ -0,0 +1,233 @@
+import io
+import json
+import os
+from pathlib import Path
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ._bench import isolated_database
+from .seed_demo import Command as SeedCommand
+
+
+# Process mesuré: DATABASE_URL (base principale) et DATABASE_REPLICA_URLS (copie figée de
+# celle-ci, donc une réplique qui ne rattrape jamais son retard), requêtes par le
+# client de test de Django, requêtes SQL comptées par alias.
+SCENARIO = """\
+import asyncio, json, os, time
+import django
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sportconnectgn.settings")
+django.setup()
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.test import AsyncClient, Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.models import CustomUser
+from activities.models import Activity
+
+ASYNC = os.environ["API_ASYNC_VIEWS"] == "1"
+queries = {alias: 0 for alias in connections}
+# Connexions de tous les threads (vues asynchrones: requêtes SQL dans un thread).
+def counted(sender, connection, **kwargs):
+    def count(execute, sql, params, many, context):
+        queries[connection.alias] += 1
+        return execute(sql, params, many, context)
+    connection.execute_wrappers.append(count)
+connection_created.connect(counted)
+
+users = list(CustomUser.objects.order_by("id")[:5])
+a, b = users[0], users[1]
+activity = (
+    Activity.objects.filter(date_heure__gt=timezone.now())
+    .filter(nombre_places__gt=F("participants_count"))
+    .exclude(participations__user=a)
+    .order_by("id")
+    .first()
+)
+client = AsyncClient() if ASYNC else Client()
+
+def call(method, path, user=None, data=None):
+    headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"} if user else {}
+    for alias in queries:
+        queries[alias] = 0
+    response = getattr(client, method)(
+        path, data, content_type="application/json", headers=headers
+    )
+    if ASYNC:
+        response = asyncio.run(response)
+    body = json.loads(response.content) if response.content else None
+    return {"status": response.status_code, "queries": dict(queries), "body": body}
+
+detail = f"/api/activities/{activity.pk}/"
+steps = []
+def step(label, *args, **kwargs):
+    result = call(*args, **kwargs)
+    body = result.pop("body")
+    if isinstance(body, dict) and "has_joined" in body:
+        result["has_joined"] = body["has_joined"]
+    steps.append({"label": label, **result})
+
+step("anonyme: liste", "get", "/api/activities/")
+step("anonyme: liste (cache)", "get", "/api/activities/")
+step("A: users/me", "get", "/api/users/me/", a)
+step("B: détail X", "get", detail, b)
+step("A: détail X", "get", detail, a)
+step("A: réserve X", "post", "/api/participations/", a, {"activity": activity.pk})
+step("A: détail X aussitôt", "get", detail, a)
+step("B: détail X", "get", detail, b)
+step("A: users/me aussitôt", "get", "/api/users/me/", a)
+time.sleep(int(os.environ["REPLICA_PIN_SECONDS"]) + 0.5)
+step("A: détail X, pin expiré", "get", detail, a)
+step("B: détail X, plus tard", "get", detail, b)
+
+paths = [
+    "/api/activities/", "/api/activities/?upcoming=1", detail, "/api/sports/", "/api/users/me/"
+]
+mixed = {alias: 0 for alias in queries}
+for i in range(int(os.environ["BENCH_REQUESTS"])):
+    path = paths[i % len(paths)]
+    user = users[i % len(users)] if i % 3 or path == "/api/users/me/" else None
+    result = call("get", path, user)
+    if result["status"] != 200:
+        raise SystemExit(f"{path}: {result['status']}")
+    for alias, n in result["queries"].items():
+        mixed[alias] += n
+print(json.dumps({"steps": steps, "mixed": mixed}))
+"""
+
+
+def _participations(path) -> int:
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT COUNT(*) FROM activities_participation").fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Routage des lectures vers une réplique (DATABASE_REPLICA_URLS), vérifié avec deux "
+        "fichiers SQLite: la réplique est une copie figée de la base principale. Contrôle "
+        "que les écritures restent sur la principale, que l'auteur d'une réservation "
+        "relit sur la principale pendant REPLICA_PIN_SECONDS (has_joined juste), comme "
+        "tous les lecteurs du scope modifié (ETag cohérent avec les données), et "
+        "mesure la part des requêtes de lecture déchargées sur la réplique, avec les vues "
+        "synchrones puis asynchrones (API_ASYNC_VIEWS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--pin-seconds", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Banc local: base SQLite requise (copiée comme réplique).")
+        failures = []
+        with isolated_database(), tempfile.TemporaryDirectory(prefix="scgn-replica-") as tmp:
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(20, 200, 2)
+            primary = connection.settings_dict["NAME"]
+            for mode, async_views in (("vues synchrones", "0"), ("vues asynchrones", "1")):
+                replica = str(Path(tmp, f"replica-{async_views}.sqlite3"))
+                with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+                    source.backup(target)
+                before = _participations(primary)
+                env = {
+                    **os.environ,
+                    "DATABASE_URL": f"sqlite:///{primary}",
+                    "DATABASE_REPLICA_URLS": f"sqlite:///{replica}",
+                    "REPLICA_PIN_SECONDS": str(options["pin_seconds"]),
+                    "API_ASYNC_VIEWS": async_views,
+                    "DJANGO_ALLOWED_HOSTS": "testserver",
+                    "BENCH_REQUESTS": str(options["requests"]),
+                }
+                result = self.run_scenario(env)
+                self.report(mode, result, options)
+                failures += [f"{mode}: {failure}" for failure in self.verify(result["steps"])]
+                if _participations(primary) != before + 1:
+                    failures.append(f"{mode}: réservation absente de la base principale")
+                if _participations(replica) != before:
+                    failures.append(f"{mode}: la réplique a reçu une écriture")
+
+        if failures:
+            raise CommandError("Routage incorrect:\n- " + "\n- ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Lectures, écritures et pin: routage correct."))
+
+    def run_scenario(self, env) -> dict:
+        process = subprocess.run(
+            [sys.executable, "-c", SCENARIO],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise CommandError("Scénario en échec:\n" + process.stderr[-2000:])
+        return json.loads(process.stdout.splitlines()[-1])
+
+    def report(self, mode, result, options):
+        self.stdout.write(
+            f"\n{mode}: requêtes SQL par base\n"
+            f"{'':26}{'statut':>7}{'default':>9}{'réplique':>10}{'has_joined':>12}"
+        )
+        for step in result["steps"]:
+            queries = step["queries"]
+            replica = sum(n for alias, n in queries.items() if alias != "default")
+            joined = step.get("has_joined", "")
+            self.stdout.write(
+                f"{step['label']:26}{step['status']:>7}{queries['default']:>9}"
+                f"{replica:>10}{str(joined):>12}"
+            )
+        mixed = result["mixed"]
+        replica = sum(n for alias, n in mixed.items() if alias != "default")
+        total = replica + mixed["default"]
+        share = replica / total * 100 if total else 0.0
+        self.stdout.write(
+            f"{options['requests']} lectures mêlées (anonymes, 5 utilisateurs): "
+            f"{mixed['default']} requêtes sur default, {replica} sur la réplique "
+            f"({share:.0f} % déchargées)."
+        )
+
+    @staticmethod
+    def verify(steps) -> list[str]:
+        failures = []
+        by_label = {}
+        for step in steps:
+            by_label.setdefault(step["label"], []).append(step)
+
+        def replica(step):
+            return sum(n for alias, n in step["queries"].items() if alias != "default")
+
+        def expect(condition, message):
+            if not condition:
+                failures.append(message)
+
+        for step in steps:
+            expect(step["status"] in (200, 201), f"{step['label']}: statut {step['status']}")
+        cached = by_label["anonyme: liste (cache)"][0]
+        expect(cached["queries"]["default"] == 0, "liste en cache: lue sur default")
+        expect(replica(cached) == 0, "liste en cache: requêtes sur la réplique")
+        expect(replica(by_label["B: détail X"][0]) > 0, "B: pas de lecture sur la réplique")
+        before = by_label["A: détail X"][0]
+        expect(before["has_joined"] is False, "A: has_joined avant réservation")
+        # Seule l'authentification (sans cache partagé) reste sur default.
+        expect(replica(before) > 0, "A: détail X lu sur default sans écriture")
+        booking = by_label["A: réserve X"][0]
+        expect(replica(booking) == 0, "réservation: requêtes sur la réplique")
+        after = by_label["A: détail X aussitôt"][0]
+        expect(after["has_joined"] is True, "A: has_joined faux juste après la réservation")
+        expect(replica(after) == 0, "A: relu sur la réplique juste après avoir écrit")
+        # Nouvel ETag dès le commit: B ne doit pas l'associer à l'état figé de la réplique.
+        after_other = by_label["B: détail X"][-1]
+        expect(replica(after_other) == 0, "B: réplique lue juste après l'écriture")
+        later = by_label["B: détail X, plus tard"][0]
+        expect(replica(later) > 0, "B: scope toujours sur default après REPLICA_PIN_SECONDS")
+        # La réplique est figée: sans le pin, A y lit l'état d'avant sa réservation.
+        expired = by_label["A: détail X, pin expiré"][0]
+        expect(replica(expired) > 0, "A: pin toujours actif après REPLICA_PIN_SECONDS")
+        expect(expired["has_joined"] is False, "A: lecture après le pin faite sur default")
+        return failures
@@ -0,0 +1,110 @@
+from datetime import timedelta
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from activities import search
+from activities.models import Activity, Sport
+
+from ._bench import isolated_database, percentile
+
+
+User = get_user_model()
+
+QUARTIERS = ["Kaloum", "Dixinn", "Matam", "Ratoma", "Matoto", "Kipé", "Nongo", "Lambanyi"]
+SPORTS = ["Football", "Basket", "Running", "Fitness", "Volley", "Tennis", "Natation"]
+MOTS = [
+    "match", "détente", "entraînement", "tournoi", "séance", "matinale", "plage",
+    "terrain", "quartier", "débutants", "confirmés", "ambiance", "cardio", "équipe",
+]
+SYLLABES = ["ka", "lo", "mu", "di", "xi", "ta", "ba", "ko", "fa", "ri", "so", "ne", "gu", "ya"]
+# Fréquent, sélectif, très sélectif, combiné, absent.
+QUERIES = ["kipé", "natation", "kalomu", "tournoi kalomu", "introuvable"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare la recherche plein texte (tsvector / FTS5) à icontains sur un gros "
+        "volume d'activités (base de test jetable)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        repeat = options["repeat"]
+        rng = random.Random(42)
+
+        with isolated_database():
+            creator = User.objects.create(username="bench-creator")
+            sports = [Sport.objects.create(name=name) for name in SPORTS]
+            # Vocabulaire large: la plupart des mots sont rares, comme dans de vrais textes.
+            vocab = MOTS + [
+                "".join(rng.choices(SYLLABES, k=3)) for _ in range(3000)
+            ]
+            now = timezone.now()
+            batch = []
+            for i in range(rows):
+                batch.append(
+                    Activity(
+                        titre=" ".join(rng.sample(vocab, 3)).capitalize(),
+                        sport=rng.choice(sports),
+                        date_heure=now + timedelta(minutes=i),
+                        lieu=rng.choice(QUARTIERS),
+                        nombre_places=10,
+                        description=" ".join(rng.choices(vocab, k=12)),
+                        created_by=creator,
+                    )
+                )
+                if len(batch) >= 5000:
+                    Activity.objects.bulk_create(batch)
+                    batch = []
+            Activity.objects.bulk_create(batch)
+
+            started = time.perf_counter()
+            search.reindex()
+            self.stdout.write(
+                f"{connection.vendor}: {rows} activités indexées en "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+
+            base = Activity.objects.order_by("-date_heure", "-id")
+            for q in QUERIES:
+                icontains = base
+                for term in q.split():
+                    icontains = icontains.filter(
+                        Q(titre__icontains=term)
+                        | Q(lieu__icontains=term)
+                        | Q(description__icontains=term)
+                        | Q(sport__name__icontains=term)
+                    )
+                fulltext = search.filter_queryset(base, q)
+                ranked = search.rank_queryset(fulltext, q)
+                timings = {
+                    "icontains": self._time(lambda: list(icontains[:20]), repeat),
+                    "fulltext": self._time(lambda: list(fulltext[:20]), repeat),
+                    "ranked": self._time(lambda: list(ranked[:20]), repeat),
+                }
+                self.stdout.write(
+                    f"  q={q!r:24} "
+                    + "  ".join(
+                        f"{name}: p50={percentile(t, 50):.1f}ms p95={percentile(t, 95):.1f}ms"
+                        for name, t in timings.items()
+                    )
+                )
+
+    @staticmethod
+    def _time(fn, repeat):
+        out = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            out.append((time.perf_counter() - started) * 1000)
+        return out
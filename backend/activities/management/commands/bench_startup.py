@@ -0,0 +1,227 @@
+import http.client
+import importlib.util
+import io
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from sportconnectgn import gunicorn_conf
+
+from ._bench import database_url, isolated_database
+from .seed_demo import Command as SeedCommand
+
+
+WARMUP_PATHS = ("/api/sports/", "/api/activities/", "/api/activities/?upcoming=1")
+
+# Configuration du banc: celle du dépôt, plus un relevé par worker une fois l'application
+# chargée (CPU consommé par le worker lui-même depuis le fork: ses imports sans preload).
+WRAPPER = """\
+import os
+import resource
+import time
+
+from sportconnectgn.gunicorn_conf import *  # noqa: F401,F403
+
+
+def post_worker_init(worker):
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    with open({ready!r}, "a") as ready:
+        ready.write(f"{{os.getpid()}} {{time.time()}} {{usage.ru_utime + usage.ru_stime}}\\n")
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _memory_kb(pid: int) -> dict:
+    """PSS (pages partagées réparties entre les process) et mémoire privée, en Ko."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as smaps:
+        for line in smaps:
+            name, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                fields[name] = int(rest.split()[0])
+    return {"pss": fields["Pss"], "private": fields["Private_Clean"] + fields["Private_Dirty"]}
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rpartition(")")[2].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Command(BaseCommand):
+    help = (
+        "Démarrage de gunicorn avec sportconnectgn/gunicorn_conf.py, pour chaque profil "
+        "(sync, gthread, uvicorn), avec et sans preload: temps jusqu'à ce que tous les "
+        "workers soient prêts, CPU de démarrage (imports) du master et de chaque worker, "
+        "mémoire par worker (PSS, privée) à froid puis après des requêtes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--requests", type=int, default=300)
+        parser.add_argument("--profiles", default=",".join(gunicorn_conf.PROFILES))
+        parser.add_argument("--timeout", type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        if not os.path.exists("/proc/self/smaps_rollup"):
+            raise CommandError("Mesure mémoire par /proc/<pid>/smaps_rollup (Linux) requise.")
+        profiles = [p.strip() for p in options["profiles"].split(",") if p.strip()]
+        unknown = set(profiles) - set(gunicorn_conf.PROFILES)
+        if unknown:
+            raise CommandError(f"Profils inconnus: {', '.join(sorted(unknown))}")
+
+        cores, memory_mb = gunicorn_conf.cpu_limit(), gunicorn_conf.memory_limit_mb()
+        worker_mb = gunicorn_conf.WORKER_MEMORY_MB
+        defaults = ", ".join(
+            f"{p} {gunicorn_conf.default_workers(p, cores, memory_mb, worker_mb)}"
+            for p in gunicorn_conf.PROFILES
+        )
+        self.stdout.write(
+            f"Ici: {cores} cœur(s), {memory_mb} Mo -> workers par défaut: {defaults}.\n"
+            f"Banc: {options['workers']} workers par profil, {options['requests']} requêtes "
+            "de chauffe. Mémoire par worker en Mo: PSS (partagé réparti) / privée.\n"
+            f"{'':22} {'prêt en':>8} {'CPU':>7} {'CPU':>7}   {'à froid':^13}"
+            f"   {'après requêtes':^13} {'total':>7}\n"
+            f"{'':22} {'':>8} {'master':>7} {'worker':>7}   {'PSS':>6} {'privé':>6}"
+            f"   {'PSS':>6} {'privé':>6} {'PSS':>7}"
+        )
+        with isolated_database():
+            seeder = SeedCommand(stdout=io.StringIO(), stderr=io.StringIO())
+            seeder.seed_volume(50, 300, 2)
+            url = database_url(connection)
+            for profile in profiles:
+                if profile == "uvicorn" and importlib.util.find_spec("uvicorn_worker") is None:
+                    self.stdout.write(f"{profile:22} ignoré: paquet uvicorn-worker absent")
+                    continue
+                for preload in (True, False):
+                    label = f"{profile}, {'preload' if preload else 'sans preload'}"
+                    self.report(label, self.measure(profile, preload, url, options))
+
+    def report(self, label, m):
+        mb = 1024
+        self.stdout.write(
+            f"{label:22} {m['ready_s']:>7.2f}s {m['master_cpu'] * 1000:>5.0f}ms "
+            f"{m['worker_cpu'] * 1000:>5.0f}ms   {m['cold']['pss'] / mb:>6.1f} "
+            f"{m['cold']['private'] / mb:>6.1f}   {m['warm']['pss'] / mb:>6.1f} "
+            f"{m['warm']['private'] / mb:>6.1f} {m['total_pss'] / mb:>7.1f}"
+        )
+
+    def measure(self, profile, preload, url, options):
+        workers = options["workers"]
+        port = _free_port()
+        with tempfile.TemporaryDirectory(prefix="scgn-startup-") as tmp:
+            ready = Path(tmp, "ready")
+            config = Path(tmp, "gunicorn_bench.py")
+            config.write_text(WRAPPER.format(ready=str(ready)))
+            env = {
+                **os.environ,
+                "DATABASE_URL": url,
+                "DJANGO_ALLOWED_HOSTS": "127.0.0.1",
+                "GUNICORN_PROFILE": profile,
+                "GUNICORN_PRELOAD": "1" if preload else "0",
+                "GUNICORN_BIND": f"127.0.0.1:{port}",
+                "GUNICORN_MAX_REQUESTS": "0",
+                "WEB_CONCURRENCY": str(workers),
+            }
+            log = open(Path(tmp, "gunicorn.log"), "w+")
+            started = time.time()
+            process = subprocess.Popen(
+                [sys.executable, "-m", "gunicorn", "-c", str(config)],
+                cwd=settings.BASE_DIR,
+                env=env,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+            try:
+                rows = self.wait_ready(process, ready, workers, options["timeout"], log)
+                pids = [int(pid) for pid, _, _ in rows]
+                result = {
+                    "ready_s": max(float(at) for _, at, _ in rows) - started,
+                    "master_cpu": _cpu_seconds(process.pid),
+                    "worker_cpu": sum(float(cpu) for _, _, cpu in rows) / workers,
+                    "cold": self.average(pids),
+                }
+                self.warm_up(port, options["requests"], workers)
+                time.sleep(0.2)
+                result["warm"] = self.average(pids)
+                result["total_pss"] = _memory_kb(process.pid)["pss"] + sum(
+                    _memory_kb(pid)["pss"] for pid in pids
+                )
+                return result
+            finally:
+                process.send_signal(signal.SIGTERM)
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+                log.close()
+
+    @staticmethod
+    def wait_ready(process, ready, workers, timeout, log):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            rows = ready.read_text().split("\n") if ready.exists() else []
+            rows = [row.split() for row in rows if row]
+            if len(rows) >= workers:
+                return rows[:workers]
+            if process.poll() is not None:
+                break
+            time.sleep(0.01)
+        log.seek(0)
+        raise CommandError("gunicorn n'a pas démarré:\n" + log.read()[-2000:])
+
+    @staticmethod
+    def average(pids) -> dict:
+        samples = [_memory_kb(pid) for pid in pids]
+        return {key: sum(s[key] for s in samples) / len(samples) for key in samples[0]}
+
+    @staticmethod
+    def warm_up(port, requests, workers):
+        """Requêtes réparties sur plusieurs connexions, pour atteindre tous les workers."""
+        counter = iter(range(requests))
+        lock = threading.Lock()
+        errors = []
+
+        def client():
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                try:
+                    conn.request(
+                        "GET",
+                        WARMUP_PATHS[i % len(WARMUP_PATHS)],
+                        headers={"X-Forwarded-Proto": "https", "Connection": "close"},
+                    )
+                    response = conn.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        errors.append(response.status)
+                finally:
+                    conn.close()
+
+        threads = [threading.Thread(target=client) for _ in range(2 * workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise CommandError(f"{len(errors)} requêtes en échec (statuts {sorted(set(errors))})")
@@ -0,0 +1,30 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from activities import export
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporte toutes les activités ou participations en CSV ou NDJSON, en flux "
+        "(mémoire constante). Même format que les actions API `export`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(export.KINDS))
+        parser.add_argument("--format", dest="fmt", choices=sorted(export.STREAMS), default="csv")
+        parser.add_argument("--output", "-o", help="Fichier de sortie (défaut: sortie standard).")
+
+    def handle(self, *args, **options):
+        stream = export.STREAMS[options["fmt"]](options["kind"])
+        if options["output"]:
+            with open(options["output"], "wb") as fh:
+                for chunk in stream:
+                    fh.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Export écrit: {options['output']}"))
+        else:
+            out = sys.stdout.buffer
+            for chunk in stream:
+                out.write(chunk)
+            out.flush()
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from activities import recommend
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les affinités par sport (fil « Pour toi ») depuis les participations, "
+        "par exemple après un import qui contourne les signaux."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, action="append", dest="users", help="Id (répétable)."
+        )
+
+    def handle(self, *args, **options):
+        count = recommend.rebuild(options["users"])
+        self.stdout.write(self.style.SUCCESS(f"Affinités reconstruites: {count} lignes."))
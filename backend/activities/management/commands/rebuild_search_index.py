@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from activities import search
+
+
+class Command(BaseCommand):
+    help = "Recrée et remplit l'index plein texte des activités."
+
+    def handle(self, *args, **options):
+        search.install_index(connection)
+        if not search.is_available():
+            self.stderr.write(
+                self.style.WARNING(
+                    f"Recherche plein texte indisponible sur {connection.vendor} (repli icontains)."
+                )
+            )
+            return
+        search.reindex()
+        self.stdout.write(self.style.SUCCESS("Index de recherche reconstruit."))
@@ -1,27 +1,111 @@
 from datetime import timedelta
+import random
+import time
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
 from django.utils import timezone
 
+from activities import cache as response_cache
+from activities import geo, recommend, search
 from activities.models import Activity, Participation, Sport
 
 
 User = get_user_model()
 
+DEMO_PASSWORD = "DemoSportConnectGN!123"
+
+QUARTIERS = [
+    "Kaloum", "Dixinn", "Matam", "Ratoma", "Matoto", "Kipé", "Nongo", "Lambanyi",
+    "Taouyah", "Hamdallaye", "Bambeto", "Cosa", "Koloma", "Sonfonia", "Gbessia",
+    "Madina", "Bonfi", "Camayenne", "Minière", "Kagbelen",
+]
+PRENOMS = [
+    "Mamadou", "Moussa", "Ibrahima", "Alpha", "Ousmane", "Sékou", "Abdoulaye", "Lansana",
+    "Aissatou", "Fatoumata", "Mariama", "Kadiatou", "Hawa", "Fanta", "Djénabou", "Nènè",
+]
+NOMS = [
+    "Diallo", "Barry", "Bah", "Camara", "Sylla", "Soumah", "Condé", "Keita",
+    "Touré", "Traoré", "Kouyaté", "Bangoura", "Cissé", "Kaba", "Fofana", "Sow",
+]
+# sport -> (titres, (places min, places max), lieux)
+SPORT_PROFILES = {
+    "Football": (
+        ["Futsal du soir", "Match 5 contre 5", "Foot entre amis", "Tournoi de quartier"],
+        (10, 22),
+        ["Terrain de Nongo", "Stade du 28 Septembre", "Terrain synthétique"],
+    ),
+    "Running": (
+        ["Running Sunrise", "Footing de la corniche", "Sortie longue", "Fractionné"],
+        (5, 30),
+        ["Corniche", "Route du Niger", "Esplanade"],
+    ),
+    "Fitness": (
+        ["Séance Fitness en groupe", "HIIT plage", "Renforcement musculaire"],
+        (8, 20),
+        ["Plage de Rogbané", "Salle de quartier", "Esplanade"],
+    ),
+    "Basket": (
+        ["Basket 3x3", "Pickup game", "Entraînement shoot"],
+        (6, 10),
+        ["Playground", "Palais des sports", "Terrain de l'école"],
+    ),
+}
+DESCRIPTIONS = [
+    "Match détente, ambiance clean. Viens avec tes crampons !",
+    "Course légère + étirements. Objectif: régularité.",
+    "Circuit training (HIIT doux). On s’encourage, on progresse.",
+    "Niveau avancé, intensité élevée.",
+    "Ouvert à tous, on forme les équipes sur place.",
+    "Prévois de l’eau, on commence à l’heure.",
+]
+
 
 class Command(BaseCommand):
     help = "Crée des sports/activités de démo (dev uniquement)."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=0, help="Utilisateurs synthétiques à ajouter."
+        )
+        parser.add_argument(
+            "--activities", type=int, default=0, help="Activités synthétiques à ajouter."
+        )
+        parser.add_argument(
+            "--participations-per-activity",
+            type=int,
+            default=0,
+            help="Participations par activité synthétique (bornées par nombre_places).",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Autorise la génération hors DEBUG (base de test de charge uniquement).",
+        )
+
     def handle(self, *args, **options):
-        if not settings.DEBUG:
+        if not settings.DEBUG and not options["force"]:
             self.stderr.write(
                 self.style.ERROR("Commande désactivée hors DEBUG (sécurité).")
             )
             return
 
-        demo_password = "DemoSportConnectGN!123"
+        self.seed_demo()
+        if options["users"] or options["activities"]:
+            self.seed_volume(
+                options["users"],
+                options["activities"],
+                options["participations_per_activity"],
+                batch_size=options["batch_size"],
+            )
+
+    def seed_demo(self):
+        demo_password = DEMO_PASSWORD
 
         demo_user, created = User.objects.get_or_create(
             username="demo",
@@ -87,12 +171,15 @@ class Command(BaseCommand):
 
         created_count = 0
         for payload in demo_activities:
+            latitude, longitude = geo.locate(payload["lieu"])
             obj, c = Activity.objects.get_or_create(
                 titre=payload["titre"],
                 sport=payload["sport"],
                 date_heure=payload["date_heure"],
                 lieu=payload["lieu"],
                 defaults={
+                    "latitude": latitude,
+                    "longitude": longitude,
                     "nombre_places": payload["nombre_places"],
                     "niveau_requis": payload["niveau_requis"],
                     "description": payload["description"],
@@ -113,3 +200,146 @@ class Command(BaseCommand):
                 f"Login démo: demo / {demo_password}"
             )
         )
+
+    def seed_volume(
+        self,
+        n_users: int,
+        n_activities: int,
+        per_activity: int,
+        batch_size: int = 5000,
+        password: str = DEMO_PASSWORD,
+    ):
+        """
+        Jeu de données volumineux (tests de charge / benchmarks).
+
+        - bulk_create par lots, une transaction par lot;
+        - un seul hash PBKDF2, partagé par tous les comptes générés;
+        - participants_count est écrit à l'insertion (les signaux ne sont pas
+          déclenchés par bulk_create), l'index de recherche et les affinités par sport
+          sont reconstruits à la fin.
+        """
+        rng = random.Random(0)
+        stats = {}
+
+        started = time.perf_counter()
+        password_hash = make_password(password)
+        offset = (User.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+        user_ids = []
+        for chunk in _chunks(range(n_users), batch_size):
+            batch = [self._fake_user(rng, offset + i, password_hash) for i in chunk]
+            with transaction.atomic():
+                user_ids += [u.pk for u in User.objects.bulk_create(batch)]
+        stats["utilisateurs"] = (len(user_ids), time.perf_counter() - started)
+        if not user_ids:
+            user_ids = list(User.objects.order_by("id").values_list("id", flat=True)[:10000])
+
+        sports = list(Sport.objects.all())
+        sports += [
+            Sport.objects.get_or_create(name=name)[0]
+            for name in SPORT_PROFILES
+            if name not in {s.name for s in sports}
+        ]
+
+        started = time.perf_counter()
+        now = timezone.now()
+        activity_count = participation_count = 0
+        participation_time = 0.0
+        first_activity_id = None
+        for chunk in _chunks(range(n_activities), batch_size):
+            batch = []
+            for _ in chunk:
+                activity = self._fake_activity(rng, sports, user_ids, now)
+                activity.participants_count = min(
+                    per_activity, activity.nombre_places, len(user_ids)
+                )
+                batch.append(activity)
+            with transaction.atomic():
+                created = Activity.objects.bulk_create(batch)
+                if first_activity_id is None and created:
+                    first_activity_id = created[0].pk
+                activity_count += len(created)
+
+                p_started = time.perf_counter()
+                participations = [
+                    Participation(user_id=user_id, activity_id=activity.pk)
+                    for activity in created
+                    for user_id in rng.sample(user_ids, activity.participants_count)
+                ]
+                Participation.objects.bulk_create(participations, batch_size=batch_size)
+                participation_count += len(participations)
+                participation_time += time.perf_counter() - p_started
+        elapsed = time.perf_counter() - started
+        stats["activités"] = (activity_count, elapsed - participation_time)
+        stats["participations"] = (participation_count, participation_time)
+
+        if first_activity_id is not None:
+            started = time.perf_counter()
+            search.reindex(
+                Activity.objects.filter(pk__gte=first_activity_id).values_list("pk", flat=True)
+            )
+            stats["index de recherche"] = (activity_count, time.perf_counter() - started)
+        if participation_count:
+            started = time.perf_counter()
+            stats["affinités"] = (recommend.rebuild(), time.perf_counter() - started)
+        response_cache.bump(response_cache.ACTIVITIES)
+
+        for label, (rows, seconds) in stats.items():
+            rate = rows / seconds if seconds else 0
+            self.stdout.write(f"  {label:20} {rows:>10} lignes en {seconds:7.2f}s ({rate:,.0f}/s)")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Volume OK: {len(user_ids)} utilisateurs, {activity_count} activités, "
+                f"{participation_count} participations. Mot de passe: {password}"
+            )
+        )
+
+    @staticmethod
+    def _fake_user(rng, n: int, password_hash: str):
+        prenom = rng.choice(PRENOMS)
+        nom = rng.choice(NOMS)
+        return User(
+            username=f"{prenom.lower()}.{nom.lower()}{n}",
+            first_name=prenom,
+            last_name=nom,
+            email=f"{prenom.lower()}.{nom.lower()}{n}@sportconnectgn.local",
+            password=password_hash,
+            ville="Conakry",
+            quartier=rng.choice(QUARTIERS),
+            niveau_sportif=rng.choice(User.NiveauSportif.values),
+        )
+
+    @staticmethod
+    def _fake_activity(rng, sports, user_ids, now):
+        sport = rng.choice(sports)
+        titres, (places_min, places_max), lieux = SPORT_PROFILES.get(
+            sport.name, ([f"Séance de {sport.name}"], (6, 20), ["Terrain du quartier"])
+        )
+        quartier = rng.choice(QUARTIERS)
+        # Autour du centre du quartier (± ~700 m), pour des distances variées.
+        latitude, longitude = geo.locate(quartier)
+        # Entre -60 et +90 jours, à des horaires plausibles (6h-21h).
+        day = now + timedelta(days=rng.randint(-60, 90))
+        date_heure = day.replace(hour=rng.randint(6, 21), minute=rng.choice((0, 30)))
+        return Activity(
+            titre=rng.choice(titres),
+            sport=sport,
+            date_heure=date_heure,
+            lieu=f"{rng.choice(lieux)}, {quartier}",
+            latitude=round(latitude + rng.uniform(-0.0065, 0.0065), 6),
+            longitude=round(longitude + rng.uniform(-0.0065, 0.0065), 6),
+            nombre_places=rng.randint(places_min, places_max),
+            niveau_requis=rng.choice(Activity.NiveauRequis.values),
+            description=rng.choice(DESCRIPTIONS),
+            created_by_id=rng.choice(user_ids),
+        )
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_participants_count(apps, schema_editor):
+    Activity = apps.get_model("activities", "Activity")
+    Participation = apps.get_model("activities", "Participation")
+    counts = (
+        Participation.objects.filter(activity=OuterRef("pk"))
+        .order_by()
+        .values("activity")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    Activity.objects.update(participants_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activity",
+            name="participants_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_participants_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0002_activity_participants_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['-date_heure', '-id'], name='activity_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['sport', '-date_heure', '-id'], name='activity_sport_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['niveau_requis', '-date_heure', '-id'], name='activity_niveau_date_id_idx'),
+        ),
+    ]
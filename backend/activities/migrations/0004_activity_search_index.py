@@ -0,0 +1,63 @@
+from django.db import OperationalError, migrations
+
+
+# SQL figé ici: la migration ne doit pas dépendre de activities/search.py, dont le code
+# peut changer après coup (l'index courant se reconstruit par `rebuild_search_index`).
+FTS_TABLE = "activities_activity_fts"
+
+
+def create_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            cursor.execute(
+                "ALTER TABLE activities_activity ADD COLUMN IF NOT EXISTS search_vector tsvector"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS activity_search_vector_idx "
+                "ON activities_activity USING GIN (search_vector)"
+            )
+            cursor.execute(
+                "UPDATE activities_activity a SET search_vector = "
+                "setweight(to_tsvector('french', coalesce(a.titre, '')), 'A') || "
+                "setweight(to_tsvector('french', coalesce(s.name, '')), 'A') || "
+                "setweight(to_tsvector('french', coalesce(a.lieu, '')), 'B') || "
+                "setweight(to_tsvector('french', coalesce(a.description, '')), 'C') "
+                "FROM activities_sport s WHERE s.id = a.sport_id"
+            )
+        elif conn.vendor == "sqlite":
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    "titre, lieu, description, sport, "
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                )
+            except OperationalError:
+                # SQLite compilé sans FTS5: la recherche restera sur icontains.
+                return
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, titre, lieu, description, sport) "
+                "SELECT a.id, a.titre, a.lieu, a.description, s.name "
+                "FROM activities_activity a JOIN activities_sport s ON s.id = a.sport_id"
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            cursor.execute("DROP INDEX IF EXISTS activity_search_vector_idx")
+            cursor.execute("ALTER TABLE activities_activity DROP COLUMN IF EXISTS search_vector")
+        elif conn.vendor == "sqlite":
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0003_activity_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,56 @@
+import django.core.validators
+from django.db import migrations, models
+
+
+def geocode_existing(apps, schema_editor):
+    # Import local: le gazetteer est du code applicatif, sans dépendance au modèle.
+    from activities.geo import locate
+
+    Activity = apps.get_model("activities", "Activity")
+    # Un UPDATE par lieu distinct, pas par activité.
+    lieux = Activity.objects.filter(latitude__isnull=True).values_list("lieu", flat=True)
+    for lieu in lieux.order_by().distinct():
+        point = locate(lieu)
+        if point is not None:
+            Activity.objects.filter(lieu=lieu, latitude__isnull=True).update(
+                latitude=point[0], longitude=point[1]
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("activities", "0005_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activity",
+            name="latitude",
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-90),
+                    django.core.validators.MaxValueValidator(90),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="activity",
+            name="longitude",
+            field=models.FloatField(
+                blank=True,
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(-180),
+                    django.core.validators.MaxValueValidator(180),
+                ],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(fields=["latitude", "longitude"], name="activity_lat_lng_idx"),
+        ),
+        migrations.RunPython(geocode_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_affinities(apps, schema_editor):
+    Participation = apps.get_model("activities", "Participation")
+    SportAffinity = apps.get_model("activities", "SportAffinity")
+    counts = (
+        Participation.objects.order_by()
+        .values("user_id", "activity__sport_id")
+        .annotate(n=Count("pk"))
+    )
+    SportAffinity.objects.bulk_create(
+        (
+            SportAffinity(
+                user_id=row["user_id"], sport_id=row["activity__sport_id"], participations=row["n"]
+            )
+            for row in counts.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0006_activity_coordinates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SportAffinity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participations', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sport', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='affinities', to='activities.sport')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sport_affinities', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'sport'), name='uniq_affinity_user_sport')],
+            },
+        ),
+        migrations.RunPython(backfill_affinities, migrations.RunPython.noop),
+    ]
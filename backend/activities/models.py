@@ -1,11 +1,15 @@
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 
 
 class Sport(models.Model):
     name = models.CharField(max_length=80, unique=True)
     slug = models.SlugField(max_length=90, unique=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -16,6 +20,22 @@ class Sport(models.Model):
         return self.name
 
 
+class ActivityQuerySet(models.QuerySet):
+    def sync_participants_count(self) -> int:
+        """
+        Recalcule `participants_count` depuis la table Participation.
+        À appeler après un bulk_create/bulk delete (qui ne déclenchent pas les signaux).
+        """
+        counts = (
+            Participation.objects.filter(activity=OuterRef("pk"))
+            .order_by()
+            .values("activity")
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        return self.update(participants_count=Coalesce(Subquery(counts), Value(0)))
+
+
 class Activity(models.Model):
     class NiveauRequis(models.TextChoices):
         DEBUTANT = "debutant", "Débutant"
@@ -27,6 +47,14 @@ class Activity(models.Model):
     sport = models.ForeignKey(Sport, on_delete=models.PROTECT, related_name="activities")
     date_heure = models.DateTimeField()
     lieu = models.CharField(max_length=200)
+    # Coordonnées WGS 84, optionnelles: fournies par le client ou déduites de `lieu`
+    # (gazetteer des quartiers, voir geo.py). Recherche par proximité: `?near=`.
+    latitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
     nombre_places = models.PositiveIntegerField()
     niveau_requis = models.CharField(
         max_length=20, choices=NiveauRequis.choices, default=NiveauRequis.DEBUTANT
@@ -36,13 +64,45 @@ class Activity(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="activities"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Dénormalisé: maintenu par les signaux Participation (voir signals.py).
+    participants_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ActivityQuerySet.as_manager()
 
     class Meta:
         ordering = ["-date_heure", "-id"]
+        indexes = [
+            # Pagination keyset (date_heure, id) et ses variantes filtrées.
+            models.Index(fields=["-date_heure", "-id"], name="activity_date_id_idx"),
+            models.Index(
+                fields=["sport", "-date_heure", "-id"], name="activity_sport_date_id_idx"
+            ),
+            models.Index(
+                fields=["niveau_requis", "-date_heure", "-id"],
+                name="activity_niveau_date_id_idx",
+            ),
+            # Préfiltre rectangulaire de `?near=` (intervalle sur latitude puis longitude).
+            models.Index(fields=["latitude", "longitude"], name="activity_lat_lng_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Ne jamais réécrire le compteur depuis une instance potentiellement périmée.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "participants_count"
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return f"{self.titre} ({self.sport.name})"
 
+    @property
+    def is_full(self) -> bool:
+        return self.participants_count >= int(self.nombre_places or 0)
+
 
 class Participation(models.Model):
     user = models.ForeignKey(
@@ -52,6 +112,7 @@ class Participation(models.Model):
         Activity, on_delete=models.CASCADE, related_name="participations"
     )
     joined_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         constraints = [
@@ -63,3 +124,25 @@ class Participation(models.Model):
     def __str__(self) -> str:
         return f"{self.user} -> {self.activity}"
 
+
+class SportAffinity(models.Model):
+    """
+    Vecteur d'affinité d'un utilisateur: nombre de ses participations par sport.
+    Tenu à jour au fil des inscriptions (signals.py, bulk.py); lu par le fil
+    « Pour toi » (recommend.py).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="sport_affinities"
+    )
+    sport = models.ForeignKey(Sport, on_delete=models.CASCADE, related_name="affinities")
+    participations = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "sport"], name="uniq_affinity_user_sport")
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user} ~ {self.sport} ({self.participations})"
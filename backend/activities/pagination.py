@@ -0,0 +1,192 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class ActivityKeysetPagination(BasePagination):
+    """
+    Pagination par clé (keyset) sur (date_heure, id), ordre décroissant; sur
+    (distance_km, id), ordre croissant, pour une recherche `?near=` (la distance
+    est alors annotée par ActivityFilterBackend).
+
+    Contrairement à PageNumberPagination (OFFSET + COUNT(*)), chaque page est un
+    simple parcours d'index à partir du dernier élément vu: le coût ne dépend pas
+    de la profondeur de la page ni de la taille de la table.
+
+    Le curseur est opaque: base64("<n|p>|<date_heure iso ou distance>|<id>").
+    """
+
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Curseur invalide."
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                size = int(raw)
+            except ValueError:
+                size = 0
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    def get_ordering(self, queryset):
+        """(clé, ordre décroissant?) de la pagination pour ce queryset."""
+        if "distance_km" in queryset.query.annotations:
+            return "distance_km", False
+        return "date_heure", True
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            direction, raw_value, raw_id = (
+                base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8").split("|")
+            )
+            value = float(raw_value) if self.key == "distance_km" else parse_datetime(raw_value)
+            pk = int(raw_id)
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message) from None
+        if direction not in {"n", "p"} or value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return direction, value, pk
+
+    def encode_cursor(self, direction, obj):
+        # obj: instance, ou dict issu de .values() (voir fastpath.py).
+        if isinstance(obj, dict):
+            value, pk = obj[self.key], obj["id"]
+        else:
+            value, pk = getattr(obj, self.key), obj.pk
+        value = repr(value) if self.key == "distance_km" else value.isoformat()
+        raw = f"{direction}|{value}|{pk}"
+        encoded = base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _after(self, value, pk, descending):
+        """Lignes situées après (value, pk) dans l'ordre (décroissant ou non) de la clé."""
+        op = "lt" if descending else "gt"
+        return Q(**{f"{self.key}__{op}": value}) | Q(**{self.key: value, f"id__{op}": pk})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        args, finish = self._prepare(queryset, request, view)
+        return finish(self.fetch(*args))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() avec l'ORM asynchrone (sportconnectgn/asyncviews.py)."""
+        args, finish = self._prepare(queryset, request, view)
+        return finish(await self.afetch(*args))
+
+    def _prepare(self, queryset, request, view):
+        """Arguments de fetch() pour la page demandée, et la fonction qui en tire la page."""
+        self.base_url = request.build_absolute_uri()
+        self.key, descending = self.get_ordering(queryset)
+        forward = (f"-{self.key}", "-id") if descending else (self.key, "id")
+        backward = (self.key, "id") if descending else (f"-{self.key}", "-id")
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        narrow = None
+        if self.key == "distance_km" and view is not None:
+            narrow = view.filter_queryset(queryset.model._default_manager.all())
+
+        direction, after, ordering = "n", None, forward
+        if cursor is not None:
+            direction, value, pk = cursor
+            if direction == "n":
+                after = self._after(value, pk, descending)
+            else:
+                after = self._after(value, pk, not descending)
+                ordering = backward
+
+        def finish(rows):
+            has_more = len(rows) > page_size
+            page = rows[:page_size]
+            if direction == "p":
+                page.reverse()
+                self.previous_obj = page[0] if has_more else None
+                self.next_obj = page[-1] if page else None
+            else:
+                self.next_obj = page[-1] if has_more else None
+                self.previous_obj = page[0] if page and cursor is not None else None
+            return page
+
+        return (queryset, narrow, after, ordering, page_size + 1), finish
+
+    def fetch(self, queryset, narrow, after, ordering, limit):
+        """
+        Les `limit` premières lignes de `queryset` après le curseur, dans `ordering`.
+
+        Avec `narrow` (mêmes filtres, sur la seule table des activités), la page est
+        d'abord choisie sans jointures puis ses lignes complètes sont lues par clé
+        primaire: trier par distance oblige à évaluer toutes les candidates, et les
+        joindre au sport et au créateur avant le tri coûterait plus que le tri lui-même.
+        """
+        if narrow is None:
+            if after is not None:
+                queryset = queryset.filter(after)
+            return list(queryset.order_by(*ordering)[:limit])
+        if after is not None:
+            narrow = narrow.filter(after)
+        pks = list(narrow.order_by(*ordering).values_list("pk", flat=True)[:limit])
+        rows = {
+            row["id"] if isinstance(row, dict) else row.pk: row
+            for row in queryset.filter(pk__in=pks)
+        }
+        return [rows[pk] for pk in pks if pk in rows]
+
+    async def afetch(self, queryset, narrow, after, ordering, limit):
+        """fetch() avec l'ORM asynchrone."""
+        if narrow is None:
+            if after is not None:
+                queryset = queryset.filter(after)
+            return [row async for row in queryset.order_by(*ordering)[:limit]]
+        if after is not None:
+            narrow = narrow.filter(after)
+        pks = [
+            pk async for pk in narrow.order_by(*ordering).values_list("pk", flat=True)[:limit]
+        ]
+        rows = {
+            row["id"] if isinstance(row, dict) else row.pk: row
+            async for row in queryset.filter(pk__in=pks)
+        }
+        return [rows[pk] for pk in pks if pk in rows]
+
+    def get_next_link(self):
+        if self.next_obj is None:
+            return None
+        return self.encode_cursor("n", self.next_obj)
+
+    def get_previous_link(self):
+        if self.previous_obj is None:
+            return None
+        return self.encode_cursor("p", self.previous_obj)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
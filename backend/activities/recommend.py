@@ -0,0 +1,208 @@
+"""
+Fil « Pour toi » (/api/activities/for-you/) et affinités par sport.
+
+Les affinités (SportAffinity: participations par utilisateur et par sport) sont
+tenues à jour au fil des inscriptions, jamais recalculées à la lecture. Le fil
+part d'un ensemble restreint de candidates, lues par index: les prochaines
+activités des sports préférés (index sport, date_heure) et, pour la découverte,
+les prochaines activités tous sports confondus. Elles sont ensuite classées en
+mémoire selon le sport, le niveau, la proximité du quartier, les places restantes
+et la date. `manage.py bench_feed` compare ce fil au classement exhaustif.
+"""
+
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Value, When
+from django.utils import timezone
+
+from . import geo
+from .models import Activity, Participation, SportAffinity
+
+
+TOP_SPORTS = 5
+CANDIDATES_PER_SPORT = 100
+DISCOVERY_CANDIDATES = 60
+HORIZON = timedelta(days=30)
+# Rayon du vivier par sport; au-delà de PROXIMITY_KM, la proximité ne rapporte plus rien.
+CANDIDATE_RADIUS_KM = 2.0
+PROXIMITY_KM = 10.0
+WEIGHTS = {"sport": 0.35, "niveau": 0.2, "proximite": 0.2, "places": 0.1, "date": 0.15}
+
+LEVELS = {value: rank for rank, value in enumerate(Activity.NiveauRequis.values)}
+
+CANDIDATE_COLUMNS = (
+    "id",
+    "sport_id",
+    "date_heure",
+    "niveau_requis",
+    "latitude",
+    "longitude",
+    "nombre_places",
+    "participants_count",
+)
+
+
+# -- Affinités -------------------------------------------------------------------------
+
+
+def record(user_id: int, sport_id: int, delta: int) -> None:
+    """Ajoute `delta` (±1) aux participations de l'utilisateur pour ce sport."""
+    affinities = SportAffinity.objects.filter(user_id=user_id, sport_id=sport_id)
+    changes = {"participations": F("participations") + delta, "updated_at": timezone.now()}
+    if delta < 0:
+        affinities.filter(participations__gte=-delta).update(**changes)
+        return
+    if affinities.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            SportAffinity.objects.create(user_id=user_id, sport_id=sport_id, participations=delta)
+    except IntegrityError:
+        # Créée entre-temps par une inscription concurrente.
+        affinities.update(**changes)
+
+
+def record_many(counts) -> None:
+    """
+    Version ensembliste de record() pour les opérations en lot:
+    `counts` = {(user_id, sport_id): nouvelles participations}. Trois requêtes.
+    """
+    if not counts:
+        return
+    user_ids = {user_id for user_id, _ in counts}
+    sport_ids = {sport_id for _, sport_id in counts}
+    existing = {
+        (user_id, sport_id): pk
+        for pk, user_id, sport_id in SportAffinity.objects.filter(
+            user_id__in=user_ids, sport_id__in=sport_ids
+        ).values_list("pk", "user_id", "sport_id")
+    }
+    updates = {existing[pair]: n for pair, n in counts.items() if pair in existing}
+    if updates:
+        SportAffinity.objects.filter(pk__in=updates).update(
+            participations=F("participations")
+            + Case(*(When(pk=pk, then=Value(n)) for pk, n in updates.items()), default=0),
+            updated_at=timezone.now(),
+        )
+    SportAffinity.objects.bulk_create(
+        [
+            SportAffinity(user_id=user_id, sport_id=sport_id, participations=n)
+            for (user_id, sport_id), n in counts.items()
+            if (user_id, sport_id) not in existing
+        ]
+    )
+
+
+def rebuild(user_ids=None) -> int:
+    """
+    Recalcule les affinités depuis la table Participation (toutes, ou celles de
+    `user_ids`). Pour les imports en masse et `manage.py rebuild_affinities`.
+    """
+    counts = Participation.objects.order_by().values("user_id", "activity__sport_id")
+    affinities = SportAffinity.objects.all()
+    if user_ids is not None:
+        counts = counts.filter(user_id__in=user_ids)
+        affinities = affinities.filter(user_id__in=user_ids)
+    counts = counts.annotate(n=Count("pk"))
+    with transaction.atomic():
+        affinities.delete()
+        created = SportAffinity.objects.bulk_create(
+            (
+                SportAffinity(
+                    user_id=row["user_id"],
+                    sport_id=row["activity__sport_id"],
+                    participations=row["n"],
+                )
+                for row in counts.iterator()
+            ),
+            batch_size=2000,
+        )
+    return len(created)
+
+
+# -- Fil -------------------------------------------------------------------------------
+
+
+def candidates(user, sport_ids, level, origin) -> dict:
+    """
+    Activités à venir, non complètes, d'autres organisateurs, non rejointes:
+    id -> ligne. Pour chaque sport préféré, les prochaines activités d'un niveau
+    proche, autour du quartier si on le connaît; plus les prochaines tous sports
+    confondus (découverte, et seul vivier sans historique).
+    """
+    now = timezone.now()
+    upcoming = (
+        Activity.objects.filter(
+            date_heure__gte=now,
+            date_heure__lt=now + HORIZON,
+            participants_count__lt=F("nombre_places"),
+        )
+        .exclude(created_by=user)
+        .order_by("date_heure", "id")
+        .values_list(*CANDIDATE_COLUMNS)
+    )
+    nearby = upcoming.filter(
+        niveau_requis__in=[value for value, rank in LEVELS.items() if abs(rank - level) <= 1]
+    )
+    if origin is not None:
+        lat_min, lat_max, lng_min, lng_max = geo.bounding_box(*origin, CANDIDATE_RADIUS_KM)
+        nearby = nearby.filter(
+            latitude__range=(lat_min, lat_max), longitude__range=(lng_min, lng_max)
+        )
+    rows = {}
+    for sport_id in sport_ids:
+        sport_rows = nearby.filter(sport_id=sport_id)[:CANDIDATES_PER_SPORT]
+        rows.update((row[0], row) for row in sport_rows)
+    rows.update((row[0], row) for row in upcoming[:DISCOVERY_CANDIDATES])
+    joined = Participation.objects.filter(user=user, activity_id__in=rows).values_list(
+        "activity_id", flat=True
+    )
+    for activity_id in joined:
+        del rows[activity_id]
+    return rows
+
+
+def score(row, affinity, level, origin, now) -> float:
+    """Score entre 0 et 1; `affinity`: part de chaque sport dans les participations."""
+    _, sport_id, date_heure, niveau, lat, lng, places, count = row
+    gap = abs(level - LEVELS.get(niveau, level))
+    proximity = 0.0
+    if origin is not None and lat is not None:
+        distance = geo.haversine_km(origin[0], origin[1], lat, lng)
+        proximity = max(0.0, 1 - distance / PROXIMITY_KM)
+    return (
+        WEIGHTS["sport"] * affinity.get(sport_id, 0.0)
+        + WEIGHTS["niveau"] * max(0.0, 1 - gap / 2)
+        + WEIGHTS["proximite"] * proximity
+        + WEIGHTS["places"] * (places - count) / places
+        + WEIGHTS["date"] * max(0.0, 1 - (date_heure - now) / HORIZON)
+    )
+
+
+def profile(user):
+    """(affinité par sport, rang du niveau, coordonnées du quartier ou None)."""
+    top = list(
+        SportAffinity.objects.filter(user=user, participations__gt=0)
+        .order_by("-participations", "sport_id")
+        .values_list("sport_id", "participations")[:TOP_SPORTS]
+    )
+    total = sum(n for _, n in top)
+    affinity = {sport_id: n / total for sport_id, n in top}
+    level = LEVELS.get(user.niveau_sportif, 0)
+    return affinity, level, geo.locate(f"{user.quartier} {user.ville}")
+
+
+def rank(rows, affinity, level, origin) -> list:
+    now = timezone.now()
+    return sorted(
+        rows,
+        key=lambda row: (-score(row, affinity, level, origin, now), row[2], row[0]),
+    )
+
+
+def feed(user, limit: int) -> list[int]:
+    """Ids des `limit` activités les mieux classées pour `user`, dans l'ordre."""
+    affinity, level, origin = profile(user)
+    rows = candidates(user, affinity, level, origin)
+    return [row[0] for row in rank(rows.values(), affinity, level, origin)[:limit]]
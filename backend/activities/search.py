@@ -0,0 +1,204 @@
+"""
+Recherche plein texte sur les activités (titre, lieu, description, nom du sport).
+
+- Postgres: colonne `search_vector` (tsvector, config "french") + index GIN.
+- SQLite: table virtuelle FTS5 `activities_activity_fts` (rowid = id de l'activité).
+- Autre moteur / FTS5 indisponible: repli sur `icontains`.
+
+L'index est créé par la migration 0004 et tenu à jour par les signaux (signals.py).
+Chaque mot de la requête est traité comme un préfixe ("kip" trouve "Kipé").
+"""
+
+import re
+
+from django.db import OperationalError, connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+
+FTS_TABLE = "activities_activity_fts"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Nombre d'ids par requête (limite de variables SQLite).
+REINDEX_CHUNK = 5000
+
+_fts_available: dict[str, bool] = {}
+
+
+def _terms(query: str) -> list[str]:
+    return _WORD_RE.findall(query or "")[:10]
+
+
+def install_index(conn) -> None:
+    """
+    Crée la structure d'index pour le moteur courant (idempotent), pour
+    `manage.py rebuild_search_index`. Même SQL que la migration 0004, qui garde sa
+    propre copie.
+    """
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            cursor.execute(
+                "ALTER TABLE activities_activity ADD COLUMN IF NOT EXISTS search_vector tsvector"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS activity_search_vector_idx "
+                "ON activities_activity USING GIN (search_vector)"
+            )
+        elif conn.vendor == "sqlite":
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    "titre, lieu, description, sport, "
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                )
+            except OperationalError:
+                # SQLite compilé sans FTS5: on restera sur icontains.
+                return
+    _fts_available.pop(conn.alias, None)
+
+
+def is_available(conn=None) -> bool:
+    conn = conn or connection
+    if conn.vendor == "postgresql":
+        return True
+    if conn.vendor != "sqlite":
+        return False
+    if conn.alias not in _fts_available:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+            )
+            _fts_available[conn.alias] = cursor.fetchone() is not None
+    return _fts_available[conn.alias]
+
+
+def reindex(activity_ids=None, conn=None) -> None:
+    """
+    (Ré)indexe les activités données, ou toutes si `activity_ids` vaut None.
+    Une seule requête ensembliste par moteur, quel que soit le nombre d'ids.
+    """
+    conn = conn or connection
+    if not is_available(conn):
+        return
+    if activity_ids is not None:
+        activity_ids = [int(pk) for pk in activity_ids]
+        if not activity_ids:
+            return
+        if len(activity_ids) > REINDEX_CHUNK:
+            for i in range(0, len(activity_ids), REINDEX_CHUNK):
+                reindex(activity_ids[i : i + REINDEX_CHUNK], conn)
+            return
+
+    with conn.cursor() as cursor:
+        if conn.vendor == "postgresql":
+            where, params = ("", [])
+            if activity_ids is not None:
+                where, params = ("AND a.id = ANY(%s)", [activity_ids])
+            cursor.execute(
+                "UPDATE activities_activity a SET search_vector = "
+                "setweight(to_tsvector('french', coalesce(a.titre, '')), 'A') || "
+                "setweight(to_tsvector('french', coalesce(s.name, '')), 'A') || "
+                "setweight(to_tsvector('french', coalesce(a.lieu, '')), 'B') || "
+                "setweight(to_tsvector('french', coalesce(a.description, '')), 'C') "
+                f"FROM activities_sport s WHERE s.id = a.sport_id {where}",
+                params,
+            )
+            return
+
+        if activity_ids is None:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            where, params = ("", [])
+        else:
+            placeholders = ", ".join(["%s"] * len(activity_ids))
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", activity_ids
+            )
+            where, params = (f"WHERE a.id IN ({placeholders})", activity_ids)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, titre, lieu, description, sport) "
+            "SELECT a.id, a.titre, a.lieu, a.description, s.name "
+            "FROM activities_activity a JOIN activities_sport s ON s.id = a.sport_id "
+            f"{where}",
+            params,
+        )
+
+
+def unindex(activity_ids, conn=None) -> None:
+    conn = conn or connection
+    activity_ids = [int(pk) for pk in activity_ids]
+    if not activity_ids or conn.vendor != "sqlite" or not is_available(conn):
+        # Postgres: le vecteur disparaît avec la ligne.
+        return
+    placeholders = ", ".join(["%s"] * len(activity_ids))
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", activity_ids)
+
+
+def filter_queryset(queryset, query: str):
+    """Restreint `queryset` aux activités qui correspondent (sans toucher à l'ordre)."""
+    terms = _terms(query)
+    if not terms:
+        return queryset
+    conn = connection
+    if conn.vendor == "postgresql":
+        return queryset.filter(
+            RawSQL(
+                "activities_activity.search_vector @@ to_tsquery('french', %s)",
+                [_tsquery(terms)],
+                output_field=BooleanField(),
+            )
+        )
+    if conn.vendor == "sqlite" and is_available(conn):
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [_match(terms)]
+            )
+        )
+    cond = Q()
+    for term in terms:
+        cond &= (
+            Q(titre__icontains=term)
+            | Q(lieu__icontains=term)
+            | Q(description__icontains=term)
+            | Q(sport__name__icontains=term)
+        )
+    return queryset.filter(cond)
+
+
+def rank_queryset(queryset, query: str):
+    """
+    Trie par pertinence (meilleur d'abord), à égalité par date décroissante.
+    Annote `search_rank` (plus grand = plus pertinent). À appliquer sur un queryset
+    déjà passé par `filter_queryset`.
+    """
+    terms = _terms(query)
+    if not terms:
+        return queryset.none()
+    conn = connection
+    if conn.vendor == "postgresql":
+        rank = RawSQL(
+            "ts_rank(activities_activity.search_vector, to_tsquery('french', %s))",
+            [_tsquery(terms)],
+            output_field=FloatField(),
+        )
+    elif conn.vendor == "sqlite" and is_available(conn):
+        # Jointure sur la table FTS (une sous-requête corrélée relancerait MATCH par ligne).
+        # bm25(): plus petit = meilleur, d'où le signe. Poids: titre, lieu, description, sport.
+        return queryset.extra(
+            select={"search_rank": f"-bm25({FTS_TABLE}, 10.0, 4.0, 1.0, 8.0)"},
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = activities_activity.id", f"{FTS_TABLE} MATCH %s"],
+            params=[_match(terms)],
+        ).order_by("-search_rank", "-date_heure", "-id")
+    else:
+        return queryset.order_by("-date_heure", "-id")
+    return queryset.annotate(search_rank=rank).order_by("-search_rank", "-date_heure", "-id")
+
+
+def _tsquery(terms) -> str:
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def _match(terms) -> str:
+    return " ".join(f'"{term}"*' for term in terms)
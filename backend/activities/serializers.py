@@ -1,30 +1,33 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from accounts.serializers import UserSerializer
+from accounts.serializers import PublicUserSerializer, UserSerializer
+from sportconnectgn.serializers import SparseFieldsMixin
 
+from . import geo
 from .models import Activity, Participation, Sport
 
 
 User = get_user_model()
 
 
-class SportSerializer(serializers.ModelSerializer):
+class SportSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Sport
         fields = ["id", "name", "slug"]
         read_only_fields = ["id", "slug"]
 
 
-class ActivitySerializer(serializers.ModelSerializer):
+class ActivitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     sport = SportSerializer(read_only=True)
     sport_id = serializers.PrimaryKeyRelatedField(
         source="sport", queryset=Sport.objects.all(), write_only=True
     )
-    created_by = UserSerializer(read_only=True)
+    created_by = PublicUserSerializer(read_only=True)
     participants_count = serializers.SerializerMethodField()
     is_full = serializers.SerializerMethodField()
     has_joined = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
 
     class Meta:
         model = Activity
@@ -35,6 +38,9 @@ class ActivitySerializer(serializers.ModelSerializer):
             "sport_id",
             "date_heure",
             "lieu",
+            "latitude",
+            "longitude",
+            "distance_km",
             "nombre_places",
             "niveau_requis",
             "description",
@@ -45,35 +51,61 @@ class ActivitySerializer(serializers.ModelSerializer):
             "created_at",
         ]
         read_only_fields = ["id", "created_by", "created_at"]
+        expandable_fields = ["sport", "created_by"]
 
-    def _participations_list(self, obj):
+    def validate(self, attrs):
         """
-        Évite des requêtes inutiles si 'participations' a été prefetched.
+        Coordonnées: les deux ou aucune. Sans coordonnées explicites, un nouveau
+        `lieu` est géolocalisé via le gazetteer des quartiers (geo.locate).
         """
-        try:
-            cache = getattr(obj, "_prefetched_objects_cache", {})
-            if "participations" in cache:
-                return list(cache["participations"])
-        except Exception:
-            pass
-        return list(obj.participations.all())
+        attrs = super().validate(attrs)
+        if ("latitude" in attrs) != ("longitude" in attrs) or (
+            (attrs.get("latitude") is None) != (attrs.get("longitude") is None)
+        ):
+            raise serializers.ValidationError(
+                {"longitude": "Indiquer latitude et longitude ensemble."}
+            )
+        lieu = attrs.get("lieu")
+        if (
+            "latitude" not in attrs
+            and lieu is not None
+            and (self.instance is None or lieu != self.instance.lieu)
+        ):
+            attrs["latitude"], attrs["longitude"] = geo.locate(lieu) or (None, None)
+        return attrs
 
     def get_participants_count(self, obj):
-        return len(self._participations_list(obj))
+        return obj.participants_count
 
     def get_is_full(self, obj):
-        places = getattr(obj, "nombre_places", None) or 0
-        return self.get_participants_count(obj) >= int(places)
+        return obj.is_full
 
     def get_has_joined(self, obj):
+        """
+        Utilise l'annotation `has_joined` (Exists) posée par le viewset si présente,
+        sinon le prefetch 'participations', sinon une requête EXISTS.
+        """
         request = self.context.get("request")
         user = getattr(request, "user", None)
         if not user or not getattr(user, "is_authenticated", False):
             return False
-        return any(p.user_id == user.id for p in self._participations_list(obj))
+        if self.context.get("shared_response"):
+            # Réponse mise en cache: la vue recalcule has_joined par utilisateur.
+            return False
+        annotated = getattr(obj, "has_joined", None)
+        if annotated is not None:
+            return bool(annotated)
+        cache = getattr(obj, "_prefetched_objects_cache", {})
+        if "participations" in cache:
+            return any(p.user_id == user.id for p in cache["participations"])
+        return obj.participations.filter(user_id=user.id).exists()
+
+    def get_distance_km(self, obj):
+        # Annotée par ActivityFilterBackend pour `?near=`.
+        return geo.round_km(getattr(obj, "distance_km", None))
 
 
-class ParticipationSerializer(serializers.ModelSerializer):
+class ParticipationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     activity_detail = ActivitySerializer(source="activity", read_only=True)
 
@@ -81,4 +113,45 @@ class ParticipationSerializer(serializers.ModelSerializer):
         model = Participation
         fields = ["id", "user", "activity", "activity_detail", "joined_at"]
         read_only_fields = ["id", "user", "joined_at"]
+        expandable_fields = ["user", "activity_detail"]
+
+    def to_representation(self, instance):
+        # has_joined de l'activité imbriquée: annoté par ParticipationViewSet.get_queryset.
+        joined = getattr(instance, "activity_has_joined", None)
+        if joined is not None:
+            instance.activity.has_joined = joined
+        return super().to_representation(instance)
+
+
+class RecurrenceSerializer(serializers.Serializer):
+    """Règle de récurrence d'une création en lot: `count` occurrences ou jusqu'à `until`."""
+
+    frequency = serializers.ChoiceField(choices=["daily", "weekly"])
+    interval = serializers.IntegerField(min_value=1, max_value=52, default=1)
+    count = serializers.IntegerField(min_value=1, required=False)
+    until = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if ("count" in attrs) == ("until" in attrs):
+            raise serializers.ValidationError("Indiquer soit `count`, soit `until`.")
+        return attrs
+
+
+class ActivityBulkItemSerializer(ActivitySerializer):
+    """
+    Un élément de POST /api/activities/bulk/. Le sport est résolu en une requête
+    pour tout le lot (voir bulk.create_activities), pas par élément.
+    """
+
+    sport_id = serializers.IntegerField(write_only=True)
+    recurrence = RecurrenceSerializer(required=False, write_only=True)
+
+    class Meta(ActivitySerializer.Meta):
+        fields = ActivitySerializer.Meta.fields + ["recurrence"]
+
+
+class BookingItemSerializer(serializers.Serializer):
+    """Un élément de POST /api/participations/bulk/ (user absent = utilisateur courant)."""
 
+    user = serializers.IntegerField(required=False)
+    activity = serializers.IntegerField()
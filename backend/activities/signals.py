@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache as response_cache
+from . import live, recommend, search
+from .models import Activity, Participation, Sport
+
+
+def _sport_id(participation):
+    # L'activité est en général déjà chargée (book_activity, get_or_create…).
+    if Participation.activity.is_cached(participation):
+        return participation.activity.sport_id
+    return (
+        Activity.objects.filter(pk=participation.activity_id)
+        .values_list("sport_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Participation)
+def participation_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Activity.objects.filter(pk=instance.activity_id).update(
+            participants_count=F("participants_count") + 1, updated_at=timezone.now()
+        )
+        sport_id = _sport_id(instance)
+        if sport_id is not None:
+            recommend.record(instance.user_id, sport_id, +1)
+        live.publish_seats([instance.activity_id])
+
+
+@receiver(post_delete, sender=Participation)
+def participation_deleted(sender, instance, **kwargs):
+    # Aussi appelé pour les suppressions en cascade (user/activité supprimés).
+    Activity.objects.filter(pk=instance.activity_id, participants_count__gt=0).update(
+        participants_count=F("participants_count") - 1, updated_at=timezone.now()
+    )
+    sport_id = _sport_id(instance)
+    if sport_id is not None:
+        recommend.record(instance.user_id, sport_id, -1)
+    live.publish_seats([instance.activity_id])
+
+
+@receiver(post_save, sender=Activity)
+def activity_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        search.reindex([instance.pk])
+        if not created:
+            # nombre_places a pu changer.
+            live.publish_seats([instance.pk])
+
+
+@receiver(post_delete, sender=Activity)
+def activity_deleted(sender, instance, **kwargs):
+    search.unindex([instance.pk])
+
+
+@receiver(post_save, sender=Sport)
+def sport_saved(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        search.reindex(instance.activities.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Activity)
+@receiver(post_delete, sender=Activity)
+@receiver(post_save, sender=Participation)
+@receiver(post_delete, sender=Participation)
+def invalidate_activities_cache(sender, **kwargs):
+    response_cache.bump(response_cache.ACTIVITIES)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_users_cache(sender, **kwargs):
+    # Les utilisateurs sont imbriqués (created_by) dans les activités.
+    response_cache.bump(response_cache.USERS, response_cache.ACTIVITIES)
+
+
+@receiver(post_save, sender=Sport)
+@receiver(post_delete, sender=Sport)
+def invalidate_sports_cache(sender, **kwargs):
+    response_cache.bump(response_cache.SPORTS, response_cache.ACTIVITIES)
@@ -0,0 +1,31 @@
+import random
+
+from django.test import TestCase, TransactionTestCase
+
+from .management.commands.bench_booking import (
+    booking_scenario,
+    capacity_violation,
+    concurrent_bookings,
+)
+from .management.commands.bench_fast_path import equivalence_failure, seed_edge_cases
+
+
+class BookingConcurrencyTests(TransactionTestCase):
+    """Même scénario que `manage.py bench_booking`, à plus petite échelle."""
+
+    def test_capacity_invariant_under_concurrent_bookings(self):
+        # Réservations dans des threads: données committées, d'où TransactionTestCase.
+        activity, bookers = booking_scenario(places=10, attempts=40)
+        results = concurrent_bookings(activity, bookers, threads=8)
+        self.assertIsNone(capacity_violation(activity, results, expected=10))
+        self.assertEqual(sum(results.values()), len(bookers))
+
+
+class FastPathEquivalenceTests(TestCase):
+    """Même propriété que `manage.py bench_fast_path`: fast path et serializers identiques,
+    octet pour octet."""
+
+    def test_fast_path_matches_serializers(self):
+        rng = random.Random(1)
+        users = seed_edge_cases(rng, users=40, activities=150, participations=5)
+        self.assertIsNone(equivalence_failure(rng, cases=60, users=users))
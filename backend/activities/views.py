@@ -1,34 +1,212 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Exists, OuterRef, Value
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import permissions, viewsets
 from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from accounts.models import CustomUser
+from accounts.serializers import PublicUserSerializer
+from sportconnectgn.asyncviews import AsyncReadView, Fallback
+from sportconnectgn.conditional import ConditionalGetMixin
+from sportconnectgn.middleware import AuthTimingMixin
+from sportconnectgn.replicas import ReplicaReadMixin, primary_reads
+
+from . import cache as response_cache
+from . import bulk, export, fastpath, recommend, search
+from .booking import BookingError, book_activity
+from .filters import ActivityFilterBackend
 from .models import Activity, Participation, Sport
+from .pagination import ActivityKeysetPagination
 from .permissions import IsActivityCreatorOrReadOnly
 from .serializers import ActivitySerializer, ParticipationSerializer, SportSerializer
 
 
-class SportViewSet(viewsets.ModelViewSet):
+ACTIVITY_COLUMNS = [f.name for f in Activity._meta.concrete_fields]
+SPORT_COLUMNS = [f.name for f in Sport._meta.concrete_fields]
+PRIVATE_USER_COLUMNS = [
+    f.name
+    for f in CustomUser._meta.concrete_fields
+    if f.name not in PublicUserSerializer.model_fields
+]
+
+
+class CachedReadMixin:
+    """
+    Met en cache la réponse de `list`/`retrieve` (voir activities/cache.py).
+    La réponse partagée est calculée comme pour un visiteur anonyme
+    (`self.shared_response`), puis `personalize()` y ajoute la partie propre
+    à l'utilisateur courant.
+    """
+
+    cache_scope = None
+    shared_response = False
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(super().retrieve, request, *args, **kwargs)
+
+    def _cached(self, view, request, *args, **kwargs):
+        if not settings.API_CACHE_ENABLED:
+            return view(request, *args, **kwargs)
+        key = response_cache.build_key(self.cache_scope, request)
+        data = response_cache.lookup(key)
+        if data is None:
+            self.shared_response = True
+            # Sur "default": lue sur une réplique en retard, elle serait servie périmée à tous.
+            with primary_reads():
+                response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            data = response_cache.plain(response.data)
+            response_cache.store(key, data)
+        return Response(self.personalize(request, data))
+
+    def personalize(self, request, data):
+        return data
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["shared_response"] = self.shared_response
+        return context
+
+
+def export_response(request, kind, queryset):
+    """StreamingHttpResponse CSV/NDJSON selon le renderer négocié (?format=…)."""
+    renderer = request.accepted_renderer
+    response = StreamingHttpResponse(
+        export.STREAMS[renderer.format](kind, queryset),
+        content_type=f"{renderer.media_type}; charset=utf-8",
+    )
+    stamp = timezone.localdate().isoformat()
+    response["Content-Disposition"] = f'attachment; filename="{kind}-{stamp}.{renderer.format}"'
+    return response
+
+
+def limit_param(request, default: int = 20, maximum: int = 100) -> int:
+    try:
+        limit = int(request.query_params.get("limit", default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+EXPORT_ACTION = {
+    "detail": False,
+    "methods": ["get"],
+    "permission_classes": [permissions.IsAdminUser],
+    "renderer_classes": [export.CSVRenderer, export.NDJSONRenderer],
+}
+
+
+def _items(data):
+    return data.get("results", [data]) if isinstance(data, dict) else data
+
+
+def mark_joined(data, joined):
+    for item in _items(data):
+        if "has_joined" in item:
+            item["has_joined"] = item.get("id") in joined
+    return data
+
+
+class FastListMixin:
+    """
+    `list` sans serializer quand la requête le permet (voir fastpath.py): les
+    sous-classes fournissent `fast_values(queryset)` et `fast_render(rows)`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not fastpath.supports(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.fast_values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.fast_render(page))
+        return Response(self.fast_render(queryset))
+
+
+class SportViewSet(
+    AuthTimingMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+    CachedReadMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Sport.objects.all().order_by("name")
     serializer_class = SportSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_scope = response_cache.SPORTS
+
+    def get_validator_state(self, request):
+        return response_cache.version_state(response_cache.SPORTS)
 
 
-class ActivityViewSet(viewsets.ModelViewSet):
+class ActivityViewSet(
+    AuthTimingMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+    CachedReadMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = ActivitySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsActivityCreatorOrReadOnly]
+    filter_backends = [ActivityFilterBackend]
+    pagination_class = ActivityKeysetPagination
+    cache_scope = response_cache.ACTIVITIES
 
     def get_queryset(self):
-        return (
-            Activity.objects.select_related("sport", "created_by")
-            .prefetch_related("participations")
-            .all()
+        # created_by n'expose que le profil public: inutile de charger password, bio…
+        qs = Activity.objects.select_related("sport", "created_by").only(
+            *ACTIVITY_COLUMNS,
+            *(f"sport__{name}" for name in SPORT_COLUMNS),
+            *(f"created_by__{name}" for name in PublicUserSerializer.model_fields),
+        )
+        user = self.request.user
+        if getattr(user, "is_authenticated", False) and not self.shared_response:
+            joined = Participation.objects.filter(activity=OuterRef("pk"), user=user)
+            qs = qs.annotate(has_joined=Exists(joined))
+        return qs
+
+    def get_validator_state(self, request):
+        # Toute écriture d'activité, participation, sport ou utilisateur (imbriqués
+        # dans la réponse) incrémente la version du scope (signals.py).
+        return response_cache.version_state(response_cache.ACTIVITIES)
+
+    def fast_values(self, queryset):
+        return fastpath.activity_values(queryset)
+
+    def fast_render(self, rows):
+        return fastpath.activities(rows, self.request, self.shared_response)
+
+    def personalize(self, request, data):
+        """Recalcule has_joined pour l'utilisateur courant: une requête par page."""
+        joined = self.joined_query(request, data)
+        return mark_joined(data, set(joined) if joined is not None else set())
+
+    @staticmethod
+    def joined_query(request, data):
+        """Ids des activités de `data` auxquelles l'utilisateur participe (None: anonyme)."""
+        user = request.user
+        if not getattr(user, "is_authenticated", False):
+            return None
+        ids = [item["id"] for item in _items(data) if "id" in item]
+        return Participation.objects.filter(user=user, activity_id__in=ids).values_list(
+            "activity_id", flat=True
         )
 
     def perform_create(self, serializer):
         activity = serializer.save(created_by=self.request.user)
         # Le créateur est invité d'office (pas besoin de réserver).
         Participation.objects.get_or_create(user=self.request.user, activity=activity)
+        activity.refresh_from_db(fields=["participants_count"])
 
     @action(detail=False, methods=["get"], permission_classes=[permissions.IsAuthenticated])
     def mine(self, request):
@@ -37,24 +215,113 @@ class ActivityViewSet(viewsets.ModelViewSet):
             .filter(created_by=request.user)
             .order_by("-date_heure", "-id")
         )
+        if fastpath.supports(request):
+            return Response(self.fast_render(self.fast_values(qs)))
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="for-you",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def for_you(self, request):
+        """
+        Fil personnalisé: activités à venir classées selon les sports pratiqués, le
+        niveau, le quartier et les places restantes (voir recommend.py). `?limit=20`.
+        """
+        ids = recommend.feed(request.user, limit_param(request, maximum=50))
+        qs = self.get_queryset().filter(pk__in=ids)
+        if fastpath.supports(request):
+            rows = {row["id"]: row for row in self.fast_values(qs)}
+            return Response({"results": self.fast_render([rows[pk] for pk in ids if pk in rows])})
+        activities = {activity.pk: activity for activity in qs}
+        serializer = self.get_serializer(
+            [activities[pk] for pk in ids if pk in activities], many=True
+        )
+        return Response({"results": serializer.data})
+
+    @action(detail=False, methods=["post"], permission_classes=[permissions.IsAuthenticated])
+    def bulk(self, request):
+        """
+        Création en lot: `{"items": [<activité>, ...]}`, chaque élément pouvant porter
+        une `recurrence` ({"frequency": "weekly", "interval": 1, "count": 10}).
+        Réponse: un résultat par élément (ids créés ou erreurs).
+        """
+        results = bulk.create_activities(request.user, bulk.parse_items(request.data))
+        return Response({"results": results}, status=bulk.response_status(results))
+
+    @action(**EXPORT_ACTION)
+    def export(self, request):
+        """
+        Export complet (staff), en flux: `?format=csv` (défaut) ou `?format=ndjson`.
+        Les filtres de la liste (sport, dates, q…) s'appliquent.
+        """
+        queryset = self.filter_queryset(export.base_queryset("activities"))
+        return export_response(request, "activities", queryset)
 
-class ParticipationViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        Recherche plein texte classée par pertinence: `?q=...&limit=20`.
+        Les autres filtres de la liste (sport, niveau_requis, dates…) s'appliquent aussi.
+        """
+        q = request.query_params.get("q", "").strip()
+        if not q:
+            raise ValidationError({"q": "Ce paramètre est requis."})
+        qs = search.rank_queryset(self.filter_queryset(self.get_queryset()), q)
+        serializer = self.get_serializer(qs[: limit_param(request)], many=True)
+        return Response({"results": serializer.data})
+
+
+class ParticipationViewSet(
+    AuthTimingMixin, ConditionalGetMixin, FastListMixin, viewsets.ModelViewSet
+):
     serializer_class = ParticipationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_validator_state(self, request):
+        # Même scope que les activités: participations, activités, sports et utilisateurs.
+        return response_cache.version_state(response_cache.ACTIVITIES)
+
     def get_queryset(self):
-        qs = (
-            Participation.objects.select_related("user", "activity", "activity__sport")
-            .prefetch_related("activity__participations")
-            .all()
-        )
+        # Requêtes fixes quelle que soit la popularité des activités: plus de prefetch
+        # des participations des autres, has_joined est annoté.
         user = self.request.user
+        qs = Participation.objects.select_related(
+            "user", "activity", "activity__sport", "activity__created_by"
+        ).defer(*(f"activity__created_by__{name}" for name in PRIVATE_USER_COLUMNS))
         if getattr(user, "is_staff", False):
-            return qs
-        return qs.filter(user=user)
+            joined = Participation.objects.filter(activity=OuterRef("activity"), user=user)
+            return qs.annotate(activity_has_joined=Exists(joined))
+        return qs.filter(user=user).annotate(activity_has_joined=Value(True))
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Réservations en lot: `{"items": [{"activity": 3, "user": 12}, ...]}` (`user`
+        absent = soi-même). Un résultat par élément (id ou code d'erreur).
+        """
+        results = bulk.book_many(request.user, bulk.parse_items(request.data))
+        return Response({"results": results}, status=bulk.response_status(results))
+
+    @action(**EXPORT_ACTION)
+    def export(self, request):
+        """Toutes les participations (staff), en flux; `?activity=<id>` pour une seule activité."""
+        queryset = export.base_queryset("participations")
+        activity = request.query_params.get("activity")
+        if activity:
+            if not activity.isdigit():
+                raise ValidationError({"activity": "Identifiant invalide."})
+            queryset = queryset.filter(activity_id=int(activity))
+        return export_response(request, "participations", queryset)
+
+    def fast_values(self, queryset):
+        return fastpath.participation_values(queryset)
+
+    def fast_render(self, rows):
+        return fastpath.participations(rows, self.request)
 
     def perform_create(self, serializer):
         # Par défaut, on force l'utilisateur courant pour éviter l'usurpation.
@@ -62,9 +329,62 @@ class ParticipationViewSet(viewsets.ModelViewSet):
         activity = serializer.validated_data.get("activity")
         if activity is None:
             raise ValidationError({"activity": "Ce champ est requis."})
-        if Participation.objects.filter(user=user, activity=activity).exists():
-            raise ValidationError({"detail": "Tu as déjà réservé cette activité."})
-        if Participation.objects.filter(activity=activity).count() >= activity.nombre_places:
-            raise ValidationError({"detail": "Cette activité est complète."})
-        serializer.save(user=user)
+        try:
+            serializer.instance = book_activity(user, activity)
+        except BookingError as e:
+            raise ValidationError({"detail": str(e)}) from e
+        activity.refresh_from_db(fields=["participants_count"])
+
+
+# -- Lectures asynchrones (API_ASYNC_VIEWS, voir sportconnectgn/asyncviews.py) ----------
+
+
+async def aget_object(view, queryset):
+    """get_object() asynchrone; absent ou identifiant invalide: la vue DRF répondra 404."""
+    lookup = view.lookup_url_kwarg or view.lookup_field
+    try:
+        obj = await queryset.filter(**{view.lookup_field: view.kwargs[lookup]}).afirst()
+    except (TypeError, ValueError, DjangoValidationError):
+        obj = None
+    if obj is None:
+        raise Fallback()
+    view.check_object_permissions(view.request, obj)
+    return obj
+
+
+class SportReadView(AsyncReadView):
+    async def get_validator_state(self, view, request):
+        return await sync_to_async(response_cache.version_state)(response_cache.SPORTS)
+
+    async def get_data(self, view, request):
+        queryset = view.filter_queryset(view.get_queryset())
+        if view.action == "retrieve":
+            return view.get_serializer(await aget_object(view, queryset)).data
+        page = await view.paginator.apaginate_queryset(queryset, request, view=view)
+        return view.get_paginated_response(view.get_serializer(page, many=True).data).data
+
+
+class ActivityReadView(AsyncReadView):
+    """Liste et détail des activités, rendus par fastpath (sans serializer)."""
+
+    async def get_validator_state(self, view, request):
+        return await sync_to_async(response_cache.version_state)(response_cache.ACTIVITIES)
+
+    async def get_data(self, view, request):
+        if not fastpath.supports(request):
+            raise Fallback()
+        queryset = view.get_queryset()
+        if request.query_params.get("q", "").strip():
+            # search.filter_queryset() peut interroger la base (index SQLite présent?).
+            queryset = await sync_to_async(view.filter_queryset)(queryset)
+        else:
+            queryset = view.filter_queryset(queryset)
+        queryset = view.fast_values(queryset)
+        if view.action == "retrieve":
+            return view.fast_render([await aget_object(view, queryset)])[0]
+        page = await view.paginator.apaginate_queryset(queryset, request, view=view)
+        return view.get_paginated_response(view.fast_render(page)).data
 
+    async def personalize(self, view, request, data):
+        joined = view.joined_query(request, data)
+        return mark_joined(data, {pk async for pk in joined} if joined is not None else set())
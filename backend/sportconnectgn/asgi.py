@@ -1,12 +1,32 @@
 """
 ASGI config for SportConnectGN.
+
+Requis pour les flux temps réel (/api/live/..., voir activities/live.py), ex:
+    uvicorn sportconnectgn.asgi:application
+ou, en production, GUNICORN_PROFILE=uvicorn (sportconnectgn/gunicorn_conf.py).
+
+Plusieurs requêtes simultanées par worker, chacune dans son thread (donc avec sa
+connexion à la base: DATABASE_POOL=1 sur PostgreSQL). API_ASYNC_VIEWS=1 sert les
+lectures chaudes par les vues asynchrones de sportconnectgn/asyncviews.py.
 """
 
 import os
 
 from django.core.asgi import get_asgi_application
 
+from sportconnectgn.startup import load_urlconf
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sportconnectgn.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+load_urlconf()
+
+# Après get_asgi_application(), qui configure Django.
+from activities.live import asgi_stream, is_stream_request  # noqa: E402
+
 
+async def application(scope, receive, send):
+    if is_stream_request(scope):
+        await asgi_stream(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
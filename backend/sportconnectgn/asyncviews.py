@@ -0,0 +1,155 @@
+"""
+Vues de lecture asynchrones (API_ASYNC_VIEWS=1), servies par sportconnectgn.asgi.
+
+Sous un serveur ASGI, une requête qui attend PostgreSQL ne bloque plus un worker:
+authentification, validateurs ETag, cache et lecture passent par les API
+asynchrones de Django (aget, acount, `async for`…), et la boucle sert d'autres
+requêtes pendant ce temps. Avec Django 5, chaque requête SQL passe encore par un
+thread (un par requête HTTP): le débit gagné vient surtout du serveur ASGI, vues
+synchrones comprises; `manage.py bench_async` compare les trois configurations.
+
+Chaque vue double un viewset DRF existant: elle en reprend l'instance (queryset,
+filtres, pagination, permissions, négociation, finalize_response) et ne réécrit
+que les lectures. Tout ce qu'elle ne couvre pas repasse par la vue DRF
+synchrone (`fallback`): méthodes d'écriture, throttling, API navigable,
+`?fields=`/`?expand=`, et toute erreur d'API (401, 404, filtre invalide…), pour
+des réponses identiques à celles du viewset. `manage.py bench_async` vérifie
+l'égalité des réponses et compare les débits.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from activities import cache as response_cache
+
+from .conditional import validators
+from .middleware import auth_timing
+from .replicas import ais_pinned, primary_reads, scope_written, use_replica
+
+
+ASYNC_FORMATS = ("json", "msgpack")
+
+
+class Fallback(Exception):
+    """Cas non couvert par la vue asynchrone: la requête passe par le viewset DRF."""
+
+
+class AsyncReadView(View):
+    """
+    GET/HEAD asynchrones devant la vue `fallback` d'un viewset (callback du routeur).
+    Les sous-classes implémentent `get_validator_state()` et `get_data()`, et au
+    besoin `personalize()` (mêmes rôles que dans ConditionalGetMixin/CachedReadMixin).
+    """
+
+    fallback = None
+    # dispatch() traite toutes les méthodes: aucun gestionnaire get()/post() à inspecter.
+    view_is_async = True
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Comme APIView: l'authentification est faite par JWT, pas par session.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method in ("GET", "HEAD"):
+            try:
+                return await self.read(request, *args, **kwargs)
+            except (Fallback, APIException):
+                pass
+        return await sync_to_async(self.fallback)(request, *args, **kwargs)
+
+    def get_viewset(self, request, *args, **kwargs):
+        """Instance du viewset, préparée comme par ViewSetMixin.as_view()."""
+        view = self.fallback.cls(**self.fallback.initkwargs)
+        view.action_map = {"head": self.fallback.actions["get"], **self.fallback.actions}
+        for method, action in view.action_map.items():
+            setattr(view, method, getattr(view, action))
+        view.request, view.args, view.kwargs = request, args, kwargs
+        return view
+
+    async def read(self, request, *args, **kwargs):
+        view = self.get_viewset(request, *args, **kwargs)
+        request = view.initialize_request(request, *args, **kwargs)
+        view.request = request
+        view.headers = view.default_response_headers
+        await self.initial(view, request)
+
+        view._etag, view._last_modified = None, None
+        state = await self.get_validator_state(view, request)
+        if state is not None:
+            view._etag, view._last_modified = validators(request, state)
+        if view._etag and get_conditional_response(request._request, etag=view._etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(await self.get_cached_data(view, request))
+        response = view.finalize_response(request, response, *args, **kwargs)
+        # Rendu ici: le gestionnaire de Django passerait sinon par un thread.
+        return response.render()
+
+    async def initial(self, view, request):
+        """APIView.initial(), avec une authentification asynchrone."""
+        view.format_kwarg = view.get_format_suffix(**view.kwargs)
+        renderer, media_type = view.perform_content_negotiation(request)
+        if renderer.format not in ASYNC_FORMATS:
+            raise Fallback()
+        request.accepted_renderer, request.accepted_media_type = renderer, media_type
+        request.version, request.versioning_scheme = view.determine_version(
+            request, *view.args, **view.kwargs
+        )
+        with auth_timing(request):
+            await self.authenticate(request)
+        view.check_permissions(request)
+        if view.get_throttles():
+            raise Fallback()
+        # Comme ReplicaReadMixin.initial().
+        eligible = getattr(view, "replica_eligible", None)
+        if eligible is None or not eligible(request) or await ais_pinned(request.user):
+            return
+        scope = getattr(view, "cache_scope", None)
+        if scope is None or not await sync_to_async(scope_written)(scope):
+            use_replica()
+
+    async def authenticate(self, request):
+        for authenticator in request.authenticators:
+            if not hasattr(authenticator, "aauthenticate"):
+                raise Fallback()
+            user_auth_tuple = await authenticator.aauthenticate(request)
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+        request._not_authenticated()
+
+    async def get_cached_data(self, view, request):
+        """Données de la réponse, via le cache de CachedReadMixin si le viewset l'utilise."""
+        scope = getattr(view, "cache_scope", None)
+        if scope is None or not settings.API_CACHE_ENABLED:
+            return await self.get_data(view, request)
+
+        def lookup():
+            key = response_cache.build_key(scope, request)
+            return key, response_cache.lookup(key)
+
+        key, data = await sync_to_async(lookup)()
+        if data is None:
+            view.shared_response = True
+            with primary_reads():
+                data = response_cache.plain(await self.get_data(view, request))
+            await sync_to_async(response_cache.store)(key, data)
+        return await self.personalize(view, request, data)
+
+    async def get_validator_state(self, view, request):
+        return None
+
+    async def get_data(self, view, request):
+        raise NotImplementedError
+
+    async def personalize(self, view, request, data):
+        return data
@@ -0,0 +1,101 @@
+"""
+Vérifications système (manage.py check, migrate…) de l'état partagé entre workers.
+
+Plusieurs workers gunicorn (sportconnectgn/gunicorn_conf.py) ne partagent que la
+base et un cache partagé en mémoire (Redis, memcached: SHARED_CACHE_BACKENDS): ce
+que le projet garde dans un cache locmem n'est vu que par le process qui l'a écrit.
+En DEBUG (runserver, un seul process), pas d'alerte pour cela. Les erreurs (E…)
+bloquent `manage.py migrate`, donc le déploiement (render.yaml).
+"""
+
+from django.conf import settings
+from django.core import checks
+
+
+LOCMEM = "django.core.cache.backends.locmem.LocMemCache"
+DUMMY = "django.core.cache.backends.dummy.DummyCache"
+
+
+def process_local_cache(alias: str) -> bool:
+    """Cache propre au process (locmem): invisible des autres workers."""
+    return settings.CACHES[alias]["BACKEND"] == LOCMEM
+
+
+def shared_cache(alias: str) -> bool:
+    """Cache en mémoire où une valeur écrite par un worker est relue par les autres."""
+    return settings.CACHES[alias]["BACKEND"] in settings.SHARED_CACHE_BACKENDS
+
+
+def atomic_counters(alias: str) -> bool:
+    """incr() atomique: deux incréments simultanés donnent deux valeurs distinctes."""
+    return shared_cache(alias) or settings.CACHES[alias]["BACKEND"] in (LOCMEM, DUMMY)
+
+
+SHARED_CACHE = "REDIS_URL (Redis) ou DJANGO_CACHE_BACKEND memcached"
+SHARED_CACHE_HINT = SHARED_CACHE + "; sinon un seul worker."
+
+
+@checks.register(checks.Tags.caches)
+def check_api_cache(app_configs, **kwargs):
+    if settings.DEBUG or not settings.API_CACHE_ENABLED:
+        return []
+    if not process_local_cache(settings.API_CACHE_ALIAS):
+        return []
+    return [
+        checks.Warning(
+            "Cache des réponses de l'API propre à chaque process: après une écriture, "
+            "les autres workers servent leurs réponses en cache jusqu'à API_CACHE_TIMEOUT.",
+            hint=SHARED_CACHE_HINT,
+            id="sportconnectgn.W001",
+        )
+    ]
+
+
+@checks.register(checks.Tags.caches)
+def check_version_counters(app_configs, **kwargs):
+    # Aussi en DEBUG: runserver sert les requêtes dans plusieurs threads.
+    if atomic_counters(settings.API_CACHE_VERSION_ALIAS):
+        return []
+    return [
+        checks.Error(
+            "Compteurs de version du cache de l'API (ETag, clés des réponses) sur un cache "
+            "sans incr() atomique (base, fichiers): deux écritures simultanées peuvent "
+            "laisser la même version, et servir des 304 ou des réponses périmées.",
+            hint=SHARED_CACHE + ", ou locmem avec un seul worker.",
+            id="sportconnectgn.E002",
+        )
+    ]
+
+
+@checks.register(checks.Tags.caches, checks.Tags.security)
+def check_auth_snapshot(app_configs, **kwargs):
+    if settings.DEBUG or settings.AUTH_USER_CACHE_TIMEOUT <= 0:
+        return []
+    if shared_cache(settings.API_CACHE_ALIAS):
+        return []
+    return [
+        checks.Warning(
+            "Instantané utilisateur de CachedJWTAuthentication désactivé (cache non "
+            "partagé): une requête SQL par requête authentifiée.",
+            hint=SHARED_CACHE_HINT,
+            id="sportconnectgn.W002",
+        )
+    ]
+
+
+@checks.register(checks.Tags.caches, checks.Tags.database)
+def check_replica_pins(app_configs, **kwargs):
+    if settings.DEBUG or not settings.DATABASE_REPLICAS:
+        return []
+    aliases = (settings.API_CACHE_ALIAS, settings.API_CACHE_VERSION_ALIAS)
+    if all(shared_cache(alias) for alias in aliases):
+        return []
+    return [
+        checks.Error(
+            "DATABASE_REPLICA_URLS sans cache partagé: les marqueurs d'écriture récente "
+            "(sportconnectgn/replicas.py) ne sont vus que par le worker qui les pose; "
+            "les autres liraient sur une réplique en retard juste après une écriture.",
+            hint=SHARED_CACHE + ".",
+            id="sportconnectgn.E001",
+        )
+    ]
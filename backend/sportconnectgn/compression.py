@@ -0,0 +1,182 @@
+"""
+Compression des réponses de l'API (Brotli ou gzip selon Accept-Encoding).
+
+WhiteNoise sert déjà les fichiers statiques précompressés; ce middleware couvre les
+réponses dynamiques sous COMPRESSION_PATH_PREFIXES (par défaut /api/ seulement:
+pas de pages HTML avec jeton CSRF, donc pas d'exposition à BREACH).
+
+- Brotli si le paquet `brotli` est installé et accepté par le client, sinon gzip;
+- les petits corps (< COMPRESSION_MIN_SIZE) et les types déjà compressés
+  (images…) partent tels quels;
+- les StreamingHttpResponse (exports) sont compressées au fil de l'eau, morceau
+  par morceau, sans tout garder en mémoire; sauf les flux SSE (text/event-stream);
+- niveaux réglables: COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY.
+"""
+
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/msgpack",
+    "application/x-ndjson",
+    "text/",
+)
+# Flux SSE: un compresseur par connexion ouverte coûterait de la mémoire pour rien.
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Encodages proposés, par ordre de préférence à qualité égale."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, available=None) -> str | None:
+    """Choisit un encodage d'après l'en-tête Accept-Encoding (q-values comprises)."""
+    available = available or available_encodings()
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """Interface commune gzip / Brotli: process() puis finish()."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._obj = brotli.Compressor(
+                mode=brotli.MODE_TEXT, quality=settings.COMPRESSION_BROTLI_QUALITY
+            )
+        else:
+            # wbits=31: en-tête et pied gzip.
+            self._obj = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._obj.process(data)
+            return out + self._obj.flush() if flush else out
+        out = self._obj.compress(data)
+        return out + self._obj.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    compressor = _Compressor(encoding)
+    return compressor.process(data) + compressor.finish()
+
+
+def _compress_stream(chunks, encoding: str):
+    compressor = _Compressor(encoding)
+    for chunk in chunks:
+        # flush: chaque morceau part tout de suite (pas d'attente de la fin de l'export).
+        out = compressor.process(chunk, flush=True)
+        if out:
+            yield out
+    yield compressor.finish()
+
+
+async def _acompress_stream(chunks, encoding: str):
+    compressor = _Compressor(encoding)
+    async for chunk in chunks:
+        out = compressor.process(chunk, flush=True)
+        if out:
+            yield out
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    # Asynchrone sous ASGI: pas de thread par requête pour les vues asynchrones.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.COMPRESSION_PATH_PREFIXES)
+        self.min_size = settings.COMPRESSION_MIN_SIZE
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not self._eligible(request, response):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _acompress_stream(
+                    response.streaming_content, encoding
+                )
+            else:
+                response.streaming_content = _compress_stream(
+                    response.streaming_content, encoding
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # Le corps n'est plus identique octet pour octet: ETag faible (comme GZipMiddleware).
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def _eligible(self, request, response) -> bool:
+        if not request.path.startswith(self.prefixes):
+            return False
+        if response.has_header("Content-Encoding") or response.status_code in (204, 304):
+            return False
+        content_type = response.get("Content-Type", "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(
+            UNCOMPRESSED_TYPES
+        )
@@ -0,0 +1,77 @@
+"""
+GET conditionnels (ETag / Last-Modified) pour les viewsets DRF.
+
+Les validateurs sont calculés sans sérialiser la réponse ni interroger la base:
+compteurs de version du cache de l'API (activities/cache.py, incrémentés à chaque
+écriture), ou date de modification déjà chargée (users/me). Si le client renvoie un
+ETag encore valide (If-None-Match), la vue répond 304 avant d'exécuter la moindre
+requête de liste. Last-Modified, quand il existe, est fourni à titre indicatif.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def validators(request, state):
+    """(ETag, Last-Modified en timestamp ou None) d'une requête DRF pour cet état."""
+    stamps = [last for last, _ in state if last is not None]
+    last_modified = max(stamps).timestamp() if stamps else None
+    user_id = getattr(request.user, "pk", None)
+    # Le format négocié (JSON, MessagePack…) fait partie de la représentation.
+    raw = "|".join(
+        [request.get_full_path(), str(user_id), str(request.accepted_media_type)]
+        + [f"{last.isoformat() if last else '-'}:{count}" for last, count in state]
+    )
+    return quote_etag(hashlib.sha1(raw.encode("utf-8")).hexdigest()), last_modified
+
+
+class _NotModified(Exception):
+    pass
+
+
+class ConditionalGetMixin:
+    """
+    À combiner avec un viewset: il suffit d'implémenter `get_validator_state()`,
+    qui retourne une liste de couples (datetime | None, int) décrivant les données
+    dont dépend la réponse (ex: `response_cache.version_state(scope)`). L'ETag
+    intègre aussi l'URL et l'utilisateur, car certaines réponses (has_joined,
+    participations…) sont personnelles.
+    """
+
+    conditional_methods = ("GET", "HEAD")
+
+    def get_validator_state(self, request):
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._etag = self._last_modified = None
+        if request.method not in self.conditional_methods:
+            return
+        state = self.get_validator_state(request)
+        if state is None:
+            return
+        self._etag, self._last_modified = validators(request, state)
+        # Seul l'ETag décide du 304: une date de modification ne voit pas les
+        # suppressions, If-Modified-Since seul pourrait valider une réponse périmée.
+        if get_conditional_response(request._request, etag=self._etag) is not None:
+            raise _NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, "_etag", None)
+        if etag and response.status_code in (200, 304):
+            response["ETag"] = etag
+            if self._last_modified is not None:
+                response["Last-Modified"] = http_date(self._last_modified)
+            patch_vary_headers(response, ("Accept", "Authorization"))
+        return response
@@ -0,0 +1,171 @@
+"""
+Configuration gunicorn de production, choisie par variables d'environnement:
+    gunicorn -c python:sportconnectgn.gunicorn_conf
+
+GUNICORN_PROFILE (gthread par défaut):
+- sync: un client à la fois par worker (l'ancien défaut de gunicorn);
+- gthread: GUNICORN_THREADS requêtes simultanées par worker (4), keep-alive; une
+  connexion persistante à la base par thread (DATABASE_POOL=1 pour les borner);
+- uvicorn: workers ASGI (sportconnectgn.asgi, paquet uvicorn-worker), requis pour
+  servir les flux temps réel sans bloquer un worker par abonné (activities/live.py).
+L'application n'est pas à passer en argument: elle suit le profil (`wsgi_app`).
+
+Nombre de workers (WEB_CONCURRENCY pour le fixer): d'après les cœurs alloués
+(quota cgroup du conteneur, pas ceux de la machine), 2 x cœurs + 1 en sync et
+cœurs + 1 sinon, puis plafonné par la mémoire du conteneur divisée par
+GUNICORN_WORKER_MEMORY_MB (mémoire propre d'un worker après quelques requêtes,
+voir `manage.py bench_startup`). Un seul worker, en revanche, tant que l'état
+partagé reste propre au process: cache locmem (ni REDIS_URL ni DJANGO_CACHE_BACKEND)
+ou, en uvicorn, broker temps réel en mémoire (LIVE_BROKER). render.yaml configure
+Redis et PostgresBroker.
+
+GUNICORN_PRELOAD (oui par défaut): Django, DRF et l'application sont importés une
+fois par le master, puis partagés par fork (copie sur écriture): démarrage et
+recyclage des workers quasi instantanés, et moins de mémoire par worker.
+GUNICORN_MAX_REQUESTS (1000) et GUNICORN_MAX_REQUESTS_JITTER (10 % par défaut)
+recyclent les workers à tour de rôle, jamais tous en même temps.
+"""
+
+import gc
+import math
+import os
+
+
+PROFILES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "uvicorn": "uvicorn_worker.UvicornWorker",
+}
+# Marge laissée au master, aux pics de mémoire et au cache de pages.
+MEMORY_FRACTION = 0.75
+# PSS d'un worker avec preload: ~30 Mo après quelques centaines de requêtes, plus
+# la croissance (caches locmem, connexions) d'ici son recyclage.
+WORKER_MEMORY_MB = int(os.getenv("GUNICORN_WORKER_MEMORY_MB", "64"))
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    val = os.getenv(name)
+    if val is None:
+        return default
+    return val.strip().lower() in {"1", "true", "yes", "y", "on"}
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cpu_limit() -> int:
+    """Cœurs utilisables: quota cgroup (v2 puis v1), sinon affinité du process."""
+    quota = _read("/sys/fs/cgroup/cpu.max")
+    if quota and not quota.startswith("max"):
+        limit, period = quota.split()
+        return max(1, math.ceil(int(limit) / int(period)))
+    limit, period = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us"), _read(
+        "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+    )
+    if limit and period and int(limit) > 0:
+        return max(1, math.ceil(int(limit) / int(period)))
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def memory_limit_mb() -> int:
+    """Mémoire du conteneur (cgroup v2 puis v1), bornée par la mémoire physique."""
+    physical = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    limits = [physical]
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        value = _read(path)
+        if value and value.isdigit():
+            limits.append(int(value))
+    return min(limits) // (1024 * 1024)
+
+
+def process_local_state(profile: str) -> str | None:
+    """Ce qui n'est pas partagé entre workers (mêmes défauts que settings.py), ou None."""
+    backend = os.getenv("DJANGO_CACHE_BACKEND") or (
+        "RedisCache" if os.getenv("REDIS_URL") else "LocMemCache"
+    )
+    if not backend.endswith(("RedisCache", "PyMemcacheCache", "PyLibMCCache")):
+        return f"cache {backend.rsplit('.', 1)[-1]}"
+    broker = os.getenv("LIVE_BROKER", "sportconnectgn.pubsub.InProcessBroker")
+    if profile == "uvicorn" and broker.endswith("InProcessBroker"):
+        return "broker temps réel InProcessBroker"
+    return None
+
+
+def default_workers(profile: str, cores: int, memory_mb: int, worker_mb: int) -> int:
+    by_cpu = 2 * cores + 1 if profile == "sync" else cores + 1
+    by_memory = int(memory_mb * MEMORY_FRACTION) // worker_mb
+    return max(1, min(by_cpu, by_memory))
+
+
+profile = os.getenv("GUNICORN_PROFILE", "gthread").strip().lower()
+if profile not in PROFILES:
+    raise RuntimeError(f"GUNICORN_PROFILE inconnu: {profile!r} ({', '.join(PROFILES)}).")
+
+worker_class = PROFILES[profile]
+wsgi_app = (
+    "sportconnectgn.asgi:application"
+    if profile == "uvicorn"
+    else "sportconnectgn.wsgi:application"
+)
+local_state = process_local_state(profile)
+if os.getenv("WEB_CONCURRENCY"):
+    workers = int(os.getenv("WEB_CONCURRENCY"))
+elif local_state:
+    workers = 1
+else:
+    workers = default_workers(profile, cpu_limit(), memory_limit_mb(), WORKER_MEMORY_MB)
+threads = int(os.getenv("GUNICORN_THREADS", "4")) if profile == "gthread" else 1
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+preload_app = _env_bool("GUNICORN_PRELOAD", default=True)
+# Ignoré par les workers sync, qui ferment la connexion après chaque réponse.
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", str(max_requests // 10)))
+# Battement des workers en mémoire: un disque lent de conteneur ne les fait pas tuer.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def when_ready(server):
+    server.log.info(
+        "Profil %s: %d worker(s)%s, preload %s, recyclage après %d (+0..%d) requêtes.",
+        profile,
+        workers,
+        f" x {threads} threads" if threads > 1 else "",
+        "oui" if preload_app else "non",
+        max_requests,
+        max_requests_jitter,
+    )
+    if local_state and workers > 1:
+        server.log.warning(
+            "%s propre à chaque process, avec %d workers: voir CACHES et LIVE_BROKER "
+            "dans settings.py.",
+            local_state.capitalize(),
+            workers,
+        )
+    elif local_state:
+        server.log.info(
+            "Un seul worker: %s (WEB_CONCURRENCY pour en fixer le nombre).", local_state
+        )
+
+
+def pre_fork(server, worker):
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+
+    # Une connexion ouverte par le master serait partagée par tous les workers.
+    connections.close_all()
+    # Objets du master hors du ramasse-miettes: le parcourir ne les recopierait
+    # plus page par page dans chaque worker (copie sur écriture).
+    gc.freeze()
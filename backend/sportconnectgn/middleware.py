@@ -0,0 +1,227 @@
+"""
+Middlewares du projet.
+
+WhiteNoiseMiddleware: WhiteNoise utilisable aussi en mode asynchrone.
+
+Instrumentation par requête (opt-in: REQUEST_TIMING=1).
+
+- compte les requêtes SQL et leur durée via `connection.execute_wrapper`;
+- mesure le rendu de la réponse (JSONRenderer & co);
+- mesure l'authentification et les permissions des vues DRF (`AuthTimingMixin`);
+- ajoute un en-tête `Server-Timing` (visible dans l'onglet Réseau du navigateur);
+- journalise les requêtes lentes avec leurs instructions SQL les plus coûteuses;
+- agrège des histogrammes de latence par route (voir `timing_stats`).
+"""
+
+from contextlib import ExitStack, contextmanager
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from whitenoise import middleware as whitenoise
+
+
+logger = logging.getLogger("sportconnectgn.timing")
+
+# Bornes supérieures des seaux d'histogramme, en millisecondes.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+
+class RouteStats:
+    """Histogrammes de latence par route, en mémoire (par process)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route: str, total_ms: float, db_ms: float, queries: int) -> None:
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "db_ms": 0.0,
+                    "queries": 0,
+                    "max_ms": 0.0,
+                    "buckets": [0] * len(BUCKETS_MS),
+                }
+            stats["count"] += 1
+            stats["total_ms"] += total_ms
+            stats["db_ms"] += db_ms
+            stats["queries"] += queries
+            stats["max_ms"] = max(stats["max_ms"], total_ms)
+            for i, bound in enumerate(BUCKETS_MS):
+                if total_ms <= bound:
+                    stats["buckets"][i] += 1
+                    break
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = {}
+            for route, stats in self._routes.items():
+                count = stats["count"]
+                out[route] = {
+                    "count": count,
+                    "mean_ms": round(stats["total_ms"] / count, 2),
+                    "mean_db_ms": round(stats["db_ms"] / count, 2),
+                    "mean_queries": round(stats["queries"] / count, 2),
+                    "max_ms": round(stats["max_ms"], 2),
+                    "buckets": {
+                        ("+inf" if bound == float("inf") else f"le_{bound}"): n
+                        for bound, n in zip(BUCKETS_MS, stats["buckets"])
+                    },
+                }
+            return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+timing_stats = RouteStats()
+
+
+class WhiteNoiseMiddleware(whitenoise.WhiteNoiseMiddleware):
+    """
+    L'original n'est que synchrone: sous ASGI, Django ferait passer chaque requête
+    par un thread, vues asynchrones comprises. Ici, seuls les fichiers statiques
+    (lus sur disque) y passent; sous WSGI, rien ne change.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class _QueryTimer:
+    def __init__(self, keep: int):
+        self.count = 0
+        self.total = 0.0
+        self.keep = keep
+        self.slowest = []  # [(durée, sql)], les `keep` plus lentes
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.total += elapsed
+            if len(self.slowest) < self.keep or elapsed > self.slowest[-1][0]:
+                self.slowest.append((elapsed, sql))
+                self.slowest.sort(key=lambda item: item[0], reverse=True)
+                del self.slowest[self.keep :]
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = settings.REQUEST_TIMING_SLOW_MS
+
+    def __call__(self, request):
+        timer = _QueryTimer(keep=5)
+        request._timing_render = 0.0
+        request._timing_auth = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all(initialized_only=False):
+                stack.enter_context(conn.execute_wrapper(timer))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        db_ms = timer.total * 1000
+        render_ms = request._timing_render * 1000
+        auth_ms = request._timing_auth * 1000
+        app_ms = max(total_ms - db_ms - render_ms, 0.0)
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={db_ms:.1f};desc="{timer.count} SQL"',
+                f"render;dur={render_ms:.1f}",
+                # Recouvre app et db: requêtes SQL de l'authentification comprises.
+                f'auth;dur={auth_ms:.1f};desc="authentification et permissions"',
+                f"app;dur={app_ms:.1f}",
+                f"total;dur={total_ms:.1f}",
+            ]
+        )
+
+        match = getattr(request, "resolver_match", None)
+        route = f"{request.method} {match.view_name if match else 'unresolved'}"
+        timing_stats.record(route, total_ms, db_ms, timer.count)
+
+        if total_ms >= self.slow_ms:
+            logger.warning(
+                "Requête lente %s %s: %.0f ms "
+                "(db %.0f ms, %d SQL, rendu %.0f ms, auth %.0f ms)\n%s",
+                request.method,
+                request.get_full_path(),
+                total_ms,
+                db_ms,
+                timer.count,
+                render_ms,
+                auth_ms,
+                "\n".join(f"  {d * 1000:.1f} ms  {sql[:300]}" for d, sql in timer.slowest),
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # Les réponses DRF sont rendues après la vue: on chronomètre ce rendu.
+        started = time.perf_counter()
+
+        def _done(rendered):
+            request._timing_render += time.perf_counter() - started
+
+        response.add_post_render_callback(_done)
+        return response
+
+
+@contextmanager
+def auth_timing(request):
+    """Ajoute la durée du bloc à l'entrée `auth` de Server-Timing, si elle est mesurée."""
+    http_request = getattr(request, "_request", request)
+    if not hasattr(http_request, "_timing_auth"):
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        http_request._timing_auth += time.perf_counter() - started
+
+
+class AuthTimingMixin:
+    """
+    Vues DRF: chronomètre l'authentification (JWT, instantané utilisateur) et les
+    permissions pour RequestTimingMiddleware. Sans le middleware, aucun coût.
+    """
+
+    def perform_authentication(self, request):
+        with auth_timing(request):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with auth_timing(request):
+            super().check_permissions(request)
@@ -0,0 +1,32 @@
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+
+
+class StandardPageNumberPagination(PageNumberPagination):
+    """Pagination par défaut de l'API; `?page_size=` permet d'ajuster (max 100)."""
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset() avec l'ORM asynchrone (sportconnectgn/asyncviews.py):
+        le Paginator de Django ne voit que des index (range), COUNT et tranche de la
+        page sont lus par acount() et `async for`.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(range(await queryset.acount()), page_size)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg) from exc
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        indexes = self.page.object_list
+        return [obj async for obj in queryset[indexes.start : indexes.stop]]
@@ -0,0 +1,193 @@
+"""
+Pub/sub pour les flux temps réel servis par l'application ASGI (voir activities/live.py).
+
+Un abonné suit une liste de canaux (ex: "activity:42"). Les messages en attente
+sont fusionnés par canal: seul le dernier état compte, donc un abonné lent ou
+inactif n'accumule jamais plus d'un message par canal suivi, quel que soit le
+nombre de publications. publish() peut être appelé depuis n'importe quel thread
+(vues synchrones, on_commit…); la remise se fait dans la boucle asyncio de
+l'abonné, avec un seul call_soon_threadsafe par boucle et par message.
+
+Backend choisi par LIVE_BROKER (chemin pointé):
+- InProcessBroker (défaut): abonnés et publications dans le même process; avec
+  plusieurs workers, un abonné ne voit que les écritures de son worker;
+- PostgresBroker: publications via NOTIFY, chaque process écoute (LISTEN) et
+  redistribue à ses abonnés locaux. Nécessite PostgreSQL et psycopg 3.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Messages en attente d'un abonné, au plus un par canal."""
+
+    __slots__ = ("broker", "channels", "loop", "_pending", "_ready")
+
+    def __init__(self, broker, channels, loop):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.loop = loop
+        self._pending = {}
+        self._ready = asyncio.Event()
+
+    def push(self, channel: str, message) -> None:
+        # Toujours appelé dans la boucle de l'abonné.
+        self._pending[channel] = message
+        self._ready.set()
+
+    async def get(self, timeout: float | None = None) -> dict:
+        """{canal: dernier message} dès qu'il y en a, ou {} après `timeout` secondes."""
+        if not self._pending:
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._ready.wait()
+            except TimeoutError:
+                return {}
+        self._ready.clear()
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+def _deliver(subscriptions, channel, message):
+    for subscription in subscriptions:
+        subscription.push(channel, message)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}  # canal -> set[Subscription]
+
+    def subscribe(self, channels) -> Subscription:
+        """À appeler depuis la boucle asyncio qui consommera les messages."""
+        subscription = Subscription(self, channels, asyncio.get_running_loop())
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for channel in subscription.channels:
+                subscriptions = self._subscriptions.get(channel)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._subscriptions[channel]
+
+    def wants(self, channel: str) -> bool:
+        """Faux si personne n'écoute: l'appelant peut s'épargner de préparer le message."""
+        return channel in self._subscriptions
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(set().union(*self._subscriptions.values()))
+
+    def publish(self, channel: str, message) -> None:
+        self.dispatch(channel, message)
+
+    def dispatch(self, channel: str, message) -> None:
+        """Remet `message` aux abonnés locaux du canal."""
+        with self._lock:
+            subscriptions = tuple(self._subscriptions.get(channel, ()))
+        by_loop = {}
+        for subscription in subscriptions:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, batch in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, batch, channel, message)
+            except RuntimeError:
+                # Boucle fermée: ses abonnés partent avec elle.
+                pass
+
+
+class PostgresBroker(InProcessBroker):
+    """Diffusion entre process via LISTEN/NOTIFY (un canal PostgreSQL pour tous)."""
+
+    PG_CHANNEL = "sportconnectgn_live"
+    RECONNECT_SECONDS = 2.0
+    LIBPQ_OPTIONS = ("sslmode", "sslrootcert", "connect_timeout", "application_name")
+
+    def __init__(self, alias: str = "default"):
+        super().__init__()
+        self.alias = alias
+        self._listener = None
+
+    def wants(self, channel: str) -> bool:
+        # Les abonnés des autres process ne sont pas connus ici.
+        return True
+
+    def publish(self, channel: str, message) -> None:
+        payload = json.dumps({"channel": channel, "message": message})
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.PG_CHANNEL, payload])
+
+    def subscribe(self, channels) -> Subscription:
+        subscription = super().subscribe(channels)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return subscription
+
+    def _conninfo(self) -> str:
+        from psycopg.conninfo import make_conninfo
+
+        params = connections[self.alias].settings_dict
+        options = {
+            key: value
+            for key, value in params.get("OPTIONS", {}).items()
+            if key in self.LIBPQ_OPTIONS
+        }
+        return make_conninfo(
+            dbname=params["NAME"],
+            user=params.get("USER") or None,
+            password=params.get("PASSWORD") or None,
+            host=params.get("HOST") or None,
+            port=params.get("PORT") or None,
+            **options,
+        )
+
+    async def _listen(self):
+        import psycopg
+
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(self._conninfo(), autocommit=True)
+                async with conn:
+                    await conn.execute(f"LISTEN {self.PG_CHANNEL}")
+                    async for notify in conn.notifies():
+                        data = json.loads(notify.payload)
+                        self.dispatch(data["channel"], data["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Les messages publiés pendant la coupure sont perdus; les clients
+                # retrouvent l'état complet à leur reconnexion.
+                logger.exception("Écoute LISTEN/NOTIFY interrompue, reconnexion.")
+                await asyncio.sleep(self.RECONNECT_SECONDS)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Instance unique (par process) du backend configuré par LIVE_BROKER."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.LIVE_BROKER)()
+    return _broker
@@ -0,0 +1,51 @@
+"""
+Renderers rapides, activés par API_FAST_RENDERERS (voir settings.REST_FRAMEWORK).
+
+- ORJSONRenderer: même sortie que le JSONRenderer de DRF (JSON compact, UTF-8),
+  mais encodé par orjson. Les datetimes, Decimal, UUID, chaînes paresseuses…
+  passent par l'encodeur de DRF pour garder exactement le même format
+  (ex. "2026-01-01T10:00:00Z" et non "+00:00").
+- MessagePackRenderer: `Accept: application/msgpack`, négocié par le client
+  frontend (src/api/msgpack.js) pour des réponses plus petites et rapides à décoder.
+"""
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """Types non natifs: délégués à l'encodeur JSON de DRF."""
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    # Les dict/list de DRF (ReturnDict, OrderedDict…) sont des sous-classes: sans
+    # PASSTHROUGH_SUBCLASS, orjson les sérialise directement, sans passer par _default.
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context):
+            # orjson ne connaît que l'indentation à 2 espaces.
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_default, use_bin_type=True)
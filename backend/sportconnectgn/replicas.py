@@ -0,0 +1,181 @@
+"""
+Lectures sur réplique(s) de la base (DATABASE_REPLICA_URLS, alias replica_1, replica_2…).
+
+Par défaut tout passe par "default". Seules les lectures GET/HEAD des viewsets qui
+héritent de ReplicaReadMixin (activités, sports, users/me) vont sur une réplique,
+tirée au sort une fois par requête. L'authentification a déjà eu lieu, sur
+"default", à ce moment-là, et le calcul des réponses partagées du cache
+(CachedReadMixin) reste aussi sur "default" (`primary_reads`). En effet, une
+réplique en retard y déposerait des données périmées pour tous les visiteurs,
+jusqu'à l'expiration du cache.
+
+Lire ses propres écritures: après une écriture réussie (POST, PATCH, DELETE…),
+PrimaryPinMiddleware garde les lectures de cet utilisateur sur "default" pendant
+REPLICA_PIN_SECONDS. Par exemple, has_joined est juste dès la réservation faite,
+même si la réplique n'a pas encore reçu la participation. Le marqueur est
+stocké dans le cache, qui doit être partagé entre workers (Redis, memcached),
+sinon un autre worker ignorerait l'écriture: hors DEBUG, `manage.py check` le
+refuse (sportconnectgn.E001).
+
+Lire les écritures des autres: les ETag viennent des compteurs de version du
+cache (activities/cache.py), qui avancent dès le commit sur "default". Une réplique
+en retard associerait le nouvel ETag à des données d'avant l'écriture, et le
+client les garderait jusqu'à l'écriture suivante. Pendant REPLICA_PIN_SECONDS
+après une écriture d'un scope (`cache_scope` du viewset), ses lectures restent
+donc sur "default", pour tous les utilisateurs.
+
+`manage.py bench_replicas` vérifie ce routage avec deux fichiers SQLite.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+from activities import cache as response_cache
+
+
+# Alias de la réplique utilisée par la requête en cours (None: "default").
+_replica = ContextVar("replica", default=None)
+
+
+def use_replica() -> str | None:
+    """Envoie les lectures de la suite de la requête sur une réplique au hasard."""
+    alias = random.choice(settings.DATABASE_REPLICAS) if settings.DATABASE_REPLICAS else None
+    _replica.set(alias)
+    return alias
+
+
+@contextmanager
+def primary_reads():
+    """Lectures sur "default" dans ce bloc, même si la requête utilise une réplique."""
+    token = _replica.set(None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    """Écritures et migrations sur "default"; lectures sur la réplique de la requête."""
+
+    def db_for_read(self, model, **hints):
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Mêmes données partout: un objet lu sur une réplique peut en référencer un autre.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+# -- Lire ses propres écritures ---------------------------------------------------------
+
+
+def _cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _pin_key(user_id) -> str:
+    return f"db:pin:{user_id}"
+
+
+def _user_id(user):
+    return user.pk if getattr(user, "is_authenticated", False) else None
+
+
+def is_pinned(user) -> bool:
+    user_id = _user_id(user)
+    return user_id is not None and _cache().get(_pin_key(user_id)) is not None
+
+
+async def ais_pinned(user) -> bool:
+    """is_pinned() pour les vues asynchrones (sportconnectgn/asyncviews.py)."""
+    user_id = _user_id(user)
+    return user_id is not None and await _cache().aget(_pin_key(user_id)) is not None
+
+
+def scope_written(scope) -> bool:
+    """Écriture du scope validée depuis moins de REPLICA_PIN_SECONDS."""
+    return scope is not None and response_cache.written_within(
+        scope, settings.REPLICA_PIN_SECONDS
+    )
+
+
+class ReplicaReadMixin:
+    """
+    Viewset dont les lectures tolèrent le retard de réplication: `replica_actions`
+    (toutes si None), en GET/HEAD/OPTIONS, sauf pour un utilisateur qui vient d'écrire
+    et juste après une écriture du `cache_scope` du viewset.
+    """
+
+    replica_actions = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not self.replica_eligible(request) or is_pinned(request.user):
+            return
+        if not scope_written(getattr(self, "cache_scope", None)):
+            use_replica()
+
+    def replica_eligible(self, request) -> bool:
+        """Sans accès au cache ni à la base: méthode, action et répliques configurées."""
+        if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+            return False
+        return self.replica_actions is None or self.action in self.replica_actions
+
+
+class PrimaryPinMiddleware:
+    """
+    Borne le choix de réplique à la requête, et après une écriture réussie d'un
+    utilisateur authentifié, garde ses lectures sur "default" (REPLICA_PIN_SECONDS).
+    L'utilisateur est celui authentifié par DRF (recopié sur la requête Django).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _replica.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica.reset(token)
+        user_id = self._writer(request, response)
+        if user_id is not None:
+            _cache().set(_pin_key(user_id), True, timeout=settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        token = _replica.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica.reset(token)
+        user_id = self._writer(request, response)
+        if user_id is not None:
+            await _cache().aset(_pin_key(user_id), True, timeout=settings.REPLICA_PIN_SECONDS)
+        return response
+
+    @staticmethod
+    def _writer(request, response):
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return None
+        return _user_id(getattr(request, "user", None))
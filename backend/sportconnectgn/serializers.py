@@ -0,0 +1,55 @@
+"""
+Champs à la demande pour tous les serializers de l'API (lecture uniquement).
+
+- `?fields=id,titre,sport.name`: ne garde que ces champs (chemins pointés pour
+  les objets imbriqués).
+- `?expand=sport,created_by`: si le paramètre est présent, seuls les champs
+  imbriqués listés sont développés; les autres champs de `Meta.expandable_fields`
+  sont réduits à leur clé primaire. Sans `expand`, tout reste développé (compat).
+"""
+
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _parse_paths(raw):
+    return {part.strip() for part in (raw or "").split(",") if part.strip()}
+
+
+class SparseFieldsMixin:
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+        params = getattr(request, "query_params", request.GET)
+        prefix = self._sparse_prefix()
+
+        requested = _parse_paths(params.get("fields"))
+        if requested:
+            names = {
+                path[len(prefix) :].split(".")[0]
+                for path in requested
+                if path.startswith(prefix) and len(path) > len(prefix)
+            }
+            if names:
+                fields = {name: field for name, field in fields.items() if name in names}
+
+        if "expand" in params:
+            expanded = _parse_paths(params.get("expand"))
+            for name in getattr(self.Meta, "expandable_fields", ()):
+                if name in fields and f"{prefix}{name}" not in expanded:
+                    fields[name] = serializers.PrimaryKeyRelatedField(
+                        source=fields[name].source, read_only=True
+                    )
+        return fields
+
+    def _sparse_prefix(self) -> str:
+        """Chemin pointé de ce serializer depuis la racine ("" pour la racine)."""
+        parts = []
+        node = self
+        while node.parent is not None:
+            if not isinstance(node, serializers.ListSerializer) and node.field_name:
+                parts.append(node.field_name)
+            node = node.parent
+        return "".join(f"{part}." for part in reversed(parts))
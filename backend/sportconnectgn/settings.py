@@ -48,7 +48,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "sportconnectgn.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,6 +57,44 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Compression Brotli/gzip des réponses de l'API (sportconnectgn/compression.py).
+COMPRESSION_ENABLED = _env_bool("API_COMPRESSION", default=True)
+COMPRESSION_PATH_PREFIXES = ("/api/",)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+if COMPRESSION_ENABLED:
+    # Après WhiteNoise (qui sert lui-même les statiques précompressés).
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("sportconnectgn.middleware.WhiteNoiseMiddleware") + 1,
+        "sportconnectgn.compression.CompressionMiddleware",
+    )
+
+# Instrumentation par requête (SQL, rendu, Server-Timing), désactivée par défaut.
+REQUEST_TIMING_ENABLED = _env_bool("REQUEST_TIMING", default=False)
+REQUEST_TIMING_SLOW_MS = int(os.getenv("REQUEST_TIMING_SLOW_MS", "500"))
+if REQUEST_TIMING_ENABLED:
+    MIDDLEWARE.insert(0, "sportconnectgn.middleware.RequestTimingMiddleware")
+
+# Profil « API seule » (DJANGO_API_ONLY=1): l'API authentifie par JWT et ne sert que du
+# JSON/MessagePack; admin, sessions, messages, templates et fichiers statiques ne sont
+# alors ni chargés au démarrage ni traversés à chaque requête (démarrage à froid plus
+# court: `manage.py bench_cold_start`). L'admin reste disponible sans ce profil.
+API_ONLY = _env_bool("DJANGO_API_ONLY", default=False)
+if API_ONLY:
+    _NOT_API = {
+        "django.contrib.admin",
+        "django.contrib.sessions",
+        "django.contrib.messages",
+        "sportconnectgn.middleware.WhiteNoiseMiddleware",
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.middleware.csrf.CsrfViewMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+    }
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in _NOT_API]
+    MIDDLEWARE = [name for name in MIDDLEWARE if name not in _NOT_API]
+
 ROOT_URLCONF = "sportconnectgn.urls"
 
 TEMPLATES = [
@@ -73,13 +111,35 @@ TEMPLATES = [
         },
     }
 ]
+if API_ONLY:
+    # Seuls l'admin et l'API navigable de DRF utilisent des templates.
+    TEMPLATES = []
 
 WSGI_APPLICATION = "sportconnectgn.wsgi.application"
 
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# DATABASE_POOL=1 (PostgreSQL): pool psycopg au lieu des connexions persistantes. Sous
+# ASGI, chaque requête a son propre thread, donc sa propre connexion: sans pool, une
+# ouverture de connexion (TCP + TLS + auth) par requête.
+DATABASE_POOL = _env_bool("DATABASE_POOL", default=False)
+
+
+def _database(url: str) -> dict:
+    database = dj_database_url.parse(
+        url, conn_max_age=0 if DATABASE_POOL else 600, ssl_require=not DEBUG
+    )
+    if DATABASE_POOL and database["ENGINE"] == "django.db.backends.postgresql":
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+        }
+    return database
+
+
 if DATABASE_URL:
-    DATABASES = {"default": dj_database_url.config(conn_max_age=600, ssl_require=not DEBUG)}
+    DATABASES = {"default": _database(DATABASE_URL)}
 else:
     DATABASES = {
         "default": {
@@ -87,6 +147,77 @@ else:
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
+if DATABASES["default"]["ENGINE"].endswith("sqlite3"):
+    # Tests: base SQLite dans un fichier. La base mémoire partagée (cache=shared) verrouille
+    # les tables entre threads, ce qui casse le test de réservations concurrentes.
+    DATABASES["default"].setdefault("TEST", {}).setdefault(
+        "NAME", str(BASE_DIR / "test_db.sqlite3")
+    )
+
+# Répliques en lecture (sportconnectgn/replicas.py), URL séparées par des virgules: les
+# GET des activités, des sports et de users/me y sont répartis. Un utilisateur qui
+# vient d'écrire relit sur "default" pendant REPLICA_PIN_SECONDS. Cache partagé requis
+# (REDIS_URL, CACHES ci-dessous): sinon, hors DEBUG, `manage.py check`/`migrate` échouent
+# (sportconnectgn.E001, sportconnectgn/checks.py).
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+DATABASE_REPLICAS = [f"replica_{i}" for i in range(1, len(DATABASE_REPLICA_URLS) + 1)]
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+for _alias, _url in zip(DATABASE_REPLICAS, DATABASE_REPLICA_URLS):
+    # Tests: la réplique est la base de test elle-même, pas une seconde base à créer.
+    DATABASES[_alias] = {**_database(_url), "TEST": {"MIRROR": "default"}}
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ["sportconnectgn.replicas.ReplicaRouter"]
+    MIDDLEWARE.append("sportconnectgn.replicas.PrimaryPinMiddleware")
+
+
+# Cache: locmem par défaut, propre à chaque process. Avec plusieurs workers, il faut un
+# cache partagé en mémoire, aux compteurs atomiques: REDIS_URL (comme dans render.yaml)
+# ou DJANGO_CACHE_BACKEND/DJANGO_CACHE_LOCATION (memcached…). Sinon chaque worker sert
+# ses propres réponses en cache après une écriture faite ailleurs: gunicorn_conf.py
+# démarre alors un seul worker et `manage.py check` le signale hors DEBUG
+# (sportconnectgn/checks.py). Pas de cache en base ni en fichiers: leur incr() lit
+# puis réécrit (deux écritures simultanées, une seule nouvelle version), et chaque
+# lecture servie "sans SQL" paierait une requête sur la table du cache.
+REDIS_URL = os.getenv("REDIS_URL", "")
+CACHE_BACKEND = os.getenv("DJANGO_CACHE_BACKEND") or (
+    "django.core.cache.backends.redis.RedisCache"
+    if REDIS_URL
+    else "django.core.cache.backends.locmem.LocMemCache"
+)
+CACHE_LOCATION = os.getenv("DJANGO_CACHE_LOCATION") or REDIS_URL or "sportconnectgn"
+CACHES = {
+    "default": {"BACKEND": CACHE_BACKEND, "LOCATION": CACHE_LOCATION},
+    # Compteurs de version du cache de l'API (activities/cache.py), sans expiration:
+    # à part, l'éviction des réponses (MAX_ENTRIES) ne peut pas les emporter. Même
+    # serveur pour Redis/memcached (politique d'éviction volatile-*: seules les clés
+    # à durée de vie sont évincées), zone mémoire distincte pour locmem.
+    "api_versions": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": (
+            f"{CACHE_LOCATION}_versions"
+            if CACHE_BACKEND.endswith("LocMemCache")
+            else CACHE_LOCATION
+        ),
+    },
+}
+# Caches partagés entre process, en mémoire et à incr() atomique (sportconnectgn/checks.py).
+SHARED_CACHE_BACKENDS = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+)
+
+# Cache des réponses de lecture de l'API (activities/cache.py).
+API_CACHE_ENABLED = _env_bool("API_CACHE_ENABLED", default=True)
+API_CACHE_ALIAS = "default"
+API_CACHE_VERSION_ALIAS = "api_versions"
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", "60"))
+# Listes en lecture sérialisées sans ModelSerializer (activities/fastpath.py).
+API_FAST_PATH = _env_bool("API_FAST_PATH", default=True)
+# Lectures chaudes en vues asynchrones (sportconnectgn/asyncviews.py), sous ASGI uniquement.
+API_ASYNC_VIEWS = _env_bool("API_ASYNC_VIEWS", default=False)
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -112,6 +243,26 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Flux temps réel des places (activities/live.py, sportconnectgn/pubsub.py).
+# Avec plusieurs workers uvicorn: sportconnectgn.pubsub.PostgresBroker (LISTEN/NOTIFY),
+# comme dans render.yaml; sinon gunicorn_conf.py démarre un seul worker.
+LIVE_BROKER = os.getenv("LIVE_BROKER", "sportconnectgn.pubsub.InProcessBroker")
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "20"))
+# Flux servi aussi sous WSGI (un thread par abonné): pour runserver seulement. Sinon 503,
+# et le frontend lit l'état en JSON à intervalles réguliers.
+LIVE_STREAM_WSGI = _env_bool("LIVE_STREAM_WSGI", default=DEBUG)
+# Flux servis par ce déploiement: workers uvicorn, ou LIVE_STREAM_WSGI. Sinon (gthread, sync)
+# personne n'est abonné et les écritures ne publient rien: ni lecture des places ni
+# pg_notify. Service ASGI séparé: LIVE_STREAMS=1 aussi sur celui qui reçoit les écritures.
+LIVE_STREAMS = _env_bool(
+    "LIVE_STREAMS",
+    default=LIVE_STREAM_WSGI or os.getenv("GUNICORN_PROFILE", "").strip().lower() == "uvicorn",
+)
+
+# Vignettes des photos de profil (accounts/thumbnails.py).
+THUMBNAIL_ASYNC = _env_bool("THUMBNAIL_ASYNC", default=True)
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -149,15 +300,45 @@ CSRF_COOKIE_SECURE = not DEBUG
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "sportconnectgn.pagination.StandardPageNumberPagination",
     "PAGE_SIZE": 20,
 }
 
+# Renderers/parsers orjson + MessagePack (sportconnectgn/renderers.py, parsers.py).
+# Nécessite orjson et msgpack; le JSON produit est identique à celui de DRF.
+API_FAST_RENDERERS = _env_bool("API_FAST_RENDERERS", default=False)
+if API_FAST_RENDERERS:
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = (
+        "sportconnectgn.renderers.ORJSONRenderer",
+        "sportconnectgn.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    )
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"] = (
+        "sportconnectgn.parsers.ORJSONParser",
+        "sportconnectgn.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    )
+if API_ONLY:
+    # Pas d'API navigable: elle demande les templates et les fichiers statiques.
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = tuple(
+        name
+        for name in REST_FRAMEWORK.get(
+            "DEFAULT_RENDERER_CLASSES", ("rest_framework.renderers.JSONRenderer",)
+        )
+        if name != "rest_framework.renderers.BrowsableAPIRenderer"
+    )
+
+
+# Durée de vie de l'instantané utilisateur de CachedJWTAuthentication (0 = désactivé).
+# Ignorée sans cache partagé: chaque requête authentifiée relit alors l'utilisateur.
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv("AUTH_USER_CACHE_TIMEOUT", "60"))
+
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
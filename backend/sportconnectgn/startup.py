@@ -0,0 +1,16 @@
+"""
+Chargement de l'application au démarrage d'un process (sportconnectgn/wsgi.py, asgi.py).
+
+Le ramasse-miettes reste actif: le suspendre pendant les imports, puis geler
+définitivement les objets chargés, laissait leurs cycles morts en mémoire pour
+toute la vie du process. Le gel (gc.freeze) n'a d'intérêt qu'avant un fork, pour
+ne pas recopier les pages partagées: gunicorn_conf.pre_fork s'en charge avec
+--preload.
+"""
+
+
+def load_urlconf():
+    """Importe l'URLconf (vues, serializers), sinon chargée par la première requête."""
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
@@ -1,12 +1,20 @@
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from accounts.views import RegisterView, UserViewSet
-from activities.views import ActivityViewSet, ParticipationViewSet, SportViewSet
+from accounts.views import MeReadView, RegisterView, UserViewSet
+from activities.live import activity_seats_stream
+from activities.views import (
+    ActivityReadView,
+    ActivityViewSet,
+    ParticipationViewSet,
+    SportReadView,
+    SportViewSet,
+)
+
+from .views import TimingStatsView
 
 
 router = DefaultRouter()
@@ -16,14 +24,47 @@ router.register(r"activities", ActivityViewSet, basename="activity")
 router.register(r"participations", ParticipationViewSet, basename="participation")
 
 
+def async_read_views(routes):
+    """Mêmes URL que le routeur, servies par les vues asynchrones (repli sur le viewset)."""
+    views = {
+        "activity-list": ActivityReadView,
+        "activity-detail": ActivityReadView,
+        "sport-list": SportReadView,
+        "sport-detail": SportReadView,
+        "user-me": MeReadView,
+    }
+    return [
+        re_path(
+            r"^api/" + route.pattern.regex.pattern.removeprefix("^"),
+            view.as_view(fallback=route.callback),
+            name=route.name,
+        )
+        for route in routes
+        if (view := views.get(route.name)) is not None
+    ]
+
+
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/", include(router.urls)),
     path("api/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/auth/register/", RegisterView.as_view(), name="auth_register"),
+    path("api/live/activities/", activity_seats_stream, name="live_activities"),
+    path("api/metrics/timing/", TimingStatsView.as_view(), name="metrics_timing"),
 ]
 
+if not settings.API_ONLY:
+    # Import ici: sous DJANGO_API_ONLY, l'admin n'est pas installé.
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
+
+# Avant le routeur: ces routes masquent les siennes.
+async_urlpatterns = async_read_views(router.urls)
+
+if settings.API_ASYNC_VIEWS:
+    urlpatterns = async_urlpatterns + urlpatterns
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
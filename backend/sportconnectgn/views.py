@@ -0,0 +1,21 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .middleware import AuthTimingMixin, timing_stats
+
+
+class TimingStatsView(AuthTimingMixin, APIView):
+    """
+    Histogrammes de latence par route (process courant), réservés au staff.
+    DELETE remet les compteurs à zéro.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(timing_stats.snapshot())
+
+    def delete(self, request):
+        timing_stats.reset()
+        return Response(status=204)
@@ -6,7 +6,9 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from sportconnectgn.startup import load_urlconf
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sportconnectgn.settings")
 
 application = get_wsgi_application()
-
+load_urlconf()
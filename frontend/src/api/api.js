@@ -1,5 +1,7 @@
 import axios from 'axios'
 
+import { decodeMsgpack } from './msgpack'
+
 const API_BASE_URL =
   import.meta.env.VITE_API_BASE_URL ?? 'http://localhost:8000/api/'
 
@@ -24,9 +26,34 @@ export function clearTokens() {
   localStorage.removeItem(REFRESH_TOKEN_KEY)
 }
 
+// Réponses MessagePack (plus compactes) si le backend a API_FAST_RENDERERS activé.
+// Le serveur répond en JSON s'il ne connaît pas ce format: les deux sont décodés.
+const USE_MSGPACK = import.meta.env.VITE_API_MSGPACK === 'true'
+const textDecoder = new TextDecoder()
+
+function decodeResponse(data, headers) {
+  if (!(data instanceof ArrayBuffer)) return data
+  if (!data.byteLength) return ''
+  const contentType = String(headers?.['content-type'] ?? '')
+  if (contentType.includes('application/msgpack')) return decodeMsgpack(data)
+  const text = textDecoder.decode(data)
+  try {
+    return JSON.parse(text)
+  } catch {
+    return text
+  }
+}
+
 export const api = axios.create({
   baseURL: API_BASE_URL,
   timeout: 15000,
+  ...(USE_MSGPACK
+    ? {
+        headers: { Accept: 'application/msgpack, application/json;q=0.9' },
+        responseType: 'arraybuffer',
+        transformResponse: [decodeResponse],
+      }
+    : {}),
 })
 
 function pickFirstString(value) {
@@ -50,6 +77,51 @@ function flattenErrors(data) {
   return out
 }
 
+const SEATS_POLL_MS = 15000
+
+// Places en temps réel (SSE, servi par l'application ASGI): onSeats reçoit
+// { id, participants_count, nombre_places, is_full } à chaque changement.
+// EventSource se reconnecte seul après une coupure; si le serveur refuse le flux
+// (503 sous WSGI), lecture de l'état en JSON toutes les SEATS_POLL_MS.
+// Retourne la fonction de désabonnement.
+export function subscribeSeats(ids, onSeats) {
+  if (!ids.length) return () => {}
+  const wanted = ids.slice(0, 100).join(',')
+  let stopped = false
+  let source = null
+  let timer = null
+
+  const poll = async () => {
+    try {
+      const { data } = await api.get('live/activities/', { params: { ids: wanted } })
+      if (!stopped) data.results.forEach(onSeats)
+    } catch {
+      // Réseau ou API indisponible: nouvel essai au prochain tour.
+    }
+    if (!stopped) timer = setTimeout(poll, SEATS_POLL_MS)
+  }
+
+  if (typeof EventSource === 'undefined') {
+    timer = setTimeout(poll, SEATS_POLL_MS)
+  } else {
+    const url = new URL('live/activities/', API_BASE_URL)
+    url.searchParams.set('ids', wanted)
+    source = new EventSource(url)
+    source.addEventListener('seats', (event) => onSeats(JSON.parse(event.data)))
+    source.addEventListener('error', () => {
+      // CONNECTING: reconnexion automatique en cours. CLOSED: flux refusé.
+      if (source.readyState !== EventSource.CLOSED || stopped || timer !== null) return
+      poll()
+    })
+  }
+
+  return () => {
+    stopped = true
+    source?.close()
+    clearTimeout(timer)
+  }
+}
+
 export function getApiErrorMessage(err) {
   // Erreur réseau / CORS / DNS / API down
   if (!err?.response) {
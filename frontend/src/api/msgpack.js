@@ -0,0 +1,133 @@
+// Décodeur MessagePack minimal pour les réponses de l'API (Accept: application/msgpack).
+// Couvre tout ce que le backend émet (maps, tableaux, chaînes, nombres, booléens, null, bin).
+
+const textDecoder = new TextDecoder()
+
+export function decodeMsgpack(buffer) {
+  const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer)
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength)
+  let pos = 0
+
+  function str(length) {
+    const value = textDecoder.decode(bytes.subarray(pos, pos + length))
+    pos += length
+    return value
+  }
+
+  function bin(length) {
+    const value = bytes.slice(pos, pos + length)
+    pos += length
+    return value
+  }
+
+  function array(length) {
+    const out = new Array(length)
+    for (let i = 0; i < length; i++) out[i] = read()
+    return out
+  }
+
+  function map(length) {
+    const out = {}
+    for (let i = 0; i < length; i++) {
+      const key = read()
+      out[key] = read()
+    }
+    return out
+  }
+
+  function read() {
+    const byte = bytes[pos++]
+    if (byte === undefined) throw new Error('MessagePack: données tronquées')
+    if (byte <= 0x7f) return byte
+    if (byte >= 0xe0) return byte - 0x100
+    if ((byte & 0xf0) === 0x80) return map(byte & 0x0f)
+    if ((byte & 0xf0) === 0x90) return array(byte & 0x0f)
+    if ((byte & 0xe0) === 0xa0) return str(byte & 0x1f)
+
+    let value
+    switch (byte) {
+      case 0xc0:
+        return null
+      case 0xc2:
+        return false
+      case 0xc3:
+        return true
+      case 0xc4:
+        return bin(bytes[pos++])
+      case 0xc5:
+        value = view.getUint16(pos)
+        pos += 2
+        return bin(value)
+      case 0xc6:
+        value = view.getUint32(pos)
+        pos += 4
+        return bin(value)
+      case 0xca:
+        value = view.getFloat32(pos)
+        pos += 4
+        return value
+      case 0xcb:
+        value = view.getFloat64(pos)
+        pos += 8
+        return value
+      case 0xcc:
+        return bytes[pos++]
+      case 0xcd:
+        value = view.getUint16(pos)
+        pos += 2
+        return value
+      case 0xce:
+        value = view.getUint32(pos)
+        pos += 4
+        return value
+      case 0xcf:
+        value = Number(view.getBigUint64(pos))
+        pos += 8
+        return value
+      case 0xd0:
+        return view.getInt8(pos++)
+      case 0xd1:
+        value = view.getInt16(pos)
+        pos += 2
+        return value
+      case 0xd2:
+        value = view.getInt32(pos)
+        pos += 4
+        return value
+      case 0xd3:
+        value = Number(view.getBigInt64(pos))
+        pos += 8
+        return value
+      case 0xd9:
+        return str(bytes[pos++])
+      case 0xda:
+        value = view.getUint16(pos)
+        pos += 2
+        return str(value)
+      case 0xdb:
+        value = view.getUint32(pos)
+        pos += 4
+        return str(value)
+      case 0xdc:
+        value = view.getUint16(pos)
+        pos += 2
+        return array(value)
+      case 0xdd:
+        value = view.getUint32(pos)
+        pos += 4
+        return array(value)
+      case 0xde:
+        value = view.getUint16(pos)
+        pos += 2
+        return map(value)
+      case 0xdf:
+        value = view.getUint32(pos)
+        pos += 4
+        return map(value)
+      default:
+        throw new Error(`MessagePack: type 0x${byte.toString(16)} non supporté`)
+    }
+  }
+
+  return read()
+}
@@ -56,6 +56,11 @@ export default function ActivityCard({ activity, action }) {
           <div className="truncate font-semibold text-slate-900 dark:text-slate-100">
             {activity?.lieu ?? '-'}
           </div>
+          {activity?.distance_km != null ? (
+            <div className="text-xs text-slate-500 dark:text-slate-400">
+              à {activity.distance_km.toLocaleString('fr-FR', { maximumFractionDigits: 1 })} km
+            </div>
+          ) : null}
         </div>
         <div className="rounded-2xl bg-slate-50 px-3 py-2 ring-1 ring-slate-200 dark:bg-slate-950/40 dark:ring-white/10">
           <div className="text-xs text-slate-500 dark:text-slate-400">Places</div>
@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from 'react'
-import { api, getApiErrorMessage } from '../api/api.js'
+import { api, getApiErrorMessage, subscribeSeats } from '../api/api.js'
 import ActivityCard from '../components/ActivityCard.jsx'
 import { motion } from 'framer-motion'
 import { useLocation } from 'react-router-dom'
@@ -36,7 +36,9 @@ export default function ActivitiesPage() {
   }, [location.search])
 
   const loadActivities = async () => {
-    const res = await api.get('activities/')
+    // Filtrage côté serveur (q); le filtre local ci-dessous garde l’UI réactive pendant la frappe.
+    const q = query.trim()
+    const res = await api.get('activities/', { params: q ? { q } : undefined })
     const data = res.data
     return Array.isArray(data) ? data : data?.results ?? []
   }
@@ -58,7 +60,7 @@ export default function ActivitiesPage() {
   }
 
   useEffect(() => {
-    ;(async () => {
+    const timer = setTimeout(async () => {
       try {
         setError('')
         setLoading(true)
@@ -69,9 +71,10 @@ export default function ActivitiesPage() {
       } finally {
         setLoading(false)
       }
-    })()
+    }, 250)
+    return () => clearTimeout(timer)
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [])
+  }, [query])
 
   useEffect(() => {
     if (isBootstrapping) return
@@ -93,6 +96,21 @@ export default function ActivitiesPage() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [isAuthenticated, isBootstrapping])
 
+  // Places mises à jour en direct pour les activités affichées.
+  const liveIds = activities.map((a) => a.id).filter(Boolean).join(',')
+  useEffect(() => {
+    if (!liveIds) return undefined
+    return subscribeSeats(liveIds.split(','), (seats) => {
+      setActivities((prev) =>
+        prev.map((a) =>
+          a.id === seats.id
+            ? { ...a, participants_count: seats.participants_count, is_full: seats.is_full }
+            : a,
+        ),
+      )
+    })
+  }, [liveIds])
+
   const filtered = activities.filter((a) => {
     const q = query.trim().toLowerCase()
     if (!q) return true